@@ -0,0 +1,236 @@
+"""
+Benchmark of the Q4A/Q5 chain on synthetic panels (time + memory per stage).
+
+Run:
+  PYTHONPATH=src python scripts/bench_q4a.py                         # 10x, 100x, 1000x
+  PYTHONPATH=src python scripts/bench_q4a.py --scales 1 10 --indicators 20
+  PYTHONPATH=src python scripts/bench_q4a.py --stages build features --no-memory
+  PYTHONPATH=src python scripts/bench_q4a.py --train-max-scale 10     # skip slow training above 10x
+
+Scale 1 = the real panel (~200 countries x 34 years). Each stage runs the same
+code as the pipeline (the script's main() on a temporary data dir, or the
+library function for the Q5 ranking); memory is a second, separate run under
+tracemalloc, so the timings are not slowed down by it. peak_mb is that
+per-stage tracemalloc peak; process_rss_peak_mb is the cumulative RSS peak of
+the whole benchmark process after the stage (ru_maxrss), not a per-stage value.
+
+Output (one JSON object per stage and scale, appended):
+  outputs/bench/q4a_bench.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+import q4a_build_multicountry_panel
+import q4a_features
+import q4a_train
+from ds_exam.data.arrow_io import arrow_copy_path
+from ds_exam.data.panel_store import read_panel, write_panel
+from ds_exam.data.synthetic import synthetic_panel
+from ds_exam.pipeline.q5 import make_ranking, prepare_features
+
+ROOT = Path(__file__).resolve().parents[1]
+OUTFILE = ROOT / "outputs" / "bench" / "q4a_bench.jsonl"
+
+BASE_ENTITIES = 200
+STAGES = ("build", "features", "train", "rank")
+# Rolling RF/logit training (~14 splits x 2 models, run twice with memory on)
+# dominates everything else. Every scale trains by default; --train-max-scale
+# skips it above a given scale for quick runs.
+TRAIN_MAX_SCALE = None
+
+
+def git_rev() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        )
+        return out.stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def process_rss_peak_mb() -> float:
+    """High-water mark of the whole process so far (never goes down between stages)."""
+    # ru_maxrss is in KiB on Linux (bytes on macOS)
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+
+
+def point_scripts_at(data_dir: Path) -> None:
+    """The stage scripts read/write module-level paths; point them at data_dir."""
+    q4a_build_multicountry_panel.INPATH = data_dir / "q4a_panel_country_year.parquet"
+    q4a_build_multicountry_panel.OUTPATH = data_dir / "q4a_multicountry_panel.parquet"
+    q4a_features.INPATH = data_dir / "q4a_multicountry_panel.parquet"
+    q4a_features.OUTPATH = data_dir / "q4a_features.parquet"
+    q4a_features.TARGETS_OUTPATH = data_dir / "q4a_targets.parquet"
+    q4a_train.INPATH = data_dir / "q4a_features.parquet"
+    q4a_train.TARGETS_INPATH = data_dir / "q4a_targets.parquet"
+    q4a_train.OUT_METRICS = data_dir / "q4a_model_metrics.csv"
+    q4a_train.OUT_BY_SPLIT = data_dir / "q4a_model_metrics_by_split.csv"
+    q4a_train.OUT_PREDS = data_dir / "q4a_predictions.csv"
+
+
+def stage_fn(name: str, data_dir: Path):
+    if name == "build":
+        return q4a_build_multicountry_panel.main
+    if name == "features":
+        return q4a_features.main
+    if name == "train":
+        return q4a_train.main
+    if name == "rank":
+        feats = prepare_features(read_panel(data_dir / "q4a_features.parquet"))
+        return lambda: make_ranking(feats, recent_years=5)
+    raise ValueError(f"Unknown stage {name!r}")
+
+
+def measure(fn, memory: bool):
+    """(seconds, tracemalloc peak in MB or None); stage output is silenced."""
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        t0 = time.perf_counter()
+        fn()
+        seconds = time.perf_counter() - t0
+        peak = None
+        if memory:
+            tracemalloc.start()
+            try:
+                fn()
+                peak = tracemalloc.get_traced_memory()[1] / 1e6
+            finally:
+                tracemalloc.stop()
+    return seconds, peak
+
+
+def previous_results(path: Path) -> dict:
+    """Latest earlier record per (n_entities, n_indicators, stage)."""
+    last = {}
+    if path.exists():
+        for line in path.read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            r = json.loads(line)
+            if r.get("status") == "ok":
+                last[(r["n_entities"], r["n_indicators"], r["stage"])] = r
+    return last
+
+
+def main(
+    scales=(10, 100, 1000),
+    stages=STAGES,
+    base_entities: int = BASE_ENTITIES,
+    years=(1990, 2023),
+    n_indicators: int = 0,
+    memory: bool = True,
+    train_max_scale: Optional[float] = TRAIN_MAX_SCALE,
+    out: Path = OUTFILE,
+    seed: int = 0,
+) -> pd.DataFrame:
+    previous = previous_results(out)
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_rev": git_rev(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+    }
+    records = []
+
+    for scale in scales:
+        n_entities = max(1, int(round(base_entities * scale)))
+        panel = synthetic_panel(n_entities, years, n_indicators=n_indicators, seed=seed)
+        print(f"[bench] scale={scale}x entities={n_entities} rows={len(panel)}")
+
+        with tempfile.TemporaryDirectory(prefix="q4a_bench_") as tmp:
+            data_dir = Path(tmp)
+            write_panel(panel, data_dir / "q4a_panel_country_year.parquet")
+            point_scripts_at(data_dir)
+
+            for stage in stages:
+                rec = {
+                    **meta,
+                    "scale": scale,
+                    "n_entities": n_entities,
+                    "n_years": int(years[1] - years[0] + 1),
+                    "n_indicators": n_indicators,
+                    "rows": int(len(panel)),
+                    "stage": stage,
+                    "seconds": None,
+                    "peak_mb": None,
+                    "process_rss_peak_mb": None,
+                    "status": "ok",
+                }
+                if stage == "train" and train_max_scale is not None and scale > train_max_scale:
+                    rec["status"] = "skipped"
+                else:
+                    try:
+                        rec["seconds"], rec["peak_mb"] = measure(stage_fn(stage, data_dir), memory)
+                    except (Exception, SystemExit) as e:
+                        rec["status"] = f"failed: {e}"
+                rec["process_rss_peak_mb"] = round(process_rss_peak_mb(), 1)
+                records.append(rec)
+
+                prev = previous.get((n_entities, n_indicators, stage))
+                vs = ""
+                if rec["seconds"] is not None and prev and prev.get("seconds"):
+                    vs = f" ({rec['seconds'] / prev['seconds']:.2f}x vs {prev['git_rev']})"
+                shown = f"{rec['seconds']:.3f}s" if rec["seconds"] is not None else rec["status"]
+                print(f"  - {stage}: {shown}{vs}")
+
+            # load_mapped caches an Arrow copy of the features outside the temp dir
+            arrow_copy_path(data_dir / "q4a_features.parquet").unlink(missing_ok=True)
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "a", encoding="utf-8") as fh:
+        for rec in records:
+            fh.write(json.dumps(rec) + "\n")
+    print("Saved:", out)
+
+    table = pd.DataFrame(records)
+    print(table[["scale", "rows", "stage", "seconds", "peak_mb", "status"]].to_string(index=False))
+    return table
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmark the Q4A/Q5 chain on synthetic panels.")
+    ap.add_argument("--scales", nargs="+", type=float, default=[10, 100, 1000])
+    ap.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    ap.add_argument("--entities", type=int, default=BASE_ENTITIES, help="Entities at scale 1.")
+    ap.add_argument("--years", nargs=2, type=int, default=[1990, 2023], metavar=("MIN", "MAX"))
+    ap.add_argument("--indicators", type=int, default=0, help="Extra indicator columns.")
+    ap.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run.")
+    ap.add_argument(
+        "--train-max-scale",
+        type=float,
+        default=TRAIN_MAX_SCALE,
+        help="Skip the train stage above this scale (default: train at every scale).",
+    )
+    ap.add_argument("--out", type=Path, default=OUTFILE)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    main(
+        scales=[int(s) if float(s).is_integer() else s for s in args.scales],
+        stages=args.stages,
+        base_entities=args.entities,
+        years=tuple(args.years),
+        n_indicators=args.indicators,
+        memory=not args.no_memory,
+        train_max_scale=args.train_max_scale,
+        out=args.out,
+        seed=args.seed,
+    )
@@ -1,14 +1,26 @@
-from ds_exam.data.build_dataset import build_panel_mex_usa_1990_2023, save_panel
+import argparse
 
+from ds_exam.data.build_dataset import build_panel, build_panel_mex_usa_1990_2023, save_panel
 
-def main():
-    panel = build_panel_mex_usa_1990_2023(1990, 2023)
+
+def main(countries=None, start: int = 1990, end: int = 2023):
+    if countries is None:
+        panel = build_panel_mex_usa_1990_2023(start, end)
+    else:
+        # "all": every country in the local files (World Bank aggregates dropped)
+        panel = build_panel(None if countries == ["all"] else countries, years=(start, end))
     print(panel.head())
     print("\nMexico last 3:")
     print(panel[panel["iso3"] == "MEX"].tail(3))
+    print(f"\nCountries: {panel['iso3'].nunique()} | rows: {len(panel)}")
     save_panel(panel)
     print("\nSaved to data/processed/panel_country_year.(parquet|csv)")
 
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser(description="Build the Q1 country-year panel from local files.")
+    ap.add_argument("--countries", nargs="+", help="ISO3 codes or 'all' (default: MEX USA).")
+    ap.add_argument("--start", type=int, default=1990)
+    ap.add_argument("--end", type=int, default=2023)
+    args = ap.parse_args()
+    main(countries=args.countries, start=args.start, end=args.end)
@@ -2,6 +2,23 @@ import os
 import numpy as np
 import pandas as pd
 
+from ds_exam.pipeline.features import FEATURES
+
+# output column -> registry feature (Q4 keeps its own safe_log logs, intensity,
+# target and time trend)
+OUTPUT_FEATURES = {
+    "target": "decoupled_safe",
+    "ln_gdp": "ln_gdp_safe",
+    "ln_population": "ln_population_safe",
+    "ln_gdp_pc": "ln_gdp_pc_safe",
+    "co2_per_capita": "co2_per_capita",
+    "ln_co2_intensity": "ln_co2_mt_per_usd",
+    "d_ln_gdp_pc": "d_ln_gdp_pc_safe_lag1",
+    "d_co2_per_capita": "d_co2_per_capita_lag1",
+    "d_ln_co2_intensity": "d_ln_co2_mt_per_usd_lag1",
+    "year_norm": "year_z",
+}
+
 
 def find_repo_root():
     root = os.getcwd()
@@ -10,18 +27,13 @@ def find_repo_root():
     return root
 
 
-def safe_log(x):
-    x = pd.to_numeric(x, errors="coerce")
-    return np.log(x.replace([0, np.inf, -np.inf], np.nan))
-
-
 def main():
     root = find_repo_root()
     inpath = os.path.join(root, "data", "processed", "q4_multicountry_panel.parquet")
     outpath = os.path.join(root, "data", "processed", "q4_features.parquet")
 
     print("Reading:", inpath)
-    df = pd.read_parquet(inpath).sort_values(["iso3", "year"]).reset_index(drop=True)
+    df = pd.read_parquet(inpath)
 
     required = [
         "iso3",
@@ -37,38 +49,13 @@ def main():
             f"Missing required columns: {missing}\nAvailable: {list(df.columns)}"
         )
 
-    df["ln_gdp"] = safe_log(df["gdp_current_usd"])
-    df["ln_population"] = safe_log(df["population"])
-
-    df["gdp_pc"] = df["gdp_current_usd"] / df["population"]
-    df["ln_gdp_pc"] = safe_log(df["gdp_pc"])
-
-    # target: decoupling year (GDPpc up, CO2pc down)
-    df["ln_gdp_pc_lag1"] = df.groupby("iso3")["ln_gdp_pc"].shift(1)
-    df["co2_pc_lag1"] = df.groupby("iso3")["co2_per_capita"].shift(1)
-    df["d_ln_gdp_pc"] = df["ln_gdp_pc"] - df["ln_gdp_pc_lag1"]
-    df["d_co2_per_capita"] = df["co2_per_capita"] - df["co2_pc_lag1"]
-    df["target"] = ((df["d_ln_gdp_pc"] > 0) & (df["d_co2_per_capita"] < 0)).astype(int)
+    # target: decoupling year (GDPpc up, CO2pc down); only the features below
+    # (and their inputs) are computed
+    ff = FEATURES.frame(df)  # sorted by (iso3, year)
+    df = ff.compute(["iso3", "year"] + list(OUTPUT_FEATURES.values()))
+    df.columns = ["iso3", "year"] + list(OUTPUT_FEATURES)
 
-    df["co2_intensity"] = df["co2_mt"] / df["gdp_current_usd"]
-    df["ln_co2_intensity"] = safe_log(df["co2_intensity"])
-
-    df["ln_co2_intensity_lag1"] = df.groupby("iso3")["ln_co2_intensity"].shift(1)
-    df["d_ln_co2_intensity"] = df["ln_co2_intensity"] - df["ln_co2_intensity_lag1"]
-
-    df["year_norm"] = (df["year"] - df["year"].mean()) / df["year"].std()
-
-    feature_cols = [
-        "ln_gdp",
-        "ln_population",
-        "ln_gdp_pc",
-        "co2_per_capita",
-        "ln_co2_intensity",
-        "d_ln_gdp_pc",
-        "d_co2_per_capita",
-        "d_ln_co2_intensity",
-        "year_norm",
-    ]
+    feature_cols = [c for c in OUTPUT_FEATURES if c != "target"]
     keep_cols = ["iso3", "year", "target"] + feature_cols
 
     df_feat = (
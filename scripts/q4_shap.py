@@ -11,11 +11,12 @@ from pathlib import Path
 import warnings
 
 import numpy as np
-import pandas as pd
 
 from sklearn.ensemble import RandomForestClassifier
 import matplotlib.pyplot as plt
 
+from ds_exam.data.arrow_io import load_mapped
+
 warnings.filterwarnings("ignore")
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -25,7 +26,7 @@ DATA = ROOT / "data" / "processed"
 def load_features(max_samples=200):
     path = DATA / "q4_features.parquet"
     print("Reading:", path)
-    df = pd.read_parquet(path)
+    df = load_mapped(path)
 
     # y
     y = df["target"].astype(int)
@@ -1,6 +1,7 @@
 from pathlib import Path
-import numpy as np
-import pandas as pd
+
+from ds_exam.data.panel_store import read_panel, write_panel
+from ds_exam.pipeline.q4a import YEAR_MAX, YEAR_MIN, build_multicountry_panel
 
 ROOT = Path(__file__).resolve().parents[1]
 DATA = ROOT / "data" / "processed"
@@ -9,19 +10,7 @@ DATA = ROOT / "data" / "processed"
 INPATH = DATA / "q4a_panel_country_year.parquet"
 OUTPATH = DATA / "q4a_multicountry_panel.parquet"
 
-# Coverage guardrails (ajustables)
-YEAR_MIN = 1990
-YEAR_MAX = 2023
-MIN_YEARS_PER_COUNTRY = 20  # mínimo de años con datos completos por país
-
-REQUIRED_COLS = {
-    "iso3",
-    "year",
-    "gdp_current_usd",
-    "population",
-    # alguno de estos debe existir:
-    # "co2_per_capita" (preferido) o "co2_mt" (alternativo)
-}
+# Coverage guardrails: YEAR_MIN / YEAR_MAX / MIN_YEARS_PER_COUNTRY live in ds_exam.pipeline.q4a
 
 
 def main():
@@ -34,74 +23,16 @@ def main():
 
     print("Root:", ROOT)
     print("Reading:", INPATH)
-    df = pd.read_parquet(INPATH)
-
-    missing = REQUIRED_COLS - set(df.columns)
-    if missing:
-        raise SystemExit(
-            f"[Q4A] Input panel missing required columns: {sorted(missing)}"
-        )
-
-    if "co2_per_capita" not in df.columns and "co2_mt" not in df.columns:
-        raise SystemExit(
-            "[Q4A] Input must contain at least one of: co2_per_capita, co2_mt.\n"
-            f"Columns: {df.columns.tolist()}"
-        )
-
-    # ---- Basic cleaning ----
-    df = df.replace([np.inf, -np.inf], np.nan).copy()
-    df["year"] = pd.to_numeric(df["year"], errors="coerce").astype("Int64")
-    df = df.dropna(subset=["iso3", "year"]).copy()
-    df["year"] = df["year"].astype(int)
-
-    # restrict years
-    df = df[(df["year"] >= YEAR_MIN) & (df["year"] <= YEAR_MAX)].copy()
-
-    # co2_per_capita: prefer if available, else compute from co2_mt + population
-    # co2_mt should be "million tonnes". If you have "co2_kt", convert to mt first.
-    if "co2_per_capita" not in df.columns or df["co2_per_capita"].isna().mean() > 0.95:
-        # try to build co2_per_capita if possible
-        if "co2_mt" in df.columns:
-            # tons per person: (Mt * 1e6) / pop
-            df["co2_per_capita"] = (
-                pd.to_numeric(df["co2_mt"], errors="coerce") * 1e6
-            ) / pd.to_numeric(df["population"], errors="coerce")
-        else:
-            raise SystemExit("[Q4A] Cannot compute co2_per_capita (missing co2_mt).")
-
-    # ensure numeric
-    num_cols = ["gdp_current_usd", "population", "co2_per_capita"]
-    for c in num_cols:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
-
-    # ---- Drop rows missing core signals ----
-    df = df.dropna(
-        subset=["iso3", "year", "gdp_current_usd", "population", "co2_per_capita"]
-    ).copy()
-
-    # ---- Coverage filter: keep countries with enough usable years ----
-    years_per_iso = df.groupby("iso3")["year"].nunique().sort_values(ascending=False)
-    keep_iso = years_per_iso[years_per_iso >= MIN_YEARS_PER_COUNTRY].index
-    df = df[df["iso3"].isin(keep_iso)].copy()
-
-    # Sort + final sanity
-    df = df.sort_values(["iso3", "year"]).reset_index(drop=True)
+    # Only the analysis window is read (year filter pushed down to the partitions)
+    df = read_panel(INPATH, years=(YEAR_MIN, YEAR_MAX))
 
-    # Keep only the columns downstream expects (but keep country name if exists)
-    keep_cols = [
-        "country",
-        "iso3",
-        "year",
-        "gdp_current_usd",
-        "population",
-        "co2_per_capita",
-    ]
-    if "country" not in df.columns:
-        keep_cols.remove("country")
-    df = df[keep_cols].copy()
+    try:
+        df = build_multicountry_panel(df)
+    except ValueError as e:
+        raise SystemExit(f"[Q4A] {e}")
 
     OUTPATH.parent.mkdir(parents=True, exist_ok=True)
-    df.to_parquet(OUTPATH, index=False)
+    write_panel(df, OUTPATH)
 
     print("Saved:", OUTPATH)
     print("Final panel shape:", df.shape)
@@ -3,12 +3,17 @@ Q4A - Fetch full multi-country panel from World Bank API (ALL available countrie
 
 Run:
   PYTHONPATH=src python scripts/q4a_fetch_wb_panel.py
+  PYTHONPATH=src python scripts/q4a_fetch_wb_panel.py --incremental   # only missing/recent years
+  PYTHONPATH=src python scripts/q4a_fetch_wb_panel.py --float32       # float32 indicators
+  PYTHONPATH=src python scripts/q4a_fetch_wb_panel.py --refresh       # ignore cached WB responses
 
 Outputs:
   data/processed/q4a_panel_country_year.parquet
+  data/processed/q4a_panel_refresh_log.jsonl   (--incremental only)
 
 Notes:
-- Pulls ALL WB countries except those with region == "Aggregates".
+- Pulls ALL WB countries except those with region == "Aggregates"
+  (country list from the persisted registry, see ds_exam.data.countries).
 - Years: 1990-2023 (editable below)
 - Indicators:
     GDP (current US$):        NY.GDP.MKTP.CD
@@ -21,194 +26,76 @@ Notes:
 
 from __future__ import annotations
 from pathlib import Path
-import time
-import json
-import math
-import requests
-import pandas as pd
+import argparse
 import numpy as np
 
+from ds_exam.config.indicators import codes_by_column
+from ds_exam.data.countries import CountryRegistry, load_country_registry
+from ds_exam.data.panel import assemble_panel
+from ds_exam.data.panel_store import read_panel, write_panel
+from ds_exam.data.quality import quality_report, summarize_report
+from ds_exam.data.refresh import merge_panel_delta, record_refresh, refresh_start_year
+from ds_exam.data.wb_api import default_config, shared_client
+from ds_exam.pipeline.q4a import fetch_wb_panel
+
 ROOT = Path(__file__).resolve().parents[1]
 DATA = ROOT / "data" / "processed"
 OUT = DATA / "q4a_panel_country_year.parquet"
-
-WB = "https://api.worldbank.org/v2"
+REFRESH_LOG = DATA / "q4a_panel_refresh_log.jsonl"
 
 YEARS_MIN = 1990
 YEARS_MAX = 2023
-
-INDICATORS = {
-    "gdp_current_usd": "NY.GDP.MKTP.CD",
-    "population": "SP.POP.TOTL",
-    "co2_kt": "EN.ATM.CO2E.KT",
-    "co2_per_capita": "EN.ATM.CO2E.PC",
-}
-
-SESSION = requests.Session()
-SESSION.headers.update({"User-Agent": "ds-practical-exam-q4a/1.0"})
-
-
-def _get_json(
-    url: str, params: dict | None = None, retries: int = 5, backoff: float = 1.2
+# --incremental always re-fetches the last N stored years (WB revises recent data)
+RECENT_YEARS = 2
+
+# column -> WB code, from the shared registry (ds_exam.config.indicators)
+INDICATORS = codes_by_column(["gdp_current_usd", "population", "co2_kt", "co2_per_capita"])
+
+def fetch_all_countries(refresh: bool = False) -> CountryRegistry:
+    # Persisted registry (data/interim/wb_countries.parquet); hits /country only
+    # the first time or with refresh=True (--refresh-countries)
+    registry = load_country_registry(refresh=refresh)
+    print(f"[Q4A] Countries in registry (non-aggregates): {len(registry)}")
+    return registry
+
+
+def main(
+    incremental: bool = False,
+    refresh_countries: bool = False,
+    float32: bool = False,
+    cache: bool = True,
+    refresh: bool = False,
 ):
-    last_err = None
-    for i in range(retries):
-        try:
-            r = SESSION.get(url, params=params, timeout=60)
-            r.raise_for_status()
-            return r.json()
-        except Exception as e:
-            last_err = e
-            time.sleep(backoff ** (i + 1))
-    raise RuntimeError(
-        f"[WB] Failed after {retries} retries: {url}\nLast error: {last_err}"
-    )
-
-
-def fetch_all_countries() -> pd.DataFrame:
-    # World Bank countries list is paginated
-    per_page = 400
-    page = 1
-    rows = []
-
-    while True:
-        url = f"{WB}/country"
-        js = _get_json(
-            url, params={"format": "json", "per_page": per_page, "page": page}
-        )
-        meta, data = js[0], js[1]
-        for c in data:
-            # Exclude aggregates
-            if (c.get("region") or {}).get("value") == "Aggregates":
-                continue
-            iso3 = c.get("id")
-            name = c.get("name")
-            if not iso3 or iso3.strip() == "":
-                continue
-            rows.append({"iso3": iso3, "country": name})
-        if page >= int(meta.get("pages", 1)):
-            break
-        page += 1
-
-    df = pd.DataFrame(rows).drop_duplicates().sort_values("iso3").reset_index(drop=True)
-    print(f"[Q4A] Countries fetched (non-aggregates): {len(df)}")
-    return df
-
-
-def fetch_indicator_long(
-    indicator_code: str, value_name: str, years_min: int, years_max: int
-) -> pd.DataFrame:
-    """
-    Robust WB fetch: handles non-standard responses:
-      - [] (empty)
-      - {"message":[...]} (errors)
-      - [meta] without data (throttling)
-    Returns empty DF if indicator/page unavailable.
-    """
-    import time
-
-    per_page = 20000
-    page = 1
-    out = []
-    date = f"{years_min}:{years_max}"
-
-    while True:
-        url = f"{WB}/country/all/indicator/{indicator_code}"
-
-        # retry loop for transient WB glitches/throttling
-        js = None
-        for attempt in range(5):
-            js = _get_json(
-                url,
-                params={
-                    "format": "json",
-                    "per_page": per_page,
-                    "page": page,
-                    "date": date,
-                },
-            )
-
-            ok = isinstance(js, list) and len(js) >= 2 and isinstance(js[0], dict)
-            if ok:
-                break
-
-            # non-standard payload; backoff and retry
-            wait = 0.75 * (2**attempt)
-            print(
-                f"[Q4A] WARNING: Non-standard WB response for {indicator_code} page={page} (attempt {attempt+1}/5). Backoff {wait:.1f}s"
-            )
-            try:
-                preview = str(js)[:200]
-            except Exception:
-                preview = "<unprintable>"
-            print(f"[Q4A] Preview: {preview}")
-            time.sleep(wait)
-
-        # if still not ok, stop gracefully (no crash)
-        if not (isinstance(js, list) and len(js) >= 2):
-            print(
-                f"[Q4A] ERROR: Giving up on {indicator_code} page={page}. Returning empty/partial data."
-            )
-            break
-
-        meta, data = js[0], js[1]
-
-        if data is None:
-            break
-
-        # data sometimes comes as dict with message
-        if isinstance(data, dict) and "message" in data:
-            print(
-                f"[Q4A] WARNING: WB message for {indicator_code}: {data.get('message')}"
-            )
-            break
-
-        if not isinstance(data, list) or len(data) == 0:
-            break
-
-        for r in data:
-            iso3 = r.get("countryiso3code")
-            year = r.get("date")
-            val = r.get("value")
-            if not iso3 or not year:
-                continue
-            try:
-                y = int(year)
-            except Exception:
-                continue
-            out.append({"iso3": iso3, "year": y, value_name: val})
-
-        pages = int(meta.get("pages", 1)) if isinstance(meta, dict) else 1
-        if page >= pages:
-            break
-        page += 1
-
-    df = pd.DataFrame(out)
-    if df.empty:
-        return pd.DataFrame(columns=["iso3", "year", value_name])
-
-    df[value_name] = pd.to_numeric(df[value_name], errors="coerce")
-    return df
-
-
-def main():
     DATA.mkdir(parents=True, exist_ok=True)
-
-    countries = fetch_all_countries()
-
-    longs = []
-    for col, code in INDICATORS.items():
-        print(f"[Q4A] Fetching indicator {col} ({code}) ...")
-        dfi = fetch_indicator_long(code, col, YEARS_MIN, YEARS_MAX)
-        longs.append(dfi)
-
-    # Merge all indicators on iso3-year
-    df = longs[0]
-    for dfi in longs[1:]:
-        df = df.merge(dfi, on=["iso3", "year"], how="outer")
-
-    # Keep only real countries (exclude aggregates again via join)
-    df = df.merge(countries, on="iso3", how="inner")
+    # Shared pooled transport (keep-alive, gzip, rate limiter, response cache).
+    # --incremental re-requests the same URLs as the last run, so it skips
+    # cached responses (they would hide WB revisions) and stores the new ones.
+    client = shared_client(default_config(cache=cache, refresh=refresh or incremental))
+
+    stored = None
+    year_from = YEARS_MIN
+    if incremental:
+        if OUT.exists():
+            stored = read_panel(OUT)
+            year_from = refresh_start_year(stored, YEARS_MIN, YEARS_MAX, RECENT_YEARS)
+            print(f"[Q4A] Incremental refresh: fetching years {year_from}-{YEARS_MAX}")
+        else:
+            print(f"[Q4A] No stored panel at {OUT}; doing a full fetch.")
+
+    countries = fetch_all_countries(refresh=refresh_countries)
+
+    # All indicators share the WDI source: one semicolon-joined request
+    print(f"[Q4A] Fetching indicators {', '.join(INDICATORS.values())} ...")
+    dfi = fetch_wb_panel(list(INDICATORS), year_from, YEARS_MAX, client)
+    # Keep only real countries (registry mask drops aggregates)
+    dfi = dfi[countries.country_mask(dfi["iso3"])]
+
+    # iso3-year panel with the shared schema; coverage comes for free
+    df, coverage = assemble_panel([dfi])
+    print("[Q4A] Fetched coverage by indicator:")
+    print(coverage.to_string(index=False))
+
+    df["country"] = countries.names(df["iso3"]).to_numpy()
 
     # Compute co2_mt from kt (1 kt = 0.001 Mt)
     if "co2_kt" in df.columns:
@@ -234,23 +121,63 @@ def main():
         .reset_index(drop=True)
     )
 
+    if stored is not None:
+        df, stats = merge_panel_delta(stored, df)
+        record_refresh(
+            REFRESH_LOG,
+            script="q4a_fetch_wb_panel",
+            years=[year_from, YEARS_MAX],
+            indicators=list(INDICATORS.values()),
+            **stats,
+        )
+        print(
+            f"[Q4A] Refresh merged: +{stats['rows_added']} new rows, "
+            f"{stats['rows_updated']} updated (log: {REFRESH_LOG})"
+        )
+
     # Basic coverage report
     n_c = df["iso3"].nunique()
     yrs = (int(df["year"].min()), int(df["year"].max()))
     print(f"[Q4A] Panel rows: {len(df)} | Countries: {n_c} | Years range: {yrs}")
-    print("[Q4A] Missingness (%):")
-    miss = (
-        df[["gdp_current_usd", "population", "co2_mt", "co2_per_capita"]]
-        .isna()
-        .mean()
-        .sort_values(ascending=False)
-    )
-    for k, v in miss.items():
-        print(f"  - {k}: {v*100:.1f}%")
+    print("[Q4A] Quality:")
+    print("\n".join(summarize_report(quality_report(df))))
 
-    df.to_parquet(OUT, index=False)
+    write_panel(df, OUT, value_dtype="float32" if float32 else None)
     print("\nSaved:", OUT)
 
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser(description="Fetch the Q4A World Bank panel.")
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Read the stored panel and fetch only missing/recent years.",
+    )
+    ap.add_argument(
+        "--refresh-countries",
+        action="store_true",
+        help="Re-download the World Bank country registry.",
+    )
+    ap.add_argument(
+        "--float32",
+        action="store_true",
+        help="Store indicator columns as float32 (half the memory downstream).",
+    )
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the World Bank response cache.",
+    )
+    ap.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached World Bank responses and re-download them (implied by --incremental).",
+    )
+    args = ap.parse_args()
+    main(
+        incremental=args.incremental,
+        refresh_countries=args.refresh_countries,
+        float32=args.float32,
+        cache=not args.no_cache,
+        refresh=args.refresh,
+    )
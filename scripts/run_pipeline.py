@@ -0,0 +1,86 @@
+"""
+Run the Q4A/Q5 (or Q4) pipeline, skipping stages whose inputs, arguments and
+code did not change since their last successful run.
+
+Run:
+  PYTHONPATH=src python scripts/run_pipeline.py                      # q4a chain + Q5
+  PYTHONPATH=src python scripts/run_pipeline.py --pipeline q4        # q1 -> q4 chain
+  PYTHONPATH=src python scripts/run_pipeline.py --only q4a_train     # a stage + its upstream
+  PYTHONPATH=src python scripts/run_pipeline.py --force q4a_fetch    # re-download the panel
+  PYTHONPATH=src python scripts/run_pipeline.py --dry-run
+  PYTHONPATH=src python scripts/run_pipeline.py --in-memory --write  # one process, no parquet hand-offs
+
+State:
+  data/processed/.pipeline_state.json
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from ds_exam.pipeline.inprocess import run_q4a_in_memory
+from ds_exam.pipeline.runner import PipelineRunner
+from ds_exam.pipeline.stages import PIPELINES
+
+
+def main(
+    pipeline: str = "q4a",
+    only=None,
+    force=(),
+    dry_run: bool = False,
+    workers: int = 2,
+    in_memory: bool = False,
+    write: bool = False,
+) -> int:
+    if in_memory:
+        if pipeline != "q4a":
+            raise SystemExit("[pipeline] --in-memory is only available for the q4a pipeline.")
+        run = run_q4a_in_memory(write=write)
+        print("\n[pipeline] In-memory stage times (s):")
+        for name, sec in run.seconds.items():
+            print(f"  - {name}: {sec:.2f}")
+        print("\n[Q4A] Average across splits:\n", run.metrics.sort_values("f1", ascending=False))
+        print("\n[Q5] Top 10:\n", run.ranking[["rank", "iso3", "priority_score"]].head(10))
+        return 0
+
+    runner = PipelineRunner(PIPELINES[pipeline], max_workers=workers)
+    force = list(runner.stages) if "all" in force else list(force)
+    status = runner.run(targets=only or None, force=force, dry_run=dry_run)
+
+    print("\n[pipeline] Summary:")
+    for name, st in status.items():
+        print(f"  - {name}: {st}")
+    return 1 if any(st in ("failed", "not run") for st in status.values()) else 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Run the project pipeline incrementally.")
+    ap.add_argument("--pipeline", choices=sorted(PIPELINES), default="q4a")
+    ap.add_argument("--only", nargs="+", metavar="STAGE", help="Run these stages (and their upstream).")
+    ap.add_argument(
+        "--force",
+        nargs="+",
+        metavar="STAGE",
+        default=[],
+        help="Re-run these stages even if unchanged ('all' for every stage).",
+    )
+    ap.add_argument("--dry-run", action="store_true", help="Only report what would run.")
+    ap.add_argument("--workers", type=int, default=2, help="Stages run in parallel (default 2).")
+    ap.add_argument(
+        "--in-memory",
+        action="store_true",
+        help="Run build -> features -> train + Q5 in one process from the stored panel.",
+    )
+    ap.add_argument("--write", action="store_true", help="With --in-memory, also write all outputs.")
+    args = ap.parse_args()
+    raise SystemExit(
+        main(
+            pipeline=args.pipeline,
+            only=args.only,
+            force=args.force,
+            dry_run=args.dry_run,
+            workers=args.workers,
+            in_memory=args.in_memory,
+            write=args.write,
+        )
+    )
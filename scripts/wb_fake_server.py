@@ -0,0 +1,160 @@
+"""
+Local stand-in for the World Bank API v2 (ds_exam.data.wb_fake).
+
+Run:
+  # serve synthetic data (and recorded fixtures, if any) until Ctrl-C
+  PYTHONPATH=src python scripts/wb_fake_server.py serve --port 8765 --latency 0.05 --p-429 0.05
+  WB_BASE_URL=http://127.0.0.1:8765/v2 PYTHONPATH=src python scripts/q4a_fetch_panel_all.py
+
+  # record the real responses the fetch scripts use into fixtures
+  PYTHONPATH=src python scripts/wb_fake_server.py record
+
+  # time the client against the fake server (no network) for several worker counts
+  PYTHONPATH=src python scripts/wb_fake_server.py bench --latency 0.05 --workers 1 4 8
+
+Fixtures:
+  data/raw/wb_fixtures/*.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from ds_exam.config import settings
+from ds_exam.config.indicators import get_indicators
+from ds_exam.data.rate_limit import AdaptiveRateLimiter
+from ds_exam.data.wb_api import WBClientConfig, WorldBankClient
+from ds_exam.data.wb_fake import (
+    FakeWorldBankServer,
+    FaultConfig,
+    SyntheticWorldBank,
+    record_fixtures,
+)
+
+FIXTURES_DIR = settings.DATA_RAW / "wb_fixtures"
+
+YEARS_MIN = 1990
+YEARS_MAX = 2023
+# Same requests as fetch_countries and the q4a fetch scripts
+RECORD_PER_PAGE = 20000
+
+
+def faults_from_args(args) -> FaultConfig:
+    return FaultConfig(
+        latency_s=args.latency,
+        jitter_s=args.jitter,
+        p_429=args.p_429,
+        p_503=args.p_503,
+        p_meta_only=args.p_meta_only,
+        p_message=args.p_message,
+        retry_after_s=args.retry_after,
+        fail_first=args.fail_first,
+        seed=args.seed,
+    )
+
+
+def make_server(args) -> FakeWorldBankServer:
+    fixtures = args.fixtures if args.fixtures.exists() else None
+    synthetic = False if args.fixtures_only else SyntheticWorldBank(n_countries=args.countries)
+    return FakeWorldBankServer(
+        port=args.port, fixtures_dir=fixtures, synthetic=synthetic, faults=faults_from_args(args)
+    )
+
+
+def serve(args) -> None:
+    srv = make_server(args).start()
+    print(f"[wb-fake] Serving on {srv.base_url} ({len(srv.fixtures)} fixtures)")
+    print(f"[wb-fake] export WB_BASE_URL={srv.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.stop()
+        print("[wb-fake] Responses:", dict(srv.stats))
+
+
+def record(args) -> None:
+    client = WorldBankClient(WBClientConfig(base_url=args.base_url))
+    date = f"{args.years[0]}:{args.years[1]}"
+    calls = [("country", {"per_page": 400})]
+    calls += [
+        (f"country/all/indicator/{ind.code}", {"per_page": RECORD_PER_PAGE, "date": date})
+        for ind in get_indicators()
+    ]
+    for endpoint, params in calls:
+        print(f"[wb-fake] Recording {endpoint} {params}")
+    written = record_fixtures(calls, args.fixtures, client=client)
+    print(f"[wb-fake] Saved {len(written)} pages to {args.fixtures}")
+
+
+def bench(args) -> None:
+    indicators = get_indicators(["gdp_current_usd", "population"])
+    date = f"{args.years[0]}:{args.years[1]}"
+    with make_server(args) as srv:
+        for workers in args.workers:
+            for cached in (False, True) if args.cache else (False,):
+                with tempfile.TemporaryDirectory(prefix="wb_fake_cache_") as cache_dir:
+                    config = WBClientConfig(
+                        base_url=srv.base_url,
+                        per_page=args.per_page,
+                        max_workers=workers,
+                        max_retries=args.max_retries,
+                        cache_dir=cache_dir if cached else None,
+                    )
+                    client = WorldBankClient(config, limiter=AdaptiveRateLimiter())
+                    srv.stats.clear()
+                    runs = 2 if cached else 1  # second run is served from the cache
+                    for _ in range(runs):
+                        t0 = time.perf_counter()
+                        panel = client.fetch_indicator_panel(indicators, date=date)
+                        sec = time.perf_counter() - t0
+                    label = "cache warm" if cached else "no cache"
+                    print(
+                        f"[wb-fake] workers={workers} {label}: {sec:.2f}s "
+                        f"rows={len(panel)} responses={dict(srv.stats)}"
+                    )
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local fake World Bank API v2.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    common.add_argument("--years", nargs=2, type=int, default=[YEARS_MIN, YEARS_MAX])
+
+    server_opts = argparse.ArgumentParser(add_help=False)
+    server_opts.add_argument("--port", type=int, default=0, help="0 = any free port.")
+    server_opts.add_argument("--countries", type=int, default=200, help="Synthetic countries.")
+    server_opts.add_argument("--fixtures-only", action="store_true", help="No synthetic fallback.")
+    server_opts.add_argument("--latency", type=float, default=0.0, help="Seconds per response.")
+    server_opts.add_argument("--jitter", type=float, default=0.0)
+    server_opts.add_argument("--p-429", type=float, default=0.0)
+    server_opts.add_argument("--p-503", type=float, default=0.0)
+    server_opts.add_argument("--p-meta-only", type=float, default=0.0)
+    server_opts.add_argument("--p-message", type=float, default=0.0)
+    server_opts.add_argument("--retry-after", type=float, default=0.0)
+    server_opts.add_argument("--fail-first", type=int, default=0)
+    server_opts.add_argument("--seed", type=int, default=0)
+
+    p_serve = sub.add_parser("serve", parents=[common, server_opts], help="Run the server.")
+    p_serve.set_defaults(fn=serve)
+
+    p_record = sub.add_parser("record", parents=[common], help="Record real responses.")
+    p_record.add_argument("--base-url", default="https://api.worldbank.org/v2")
+    p_record.set_defaults(fn=record)
+
+    p_bench = sub.add_parser("bench", parents=[common, server_opts], help="Time the client.")
+    p_bench.add_argument("--workers", nargs="+", type=int, default=[1, 4])
+    p_bench.add_argument("--per-page", type=int, default=1000)
+    p_bench.add_argument("--max-retries", type=int, default=8)
+    p_bench.add_argument("--cache", action="store_true", help="Also time a warm response cache.")
+    p_bench.set_defaults(fn=bench)
+
+    args = ap.parse_args()
+    args.fn(args)
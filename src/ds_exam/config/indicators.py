@@ -0,0 +1,64 @@
+"""
+Registro de indicadores World Bank usados en el proyecto.
+
+Cada indicador declara su código WB, unidad, source id (la API sólo acepta
+varios indicadores en un mismo request si comparten `source`) y el nombre de
+la columna destino en los paneles.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+# World Bank source ids
+WDI = 2  # World Development Indicators
+
+
+@dataclass(frozen=True)
+class Indicator:
+    column: str
+    code: str
+    unit: str
+    source_id: int = WDI
+    name: str = ""
+
+
+INDICATORS: Dict[str, Indicator] = {
+    ind.column: ind
+    for ind in [
+        Indicator("gdp_current_usd", "NY.GDP.MKTP.CD", "current US$", WDI, "GDP (current US$)"),
+        Indicator("population", "SP.POP.TOTL", "people", WDI, "Population, total"),
+        Indicator("co2_kt", "EN.ATM.CO2E.KT", "kt", WDI, "CO2 emissions (kt)"),
+        Indicator(
+            "co2_per_capita",
+            "EN.ATM.CO2E.PC",
+            "metric tons per capita",
+            WDI,
+            "CO2 emissions (metric tons per capita)",
+        ),
+    ]
+}
+
+
+def get_indicators(columns: Optional[Iterable[str]] = None) -> List[Indicator]:
+    """Indicadores para las columnas pedidas (todos si columns=None)."""
+    if columns is None:
+        return list(INDICATORS.values())
+    missing = [c for c in columns if c not in INDICATORS]
+    if missing:
+        raise KeyError(f"Unknown indicator columns: {missing}. Known: {sorted(INDICATORS)}")
+    return [INDICATORS[c] for c in columns]
+
+
+def codes_by_column(columns: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """{columna: código WB}, el formato de los dicts INDICATORS/WB_IND de los scripts."""
+    return {ind.column: ind.code for ind in get_indicators(columns)}
+
+
+def group_by_source(indicators: Iterable[Indicator]) -> Dict[int, List[Indicator]]:
+    """Agrupa por source id: cada grupo se puede pedir en un solo request."""
+    groups: Dict[int, List[Indicator]] = {}
+    for ind in indicators:
+        groups.setdefault(ind.source_id, []).append(ind)
+    return groups
@@ -0,0 +1,26 @@
+"""
+Rutas y settings compartidos del proyecto.
+
+Los scripts siguen definiendo su propio ROOT/DATA; este módulo sólo centraliza
+lo que usa el código de librería (caches, datos intermedios, endpoint WB).
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+
+DATA_DIR = ROOT / "data"
+DATA_RAW = DATA_DIR / "raw"
+DATA_INTERIM = DATA_DIR / "interim"
+DATA_PROCESSED = DATA_DIR / "processed"
+
+# On-disk cache for World Bank API responses (see ds_exam.data.wb_cache)
+WB_CACHE_DIR = DATA_DIR / "cache" / "worldbank"
+
+# World Bank API endpoint; override to point the fetch scripts at a local stand-in
+WB_BASE_URL = os.environ.get("WB_BASE_URL", "https://api.worldbank.org/v2")
+# WB_OFFLINE=1 serves World Bank responses only from WB_CACHE_DIR (no network)
+WB_OFFLINE = os.environ.get("WB_OFFLINE", "") == "1"
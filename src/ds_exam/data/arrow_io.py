@@ -0,0 +1,152 @@
+"""
+Copias Arrow IPC (Feather v2, sin compresión) de los paneles, leídas con mmap.
+
+Los parquet de features se descomprimen y copian a memoria en cada stage que
+los lee. Una copia .arrow sin compresión se puede mapear en memoria: abrirla
+no lee datos y varios procesos (trainers, SHAP, Q5) comparten las mismas
+páginas del page cache.
+
+- ensure_arrow_copy: crea/actualiza data/interim/arrow/<nombre>-<hash>.arrow desde el parquet
+- open_mapped: pa.Table sobre el archivo mapeado
+- load_mapped: DataFrame con columnas float como vistas NumPy (o ArrowDtype)
+- numpy_views: vistas NumPy zero-copy por columna
+
+En la copia los nulls de columnas float se guardan como NaN (sin bitmap de
+validez), que es lo que permite las vistas zero-copy.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+
+from ds_exam.config import settings
+from ds_exam.data.panel_store import read_panel
+from ds_exam.data.schema import read_schema_metadata, schema_metadata
+
+ARROW_DIR = settings.DATA_INTERIM / "arrow"
+ARROW_SUFFIXES = (".arrow", ".feather")
+DTYPE_BACKENDS = ("numpy", "pyarrow")
+
+
+def arrow_copy_path(source: Union[str, Path], arrow_dir: Union[str, Path] = ARROW_DIR) -> Path:
+    """<stem>-<hash de la ruta absoluta>.arrow: parquets homónimos no comparten copia."""
+    source = Path(source).resolve()
+    tag = hashlib.sha1(str(source).encode("utf-8")).hexdigest()[:10]
+    return Path(arrow_dir) / f"{source.stem}-{tag}.arrow"
+
+
+def _mtime(path: Path) -> float:
+    if path.is_dir():
+        return max((p.stat().st_mtime for p in path.rglob("*.parquet")), default=0.0)
+    return path.stat().st_mtime
+
+
+def _nan_for_null(table: pa.Table) -> pa.Table:
+    """Floats: null -> NaN, un solo chunk por columna."""
+    cols = []
+    for field, col in zip(table.schema, table.columns):
+        if pa.types.is_floating(field.type) and col.null_count:
+            col = pc.fill_null(col, pa.scalar(np.nan, field.type))
+        cols.append(col)
+    return pa.Table.from_arrays(cols, schema=table.schema).combine_chunks()
+
+
+def ensure_arrow_copy(
+    source: Union[str, Path],
+    arrow_dir: Union[str, Path] = ARROW_DIR,
+    refresh: bool = False,
+) -> Path:
+    """
+    Ruta de la copia .arrow de `source` (parquet o dataset particionado).
+
+    Se regenera si no existe, si el parquet es más nuevo o con refresh=True.
+    La escritura es atómica, así que procesos en paralelo pueden llamarla a la vez.
+    """
+    source = Path(source)
+    if not source.exists():
+        raise FileNotFoundError(f"No existe el panel: {source}")
+    dest = arrow_copy_path(source, arrow_dir)
+    if dest.exists() and not refresh and dest.stat().st_mtime >= _mtime(source):
+        return dest
+
+    df = read_panel(source)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, **schema_metadata(df)})
+    table = _nan_for_null(table)
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f"{dest.name}.{os.getpid()}.part")
+    # Uncompressed: compressed buffers would have to be decoded into fresh memory.
+    feather.write_feather(table, tmp, compression="uncompressed")
+    tmp.replace(dest)
+    return dest
+
+
+def open_mapped(path: Union[str, Path], columns: Optional[Sequence[str]] = None) -> pa.Table:
+    """Tabla Arrow respaldada por el archivo mapeado (no lee datos al abrir)."""
+    table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    if columns is not None:
+        missing = [c for c in columns if c not in table.column_names]
+        if missing:
+            raise KeyError(f"Columns not in {path}: {missing}")
+        table = table.select(list(columns))
+    return table
+
+
+def numpy_views(table: pa.Table, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    {columna: vista NumPy de sólo lectura} sin copiar.
+
+    Sólo columnas numéricas sin nulls (ArrowInvalid en otro caso).
+    """
+    names = list(columns) if columns is not None else table.column_names
+    out = {}
+    for name in names:
+        col = table.column(name)
+        chunk = col.chunk(0) if col.num_chunks == 1 else col.combine_chunks()
+        out[name] = chunk.to_numpy(zero_copy_only=True)
+    return out
+
+
+def load_mapped(
+    source: Union[str, Path],
+    columns: Optional[Sequence[str]] = None,
+    dtype_backend: str = "numpy",
+    arrow_dir: Union[str, Path] = ARROW_DIR,
+) -> pd.DataFrame:
+    """
+    Panel como DataFrame sobre la copia Arrow mapeada en memoria.
+
+    - source: parquet/dataset (se usa su copia en arrow_dir) o un .arrow/.feather
+    - dtype_backend="numpy": columnas float/int como vistas de sólo lectura del
+      archivo, iso3/country category (como read_panel)
+    - dtype_backend="pyarrow": todas las columnas pd.ArrowDtype, sin conversión
+
+    Las operaciones que modifican columnas devuelven copias como siempre; lo
+    que no se hace es asignar en sitio sobre las vistas (son read-only).
+    """
+    if dtype_backend not in DTYPE_BACKENDS:
+        raise ValueError(f"dtype_backend must be one of {DTYPE_BACKENDS}, got {dtype_backend!r}")
+    source = Path(source)
+    path = source if source.suffix in ARROW_SUFFIXES else ensure_arrow_copy(source, arrow_dir)
+
+    table = open_mapped(path, columns)
+    if dtype_backend == "pyarrow":
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
+    else:
+        # split_blocks: one block per column, so null-free numeric columns stay views.
+        df = table.to_pandas(split_blocks=True)
+
+    schema = read_schema_metadata(table.schema.metadata)
+    if schema is not None:
+        df.attrs["panel_schema"] = schema
+    return df
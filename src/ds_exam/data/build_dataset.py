@@ -0,0 +1,426 @@
+"""
+Panel país-año de Q1–Q3 a partir de archivos locales (WDI + OWID).
+
+- build_panel: cualquier conjunto de países y años; cada fuente se lee una
+  sola vez (todas las columnas de años a la vez), wide -> long con numpy,
+  conversión de unidades por factor y un solo join (assemble_panel)
+- build_panel_mex_usa_1990_2023: el panel original de Q1 (MEX/USA)
+- save_panel: parquet + CSV desde una sola tabla arrow
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+from ds_exam.config import settings
+from ds_exam.data.panel import assemble_panel
+from ds_exam.data.schema import enforce_panel_schema, schema_metadata
+
+RAW_WB_DIR = settings.DATA_RAW / "worldbank"
+RAW_OWID_DIR = settings.DATA_RAW / "owid"
+
+PANEL_COLUMNS = [
+    "country",
+    "iso3",
+    "year",
+    "gdp_current_usd",
+    "population",
+    "co2_mt",
+    "co2_per_capita",
+]
+
+
+@dataclass(frozen=True)
+class PanelSource:
+    """
+    Una columna del panel leída de un archivo local.
+
+    - path: ruta (o glob) relativa a data/raw, o absoluta
+    - field: código de indicador (kind="wdi", CSV wide con una columna por año)
+      o nombre de columna (kind="owid", CSV long iso_code/year/...)
+    - scale: factor a la unidad de destino (p. ej. kt -> Mt = 1e-3)
+    """
+
+    column: str
+    path: str
+    field: str
+    kind: str = "wdi"
+    scale: float = 1.0
+
+
+DEFAULT_SOURCES: Tuple[PanelSource, ...] = (
+    PanelSource("gdp_current_usd", "worldbank/API_NY.GDP.MKTP.CD_*.csv", "NY.GDP.MKTP.CD"),
+    PanelSource("population", "worldbank/API_SP.POP.TOTL_*.csv", "SP.POP.TOTL"),
+    PanelSource("co2_mt", "owid/owid-co2-data.csv", "co2", kind="owid"),
+)
+
+# Valores faltantes que se rellenan hacia adelante dentro de cada país
+# (el PIB del último año suele publicarse tarde en WDI). Sólo el hueco final:
+# como mucho FFILL_LIMIT años después de la última observación del país.
+FFILL_COLUMNS = ("gdp_current_usd",)
+FFILL_LIMIT = 1
+
+def _detect_country_cols(df: pd.DataFrame) -> tuple[str, str]:
+    """
+    Intenta detectar columnas de país y código ISO3 en diferentes formatos
+    de exportación de World Bank / DataBank.
+    """
+    cols = [c.strip() for c in df.columns]
+    df.columns = cols
+
+    # Nombres típicos (WDI bulk)
+    if "Country Name" in cols and "Country Code" in cols:
+        return "Country Name", "Country Code"
+
+    # Variantes comunes
+    if "Country" in cols and "Country Code" in cols:
+        return "Country", "Country Code"
+
+    # Si nada coincide, fallamos con mensaje útil
+    raise ValueError(
+        "No se pudieron detectar columnas de país. Columnas disponibles: "
+        + ", ".join(cols[:30])
+    )
+
+
+def load_co2_kt_from_databank(
+    filename: str = "co2_kt_databank.csv",
+    start_year: int = 2010,
+    end_year: int = 2020,
+    indicator_code: str = "EN.ATM.CO2E.KT",
+) -> pd.DataFrame:
+    """
+    Carga CO2 emissions (kt) desde un CSV de DataBank.
+
+    Funciona con 2 formatos:
+    A) Export por indicador (NO trae 'Indicator Code')
+    B) WDI bulk (trae 'Indicator Code' y hay que filtrar)
+    """
+    path = RAW_WB_DIR / filename
+    if not path.exists():
+        raise FileNotFoundError(f"No existe el archivo: {path}")
+
+    # Algunos archivos tienen encabezados largos: probamos sin skip y con skip=4
+    try:
+        df = pd.read_csv(path)
+        if len(df.columns) <= 2:
+            raise ValueError("muy pocas columnas; probando skiprows=4")
+    except Exception:
+        df = pd.read_csv(path, skiprows=4)
+
+    df.columns = df.columns.astype(str).str.strip()
+
+    # Si existe Indicator Code, filtramos; si no, asumimos que ya es CO2
+    if "Indicator Code" in df.columns:
+        df = df[df["Indicator Code"] == indicator_code]
+
+    # Detectar columnas de país
+    country_name_col, country_code_col = _detect_country_cols(df)
+
+    # Detectar columnas de años
+    year_cols = [c for c in df.columns if c.isdigit()]
+    year_cols = [y for y in year_cols if start_year <= int(y) <= end_year]
+    if not year_cols:
+        raise ValueError(
+            "No encontré columnas de años. Revisa el archivo. "
+            f"Columnas: {list(df.columns)[:25]}"
+        )
+
+    # Wide -> long
+    long = df.melt(
+        id_vars=[country_name_col, country_code_col],
+        value_vars=year_cols,
+        var_name="year",
+        value_name="co2_kt",
+    )
+
+    long["year"] = long["year"].astype(int)
+
+    # Limpieza
+    long = long.rename(columns={country_name_col: "country", country_code_col: "iso3"})
+    long["iso3"] = long["iso3"].astype(str).str.strip()
+    long = long.dropna(subset=["co2_kt"])
+
+    # Orden
+    return long[["country", "iso3", "year", "co2_kt"]].sort_values(["iso3", "year"]).reset_index(drop=True)
+
+
+def _resolve(path: str, raw_dir: Path) -> Path:
+    p = Path(path)
+    if not p.is_absolute():
+        p = raw_dir / p
+    if any(ch in p.name for ch in "*?["):
+        matches = sorted(p.parent.glob(p.name))
+        if not matches:
+            raise FileNotFoundError(f"No hay archivos que coincidan con: {p}")
+        return matches[-1]
+    if not p.exists():
+        raise FileNotFoundError(f"No existe el archivo: {p}")
+    return p
+
+
+def _read_wdi_wide(path: Path) -> pd.DataFrame:
+    """CSV de WDI/DataBank en formato wide (con o sin las 4 líneas de encabezado)."""
+    with open(path, "r", encoding="utf-8-sig") as fh:
+        first = fh.readline()
+    skip = 0 if "Country" in first and first.count(",") > 2 else 4
+    df = pd.read_csv(path, skiprows=skip, encoding="utf-8-sig")
+    df.columns = df.columns.astype(str).str.strip()
+    return df
+
+
+def _wdi_long(
+    wide: pd.DataFrame,
+    sources: Sequence[PanelSource],
+    years: Tuple[int, int],
+    names: Dict[str, str],
+) -> List[pd.DataFrame]:
+    """
+    Frames long (iso3, year, columna) de un archivo wide, uno por fuente.
+
+    El archivo puede traer un indicador (export por indicador) o muchos
+    (WDI bulk con 'Indicator Code'); en ambos casos se lee una sola vez.
+    """
+    name_col, code_col = _detect_country_cols(wide)
+    year_cols = [c for c in wide.columns if c.isdigit() and years[0] <= int(c) <= years[1]]
+    if not year_cols:
+        raise ValueError(f"No encontré columnas de años en {years}. Columnas: {list(wide.columns)[:25]}")
+    year_vals = np.array([int(c) for c in year_cols], dtype=np.int64)
+
+    for iso, name in zip(wide[code_col].astype(str).str.strip(), wide[name_col]):
+        names.setdefault(iso, name)
+
+    frames = []
+    for src in sources:
+        rows = wide
+        if "Indicator Code" in wide.columns:
+            rows = wide[wide["Indicator Code"] == src.field]
+        vals = rows[year_cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64")
+        iso = rows[code_col].astype(str).str.strip().to_numpy(dtype=object)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "iso3": np.repeat(iso, len(year_cols)),
+                    "year": np.tile(year_vals, len(iso)),
+                    src.column: vals.ravel() * src.scale,
+                }
+            )
+        )
+    return frames
+
+
+def _wdi_aggregates(path: Path) -> Optional[set]:
+    """
+    ISO3 que la metadata de países junto al CSV de WDI marca como agregados.
+
+    Los exports por indicador traen `Metadata_Country_<archivo>.csv` y el bulk
+    `WDICountry.csv`; en ambos 'Region' va vacía para agregados. None si no hay
+    metadata local.
+    """
+    candidates = sorted(path.parent.glob(f"Metadata_Country_{path.stem}*.csv")) or sorted(
+        path.parent.glob("*Country.csv")
+    )
+    if not candidates:
+        return None
+    meta = pd.read_csv(candidates[-1], encoding="utf-8-sig", dtype=str)
+    meta.columns = meta.columns.astype(str).str.strip()
+    if not {"Country Code", "Region"}.issubset(meta.columns):
+        return None
+    region = meta["Region"].fillna("").str.strip()
+    return set(meta.loc[region == "", "Country Code"].str.strip())
+
+
+def _owid_long(
+    path: Path,
+    sources: Sequence[PanelSource],
+    years: Tuple[int, int],
+    names: Dict[str, str],
+) -> List[pd.DataFrame]:
+    """Frames long de un CSV tipo OWID, leyendo sólo las columnas usadas y los años pedidos."""
+    fields = sorted({s.field for s in sources})
+    convert = pv.ConvertOptions(
+        include_columns=["country", "iso_code", "year", *fields],
+        column_types={
+            "country": pa.string(),
+            "iso_code": pa.string(),
+            "year": pa.int16(),
+            **{f: pa.float64() for f in fields},
+        },
+        strings_can_be_null=True,
+    )
+    table = pv.read_csv(path, convert_options=convert)
+    # OWID aggregates (World, continents) have no ISO code or an OWID_ prefix.
+    keep = pc.and_(
+        pc.and_(pc.greater_equal(table["year"], years[0]), pc.less_equal(table["year"], years[1])),
+        pc.invert(pc.fill_null(pc.starts_with(table["iso_code"], "OWID_"), True)),
+    )
+    df = table.filter(keep).to_pandas()
+
+    for iso, name in zip(df["iso_code"], df["country"]):
+        names.setdefault(iso, name)
+
+    return [
+        pd.DataFrame({"iso3": df["iso_code"], "year": df["year"], s.column: df[s.field] * s.scale})
+        for s in sources
+    ]
+
+
+def _fill_trailing(panel: pd.DataFrame, cols: Sequence[str], limit: int) -> pd.DataFrame:
+    """Rellena sólo los `limit` años posteriores a la última observación de cada país."""
+    g = panel.groupby("iso3", observed=True, sort=False)
+    pos = g.cumcount().to_numpy()
+    filled = g[list(cols)].ffill(limit=limit)
+    out = panel[list(cols)].copy()
+    for c in cols:
+        seen = np.where(panel[c].notna().to_numpy(), pos, -1)
+        last = (
+            pd.Series(seen, index=panel.index)
+            .groupby(panel["iso3"], observed=True, sort=False)
+            .transform("max")
+            .to_numpy()
+        )
+        trailing = (pos > last) & (last >= 0)
+        out.loc[trailing, c] = filled.loc[trailing, c]
+    return out
+
+
+def build_panel(
+    countries: Optional[Iterable[str]] = None,
+    years: Tuple[int, int] = (1990, 2023),
+    sources: Sequence[PanelSource] = DEFAULT_SOURCES,
+    raw_dir: Union[str, Path] = settings.DATA_RAW,
+    ffill: Sequence[str] = FFILL_COLUMNS,
+    ffill_limit: int = FFILL_LIMIT,
+    dropna: bool = True,
+) -> pd.DataFrame:
+    """
+    Panel país-año (country, iso3, year, indicadores..., co2_per_capita).
+
+    - countries: lista de ISO3; None = todos los países presentes en las
+      fuentes, sin agregados. Los agregados salen del registro World Bank si
+      ya está en caché; si no, de la metadata local (columna 'Region' del
+      `*Country.csv` de WDI, vacía en agregados) o, a falta de ella, de los
+      códigos ISO de OWID. Sólo sin nada de eso se descarga el registro.
+    - years: (min, max) inclusive
+    - sources: columnas a leer (ver PanelSource); archivos compartidos se leen una vez
+    - ffill: columnas cuyo hueco final (años después de la última observación
+      de cada país) se rellena con el último valor, hasta `ffill_limit` años;
+      los huecos intermedios no se tocan
+    - dropna: descartar filas incompletas (panel balanceado como en Q1)
+    """
+    raw_dir = Path(raw_dir)
+    years = (int(years[0]), int(years[1]))
+
+    by_file: Dict[Tuple[Path, str], List[PanelSource]] = {}
+    for src in sources:
+        by_file.setdefault((_resolve(src.path, raw_dir), src.kind), []).append(src)
+
+    names: Dict[str, str] = {}
+    frames: List[pd.DataFrame] = []
+    # Local aggregate metadata, used when countries=None and no registry is cached.
+    aggregates: Optional[set] = set()
+    owid_codes: set = set()
+    for (path, kind), srcs in by_file.items():
+        if kind == "wdi":
+            frames.extend(_wdi_long(_read_wdi_wide(path), srcs, years, names))
+            if countries is None and aggregates is not None:
+                meta = _wdi_aggregates(path)
+                aggregates = None if meta is None else aggregates | meta
+        elif kind == "owid":
+            owid = _owid_long(path, srcs, years, names)
+            owid_codes.update(owid[0]["iso3"].dropna().unique())
+            frames.extend(owid)
+        else:
+            raise ValueError(f"Unknown source kind {kind!r} for {path}")
+
+    if countries is not None:
+        wanted = pd.Index(sorted({str(c).strip().upper() for c in countries}))
+        frames = [f[wanted.get_indexer(f["iso3"].to_numpy(dtype=object)) >= 0] for f in frames]
+
+    panel, _ = assemble_panel(frames)
+
+    if countries is None:
+        from ds_exam.data.countries import COUNTRIES_PATH, load_country_registry
+
+        iso = panel["iso3"]
+        if COUNTRIES_PATH.exists():
+            mask = load_country_registry().country_mask(iso)
+        elif aggregates is not None:
+            # OWID rows already exclude OWID_* aggregates; WDI ones via Region.
+            mask = ~iso.isin(aggregates).to_numpy()
+        elif owid_codes:
+            mask = iso.isin(owid_codes).to_numpy()
+        else:
+            mask = load_country_registry().country_mask(iso)
+        panel = panel[mask].copy()
+        panel["iso3"] = panel["iso3"].cat.remove_unused_categories()
+
+    value_cols = [c for c in panel.columns if c not in ("iso3", "year")]
+    fill = [c for c in ffill if c in panel.columns]
+    if fill and ffill_limit > 0:
+        panel[fill] = _fill_trailing(panel, fill, ffill_limit)
+
+    if {"co2_mt", "population"}.issubset(panel.columns):
+        # Mt -> t / persona
+        panel["co2_per_capita"] = panel["co2_mt"] * 1e6 / panel["population"]
+        value_cols.append("co2_per_capita")
+
+    if dropna:
+        panel = panel.dropna(subset=value_cols)
+
+    # One lookup per country, expanded through the category codes.
+    cats = panel["iso3"].cat.categories
+    panel.insert(
+        0,
+        "country",
+        pd.Categorical(pd.Index(cats, dtype=object).map(names).to_numpy()[panel["iso3"].cat.codes]),
+    )
+    return enforce_panel_schema(panel.reset_index(drop=True))
+
+
+def build_panel_mex_usa_1990_2023(start_year: int = 1990, end_year: int = 2023) -> pd.DataFrame:
+    """Panel de Q1: MEX y USA, start_year..end_year."""
+    return build_panel(countries=["MEX", "USA"], years=(start_year, end_year))
+
+
+def save_panel(
+    panel: pd.DataFrame,
+    out_dir: Union[str, Path] = settings.DATA_PROCESSED,
+    stem: str = "panel_country_year",
+) -> Tuple[Path, Path]:
+    """
+    Escribe out_dir/<stem>.parquet y out_dir/<stem>.csv.
+
+    Ambos salen de la misma tabla arrow (una sola conversión desde pandas);
+    el parquet lleva la metadata del esquema del panel.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    panel = enforce_panel_schema(panel)
+    table = pa.Table.from_pandas(panel, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, **schema_metadata(panel)})
+
+    parquet_path = out_dir / f"{stem}.parquet"
+    csv_path = out_dir / f"{stem}.csv"
+    pq.write_table(table, parquet_path, compression="zstd")
+
+    # The CSV writer does not take dictionary columns: decode them in arrow.
+    plain = table.cast(
+        pa.schema(
+            [
+                pa.field(f.name, f.type.value_type) if pa.types.is_dictionary(f.type) else f
+                for f in table.schema
+            ]
+        )
+    )
+    pv.write_csv(plain, csv_path, pv.WriteOptions(quoting_style="needed"))
+    return parquet_path, csv_path
@@ -0,0 +1,90 @@
+"""
+Registro persistido de países World Bank (ISO3, nombre, región, ingreso, agregado).
+
+Se descarga una vez de /country, se guarda en data/interim y se reutiliza en
+cada corrida; `refresh=True` lo vuelve a pedir. Para filtrar agregados de
+cualquier panel se usa `country_mask`, un lookup vectorizado sobre el índice.
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from ds_exam.config import settings
+from ds_exam.data.wb_api import WorldBankClient, shared_client
+
+COUNTRIES_PATH = settings.DATA_INTERIM / "wb_countries.parquet"
+
+
+class CountryRegistry:
+    def __init__(self, table: pd.DataFrame):
+        self.table = table.drop_duplicates(subset=["iso3"]).set_index("iso3").sort_index()
+        is_agg = self.table["is_aggregate"].astype(bool).to_numpy()
+        # Índice hash de países reales: cada consulta es un get_indexer, no un filtro por fila.
+        self._countries = self.table.index[~is_agg]
+
+    def __len__(self) -> int:
+        return len(self._countries)
+
+    def country_mask(self, iso3: Union[pd.Series, pd.Index, np.ndarray, list]) -> np.ndarray:
+        """
+        Máscara booleana: True donde iso3 es un país (no agregado, no desconocido).
+
+        Con una columna category el lookup se hace sobre las categorías y se
+        expande por los códigos.
+        """
+        if isinstance(iso3, pd.Series) and isinstance(iso3.dtype, pd.CategoricalDtype):
+            cat_mask = self._countries.get_indexer(iso3.cat.categories.astype(object)) >= 0
+            codes = iso3.cat.codes.to_numpy()
+            return np.where(codes >= 0, cat_mask[codes], False)
+        values = pd.Index(np.asarray(iso3, dtype=object))
+        return self._countries.get_indexer(values) >= 0
+
+    def countries(self) -> pd.DataFrame:
+        """Países (sin agregados): iso3, country."""
+        out = self.table.loc[self._countries, ["name"]].rename(columns={"name": "country"})
+        return out.reset_index()
+
+    def names(self, iso3: Union[pd.Series, pd.Index, np.ndarray, list]) -> pd.Series:
+        """Nombre de país para cada iso3 (NaN si no está en el registro)."""
+        s = pd.Series(np.asarray(iso3, dtype=object))
+        return s.map(self.table["name"])
+
+
+_LOADED: Dict[Path, CountryRegistry] = {}
+_LOCK = threading.Lock()
+
+
+def load_country_registry(
+    path: Union[str, Path] = COUNTRIES_PATH,
+    refresh: bool = False,
+    client: Optional[WorldBankClient] = None,
+) -> CountryRegistry:
+    """
+    Registro de países: memoizado por proceso, persistido en `path`.
+
+    Sólo va a la red si el archivo no existe o si refresh=True.
+    """
+    path = Path(path)
+    with _LOCK:
+        if not refresh and path in _LOADED:
+            return _LOADED[path]
+
+        if path.exists() and not refresh:
+            table = pd.read_parquet(path)
+        else:
+            client = client if client is not None else shared_client()
+            table = client.fetch_countries()
+            if table.empty:
+                raise RuntimeError("World Bank /country returned no rows")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            table.to_parquet(path, index=False)
+
+        reg = CountryRegistry(table)
+        _LOADED[path] = reg
+        return reg
@@ -0,0 +1,186 @@
+"""
+Loader de Our World in Data (OWID) CO2 con proyección de columnas y cache parquet.
+
+`owid-co2-data.csv` pesa decenas de MB y trae ~80 columnas; nosotros usamos 4.
+- read_owid_csv: lee sólo las columnas pedidas, con dtypes explícitos y el engine pyarrow
+- owid_parquet: convierte el CSV (URL o archivo local) a parquet una sola vez;
+  la copia de una URL se revalida (If-Modified-Since / If-None-Match) cuando
+  tiene más de `ttl_seconds`
+- load_owid_co2: lee del parquet sólo las columnas y años pedidos (pushdown)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from email.utils import formatdate
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+import requests
+
+from ds_exam.config import settings
+
+OWID_CO2_URL = "https://raw.githubusercontent.com/owid/co2-data/master/owid-co2-data.csv"
+OWID_CACHE_DIR = settings.DATA_DIR / "cache" / "owid"
+# Una copia descargada de más de una semana se revalida contra el server
+# (OWID publica actualizaciones unas pocas veces por año).
+OWID_TTL_SECONDS: Optional[float] = 7 * 24 * 3600
+
+DEFAULT_COLUMNS = ("iso_code", "year", "co2", "co2_per_capita")
+
+# Todo lo que no es identificador en el CSV de OWID es numérico.
+_ID_TYPES: Dict[str, pa.DataType] = {
+    "country": pa.string(),
+    "iso_code": pa.string(),
+    "year": pa.int16(),
+}
+_ID_DTYPES: Dict[str, str] = {"country": "string", "iso_code": "string", "year": "int16"}
+
+
+def _is_url(source: Union[str, Path]) -> bool:
+    return str(source).startswith(("http://", "https://"))
+
+
+def read_owid_csv(
+    source: Union[str, Path] = OWID_CO2_URL,
+    columns: Sequence[str] = DEFAULT_COLUMNS,
+) -> pd.DataFrame:
+    """Lectura directa del CSV (sin cache), proyectada a `columns`."""
+    dtype = {c: _ID_DTYPES.get(c, "float64") for c in columns}
+    return pd.read_csv(source, usecols=list(columns), dtype=dtype, engine="pyarrow")
+
+
+def _download(url: str, dest: Path, conditional: bool = False) -> bool:
+    """
+    Descarga `url` a `dest`; devuelve False si el server responde 304.
+
+    conditional=True manda If-Modified-Since (mtime de `dest`) e If-None-Match
+    (ETag guardado al lado) para no bajar de nuevo un archivo que no cambió.
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    etag_path = dest.with_suffix(dest.suffix + ".etag")
+    headers = {}
+    if conditional and dest.exists():
+        headers["If-Modified-Since"] = formatdate(dest.stat().st_mtime, usegmt=True)
+        if etag_path.exists():
+            headers["If-None-Match"] = etag_path.read_text(encoding="utf-8").strip()
+
+    tmp = dest.with_suffix(dest.suffix + ".part")
+    with requests.get(url, stream=True, timeout=120, headers=headers) as r:
+        if r.status_code == 304:
+            os.utime(dest)  # revalidated: the TTL starts over
+            return False
+        r.raise_for_status()
+        with open(tmp, "wb") as fh:
+            for chunk in r.iter_content(chunk_size=1 << 20):
+                fh.write(chunk)
+        etag = r.headers.get("ETag")
+    tmp.replace(dest)
+    if etag:
+        etag_path.write_text(etag, encoding="utf-8")
+    elif etag_path.exists():
+        etag_path.unlink()
+    return True
+
+
+def _cache_name(source: Union[str, Path]) -> str:
+    """<stem>-<hash de la URL o ruta absoluta>: fuentes homónimas no comparten copia."""
+    if _is_url(source):
+        stem, key = Path(str(source).split("?")[0]).stem, str(source)
+    else:
+        path = Path(source).resolve()
+        stem, key = path.stem, str(path)
+    return f"{stem}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:10]}"
+
+
+def owid_parquet(
+    source: Union[str, Path] = OWID_CO2_URL,
+    cache_dir: Union[str, Path] = OWID_CACHE_DIR,
+    refresh: bool = False,
+    ttl_seconds: Optional[float] = OWID_TTL_SECONDS,
+) -> Path:
+    """
+    Devuelve la copia parquet del CSV de OWID, creándola si hace falta.
+
+    - source: URL o ruta local al CSV
+    - refresh=True fuerza re-descarga/re-conversión
+    - ttl_seconds: con una URL, la copia descargada hace más de ttl_seconds
+      se revalida con un GET condicional (sólo se baja si cambió);
+      0 = revalidar siempre, None = nunca
+    - con un archivo local se re-convierte si el CSV es más nuevo que el parquet
+    """
+    cache_dir = Path(cache_dir)
+    name = _cache_name(source)
+    dest = cache_dir / f"{name}.parquet"
+
+    if _is_url(source):
+        csv_path = cache_dir / f"{name}.csv"
+        stale = refresh or not csv_path.exists()
+        if stale:
+            print("[OWID] Downloading:", source)
+            _download(str(source), csv_path)
+        elif ttl_seconds is not None and time.time() - csv_path.stat().st_mtime >= ttl_seconds:
+            print("[OWID] Revalidating:", source)
+            stale = _download(str(source), csv_path, conditional=True)
+            if not stale:
+                print("[OWID] Not modified")
+    else:
+        csv_path = Path(source)
+        if not csv_path.exists():
+            raise FileNotFoundError(f"No existe el archivo: {csv_path}")
+        stale = refresh or (dest.exists() and csv_path.stat().st_mtime > dest.stat().st_mtime)
+
+    if dest.exists() and not stale:
+        return dest
+
+    # Header first, so every non-id column is read as float64 (no type inference).
+    with open(csv_path, "r", encoding="utf-8") as fh:
+        header = fh.readline().strip().split(",")
+    column_types = {c: _ID_TYPES.get(c, pa.float64()) for c in header}
+
+    convert = pv.ConvertOptions(column_types=column_types, strings_can_be_null=True)
+    table = pv.read_csv(csv_path, convert_options=convert)
+    # Sorted by year so row-group statistics make year filters cheap.
+    table = table.sort_by([("year", "ascending"), ("iso_code", "ascending")])
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_suffix(".parquet.part")
+    pq.write_table(table, tmp, compression="zstd", row_group_size=8192)
+    tmp.replace(dest)
+    return dest
+
+
+def load_owid_co2(
+    source: Union[str, Path] = OWID_CO2_URL,
+    columns: Sequence[str] = DEFAULT_COLUMNS,
+    years: Optional[Tuple[int, int]] = None,
+    cache_dir: Union[str, Path] = OWID_CACHE_DIR,
+    use_cache: bool = True,
+    refresh: bool = False,
+    ttl_seconds: Optional[float] = OWID_TTL_SECONDS,
+) -> pd.DataFrame:
+    """
+    Columnas `columns` de OWID CO2, opcionalmente filtradas a years=(min, max).
+
+    Con use_cache=True sólo se leen del parquet las columnas y row groups
+    necesarios (refresh / ttl_seconds: ver owid_parquet); con use_cache=False
+    se lee el CSV proyectado directamente.
+    """
+    if not use_cache:
+        df = read_owid_csv(source, columns)
+        if years is not None:
+            df = df[(df["year"] >= years[0]) & (df["year"] <= years[1])]
+        return df.reset_index(drop=True)
+
+    path = owid_parquet(source, cache_dir, refresh=refresh, ttl_seconds=ttl_seconds)
+    filters = None
+    if years is not None:
+        filters = [("year", ">=", int(years[0])), ("year", "<=", int(years[1]))]
+    table = pq.read_table(path, columns=list(columns), filters=filters)
+    return table.to_pandas(types_mapper={pa.string(): pd.StringDtype()}.get)
@@ -0,0 +1,117 @@
+"""
+Ensamblado long -> wide del panel país-año en una sola pasada.
+
+En vez de encadenar un `merge` outer por indicador (cada uno re-hashea y copia
+el frame completo), se concatenan todas las observaciones, se factorizan las
+keys (iso3, year) una vez y los valores se escriben directamente en una matriz
+(n_keys x n_columnas).
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+PANEL_KEYS = ("iso3", "year")
+
+
+def assemble_panel(
+    frames: Iterable[pd.DataFrame],
+    value_dtype: str = "float64",
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Une frames (iso3, year, <valores>...) en un panel wide (outer en las keys).
+
+    - Cada columna de valor puede venir de cualquier frame; si una misma
+      (iso3, year, columna) aparece dos veces, gana el último valor no nulo.
+    - Salida ordenada por (iso3, year) con iso3 category, year int16 y
+      valores en `value_dtype`.
+
+    Devuelve (panel, coverage); coverage tiene una fila por columna con
+    n_obs, share (n_obs / filas del panel), n_countries, year_min, year_max.
+    """
+    iso_parts: List[np.ndarray] = []
+    year_parts: List[np.ndarray] = []
+    col_parts: List[np.ndarray] = []
+    val_parts: List[np.ndarray] = []
+    columns: List[str] = []
+
+    for f in frames:
+        if f is None:
+            continue
+        # Columns are registered even for empty frames so the panel schema is stable.
+        for col in f.columns:
+            if col not in PANEL_KEYS and col not in columns:
+                columns.append(col)
+        if f.empty:
+            continue
+        year = pd.to_numeric(f["year"], errors="coerce").to_numpy(dtype="float64")
+        iso = f["iso3"].to_numpy(dtype=object)
+        ok = ~np.isnan(year) & pd.notna(iso)
+        iso, year = iso[ok], year[ok].astype(np.int64)
+
+        for col in f.columns:
+            if col in PANEL_KEYS:
+                continue
+            vals = pd.to_numeric(f[col], errors="coerce").to_numpy(dtype="float64")[ok]
+            iso_parts.append(iso)
+            year_parts.append(year)
+            col_parts.append(np.full(len(iso), columns.index(col), dtype=np.int32))
+            val_parts.append(vals)
+
+    if not iso_parts:
+        empty = pd.DataFrame({"iso3": pd.Categorical([]), "year": np.empty(0, dtype=np.int16)})
+        for col in columns:
+            empty[col] = np.empty(0, dtype=value_dtype)
+        return empty, _coverage(empty, columns)
+
+    iso_all = np.concatenate(iso_parts)
+    year_all = np.concatenate(year_parts)
+    col_all = np.concatenate(col_parts)
+    val_all = np.concatenate(val_parts)
+
+    # One factorization of the (iso3, year) key for every observation.
+    iso_codes, iso_uniques = pd.factorize(iso_all, sort=True)
+    y0 = int(year_all.min())
+    span = int(year_all.max()) - y0 + 1
+    key = iso_codes.astype(np.int64) * span + (year_all - y0)
+    key_idx, key_uniques = pd.factorize(key, sort=True)
+
+    mat = np.full((len(key_uniques), len(columns)), np.nan, dtype=value_dtype)
+    has_val = ~np.isnan(val_all)
+    mat[key_idx[has_val], col_all[has_val]] = val_all[has_val]
+
+    panel = pd.DataFrame(
+        {
+            "iso3": pd.Categorical.from_codes(
+                (key_uniques // span).astype(np.int32),
+                categories=pd.Index(iso_uniques, dtype=object),
+            ),
+            "year": (key_uniques % span + y0).astype(np.int16),
+        }
+    )
+    panel = pd.concat([panel, pd.DataFrame(mat, columns=columns)], axis=1)
+    return panel, _coverage(panel, columns)
+
+
+def _coverage(panel: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    rows = []
+    n = len(panel)
+    for col in columns:
+        has = panel[col].notna().to_numpy()
+        years = panel["year"].to_numpy()[has]
+        rows.append(
+            {
+                "column": col,
+                "n_obs": int(has.sum()),
+                "share": float(has.mean()) if n else 0.0,
+                "n_countries": int(pd.unique(panel["iso3"].to_numpy()[has]).size),
+                "year_min": int(years.min()) if years.size else None,
+                "year_max": int(years.max()) if years.size else None,
+            }
+        )
+    return pd.DataFrame(
+        rows, columns=["column", "n_obs", "share", "n_countries", "year_min", "year_max"]
+    )
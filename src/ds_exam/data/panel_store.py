@@ -0,0 +1,164 @@
+"""
+Almacenamiento de paneles país-año como datasets parquet particionados.
+
+- write_panel: dataset hive particionado por década (`year_bucket=1990/…`),
+  ordenado por (iso3, year), compresión zstd y row groups acotados
+- read_panel: proyección de columnas y filtros year/iso3 empujados a pyarrow
+  (se saltan particiones y row groups completos)
+
+Al escribir se aplica el esquema canónico (ds_exam.data.schema) y se guarda en
+la metadata; al leer, los datasets con esa metadata no se vuelven a coercionar.
+`read_panel` también lee los .parquet monolíticos de corridas anteriores
+(tipándolos al vuelo), y los datasets siguen siendo legibles con
+`pd.read_parquet(path)`.
+"""
+
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from ds_exam.data.schema import enforce_panel_schema, read_schema_metadata, schema_metadata
+
+PARTITION_COL = "year_bucket"
+BUCKET_YEARS = 10
+# Tamaño de bucket con el que se escribió el dataset (metadata del schema)
+BUCKET_META_KEY = b"ds_exam.bucket_years"
+ROW_GROUP_SIZE = 64_000
+
+
+_PARTITIONING = ds.partitioning(pa.schema([(PARTITION_COL, pa.int16())]), flavor="hive")
+
+
+def _bucket(year: int, bucket_years: int = BUCKET_YEARS) -> int:
+    return (int(year) // bucket_years) * bucket_years
+
+
+def write_panel(
+    df: pd.DataFrame,
+    path: Union[str, Path],
+    bucket_years: int = BUCKET_YEARS,
+    row_group_size: int = ROW_GROUP_SIZE,
+    compression: str = "zstd",
+    value_dtype: Optional[str] = None,
+) -> Path:
+    """
+    Reescribe `path` completo como dataset particionado por `year_bucket`.
+
+    value_dtype: "float32" para guardar indicadores en float32 (None conserva el ancho).
+    """
+    path = Path(path)
+    df = enforce_panel_schema(df.drop(columns=[PARTITION_COL], errors="ignore"), value_dtype)
+    df = df.sort_values(["iso3", "year"])
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {
+            **table.schema.metadata,
+            **schema_metadata(df),
+            BUCKET_META_KEY: str(int(bucket_years)).encode(),
+        }
+    )
+
+    bucket = (df["year"].to_numpy().astype(np.int32) // bucket_years) * bucket_years
+
+    # Full rewrite: a stale file or old partitions must not survive.
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+    # One synchronous pq.write_table per partition. ds.write_dataset is avoided
+    # on purpose: with pyarrow 17 its writer threads can abort the interpreter
+    # when a script exits right after writing.
+    for b in np.unique(bucket):
+        part_dir = path / f"{PARTITION_COL}={int(b)}"
+        part_dir.mkdir(parents=True, exist_ok=True)
+        pq.write_table(
+            table.filter(pa.array(bucket == b)),
+            part_dir / "part-0.parquet",
+            compression=compression,
+            row_group_size=row_group_size,
+        )
+    return path
+
+
+def _bucket_years(metadata: Optional[dict]) -> Optional[int]:
+    """Tamaño de bucket guardado por write_panel (None en datasets sin esa metadata)."""
+    raw = (metadata or {}).get(BUCKET_META_KEY)
+    try:
+        return int(raw) if raw is not None else None
+    except ValueError:
+        return None
+
+
+def _panel_dataset(path: Path) -> ds.Dataset:
+    if path.is_dir():
+        return ds.dataset(path, format="parquet", partitioning=_PARTITIONING)
+    return ds.dataset(path, format="parquet")
+
+
+def read_panel(
+    path: Union[str, Path],
+    columns: Optional[Sequence[str]] = None,
+    years: Optional[Tuple[int, int]] = None,
+    iso3: Optional[Iterable[str]] = None,
+    sort: bool = True,
+) -> pd.DataFrame:
+    """
+    Lee un panel (dataset particionado o archivo .parquet).
+
+    - columns: proyección (None = todas menos la columna de partición)
+    - years: (min, max) inclusive; poda row groups, y particiones con el
+      tamaño de bucket guardado al escribir
+    - iso3: lista de países a leer
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"No existe el panel: {path}")
+
+    dataset = _panel_dataset(path)
+    names: List[str] = [n for n in dataset.schema.names if n != PARTITION_COL]
+    if columns is not None:
+        missing = [c for c in columns if c not in names]
+        if missing:
+            raise KeyError(f"Columns not in panel {path}: {missing}")
+        names = list(columns)
+
+    filt = None
+    if years is not None:
+        y0, y1 = int(years[0]), int(years[1])
+        filt = (pc.field("year") >= y0) & (pc.field("year") <= y1)
+        # Partitions are pruned only with the bucket size the dataset was written
+        # with; without it the year filter alone still skips row groups.
+        bucket_years = _bucket_years(dataset.schema.metadata)
+        if PARTITION_COL in dataset.schema.names and bucket_years is not None:
+            filt = (
+                filt
+                & (pc.field(PARTITION_COL) >= _bucket(y0, bucket_years))
+                & (pc.field(PARTITION_COL) <= _bucket(y1, bucket_years))
+            )
+    if iso3 is not None:
+        cond = pc.field("iso3").isin(pa.array(list(iso3), type=pa.string()))
+        filt = cond if filt is None else filt & cond
+
+    table = dataset.to_table(columns=names, filter=filt)
+    df = table.to_pandas()
+    schema = read_schema_metadata(dataset.schema.metadata)
+    if schema is None:
+        # Legacy file written before the schema existed: type it once here.
+        df = enforce_panel_schema(df)
+    else:
+        df.attrs["panel_schema"] = schema
+
+    sort_cols = [c for c in ("iso3", "year") if c in df.columns]
+    if sort and sort_cols:
+        df = df.sort_values(sort_cols, kind="stable").reset_index(drop=True)
+    return df
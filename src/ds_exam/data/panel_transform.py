@@ -0,0 +1,321 @@
+"""
+Lags, leads, diferencias y tasas de crecimiento por país en una sola pasada.
+
+`df.groupby("iso3")[col].shift(k)` re-factoriza la key y arma los grupos en
+cada llamada. Acá el panel se ordena una vez por (iso3, year), los límites de
+grupo se calculan una vez (posición dentro del país y filas restantes) y cada
+transformación es un desplazamiento del bloque NumPy de columnas más una
+máscara de borde: un lag k es NaN en las primeras k filas de cada país, un
+lead k en las últimas k.
+
+Las ventanas móviles (media, volatilidad, pendiente OLS de los últimos w
+valores, fila t incluida, sin mirar hacia adelante) salen de sumas acumuladas
+por país de x, x² y posición·x: cada ventana es una resta de dos prefijos,
+O(n) sin importar w, y los prefijos (un cumsum por país, así cada país depende
+sólo de sus filas) se calculan una vez por columna para todas las ventanas.
+
+Los desplazamientos y ventanas son por posición (como groupby().shift /
+rolling(w)): un año faltante dentro de un país no se rellena. Una ventana con
+menos de w filas o con algún NaN da NaN.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+SHIFT_KINDS = ("lag", "lead", "diff", "growth")
+ROLLING_KINDS = ("mean", "std", "slope")
+OP_KINDS = SHIFT_KINDS + ROLLING_KINDS
+
+
+@dataclass(frozen=True)
+class PanelOp:
+    """
+    Una columna derivada.
+
+    - lag:    x[t - k]
+    - lead:   x[t + k]
+    - diff:   x[t] - x[t - k]
+    - growth: x[t] / x[t - k] - 1 (como pct_change)
+    - mean / std / slope: media, desvío (ddof=1) y pendiente OLS por fila de
+      x[t - k + 1 .. t] (ventana de k filas)
+    """
+
+    kind: str
+    column: str
+    periods: int = 1
+    name: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.kind not in OP_KINDS:
+            raise ValueError(f"Unknown op kind {self.kind!r}; expected one of {OP_KINDS}")
+        if self.periods < 1:
+            raise ValueError(f"periods must be >= 1 (got {self.periods} for {self.column})")
+        if self.kind in ("std", "slope") and self.periods < 2:
+            raise ValueError(f"{self.kind} needs a window of >= 2 rows ({self.column})")
+
+    @property
+    def output(self) -> str:
+        return self.name or f"{self.column}_{self.kind}{self.periods}"
+
+    @property
+    def shift(self) -> int:
+        """Desplazamiento con signo que necesita: > 0 mira hacia atrás, < 0 hacia adelante."""
+        return -self.periods if self.kind == "lead" else self.periods
+
+    @property
+    def back(self) -> int:
+        """Filas anteriores a t que lee."""
+        if self.kind in ROLLING_KINDS:
+            return self.periods - 1
+        return 0 if self.kind == "lead" else self.periods
+
+    @property
+    def ahead(self) -> int:
+        """Filas posteriores a t que lee."""
+        return self.periods if self.kind == "lead" else 0
+
+
+def lag(column: str, periods: int = 1, name: Optional[str] = None) -> PanelOp:
+    return PanelOp("lag", column, periods, name)
+
+
+def lead(column: str, periods: int = 1, name: Optional[str] = None) -> PanelOp:
+    return PanelOp("lead", column, periods, name)
+
+
+def diff(column: str, periods: int = 1, name: Optional[str] = None) -> PanelOp:
+    return PanelOp("diff", column, periods, name)
+
+
+def growth(column: str, periods: int = 1, name: Optional[str] = None) -> PanelOp:
+    return PanelOp("growth", column, periods, name)
+
+
+def rolling_mean(column: str, window: int, name: Optional[str] = None) -> PanelOp:
+    return PanelOp("mean", column, window, name)
+
+
+def rolling_std(column: str, window: int, name: Optional[str] = None) -> PanelOp:
+    return PanelOp("std", column, window, name)
+
+
+def rolling_slope(column: str, window: int, name: Optional[str] = None) -> PanelOp:
+    return PanelOp("slope", column, window, name)
+
+
+class PanelTransform:
+    """
+    Panel ordenado por (group, time) con los límites de grupo precalculados.
+
+    `frame` es el panel ordenado (índice 0..n-1); `compute` devuelve las
+    columnas pedidas alineadas con él.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        group: str = "iso3",
+        time: str = "year",
+        assume_sorted: bool = False,
+    ) -> None:
+        missing = [c for c in (group, time) if c not in df.columns]
+        if missing:
+            raise ValueError(f"Missing panel keys {missing}. Columns={df.columns.tolist()}")
+        if not assume_sorted:
+            df = df.sort_values([group, time])
+        self.frame = df.reset_index(drop=True)
+        self.group = group
+        self.time = time
+
+        key = self.frame[group]
+        if isinstance(key.dtype, pd.CategoricalDtype):
+            codes = key.cat.codes.to_numpy()
+        else:
+            codes = pd.factorize(key)[0]
+        n = len(codes)
+        starts = np.ones(n, dtype=bool)
+        starts[1:] = codes[1:] != codes[:-1]
+        start_idx = np.flatnonzero(starts)
+        sizes = np.diff(np.append(start_idx, n))
+        gid = np.cumsum(starts) - 1
+        self._start_idx = start_idx
+        self._gid = gid
+
+        # position of each row inside its group, and rows left after it
+        self.position = np.arange(n) - start_idx[gid]
+        self.remaining = sizes[gid] - self.position - 1
+        self.n_groups = len(start_idx)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def shifted(self, columns: Sequence[str], periods: int) -> np.ndarray:
+        """
+        Bloque (n x len(columns)) desplazado `periods` filas dentro de cada grupo
+        (> 0 = lag, < 0 = lead); NaN donde el desplazamiento cruza un borde.
+        """
+        return self._shift(self._block(columns), periods)
+
+    def _shift(self, block: np.ndarray, periods: int) -> np.ndarray:
+        out = np.full_like(block, np.nan)
+        if periods > 0:
+            out[periods:] = block[:-periods]
+            out[self.position < periods] = np.nan
+        elif periods < 0:
+            k = -periods
+            out[:-k] = block[k:]
+            out[self.remaining < k] = np.nan
+        else:
+            out[:] = block
+        return out
+
+    def compute(
+        self,
+        ops: Iterable[PanelOp],
+        values: Optional[Mapping[str, object]] = None,
+    ) -> pd.DataFrame:
+        """
+        Todas las `ops` de una vez: un desplazamiento por cada `periods` distinto.
+
+        `values` aporta columnas que no están en `frame` (arrays alineados con él).
+        """
+        ops = list(ops)
+        values = values or {}
+        names = [op.output for op in ops]
+        dupes = sorted({n for n in names if names.count(n) > 1})
+        if dupes:
+            raise ValueError(f"Duplicate output columns: {dupes}")
+        missing = sorted({op.column for op in ops} - set(self.frame.columns) - set(values))
+        if missing:
+            raise ValueError(f"Missing columns for transforms: {missing}")
+
+        # every source column is copied out of the frame once
+        columns = list(dict.fromkeys(op.column for op in ops))
+        base = self._block(columns, values)
+        col_idx = {c: j for j, c in enumerate(columns)}
+
+        by_shift: Dict[int, List[str]] = {}
+        for op in ops:
+            if op.kind in ROLLING_KINDS:
+                continue
+            cols = by_shift.setdefault(op.shift, [])
+            if op.column not in cols:
+                cols.append(op.column)
+
+        blocks: Dict[Tuple[int, str], np.ndarray] = {}
+        for periods, cols in by_shift.items():
+            block = self._shift(base[:, [col_idx[c] for c in cols]], periods)
+            for j, c in enumerate(cols):
+                blocks[(periods, c)] = block[:, j]
+
+        rolling = [op for op in ops if op.kind in ROLLING_KINDS]
+        if rolling:
+            roll_cols = list(dict.fromkeys(op.column for op in rolling))
+            stats = self._rolling(base[:, [col_idx[c] for c in roll_cols]], rolling, roll_cols)
+
+        out = {}
+        for op in ops:
+            if op.kind in ROLLING_KINDS:
+                out[op.output] = stats[op].astype(self._dtype(op.column, values), copy=False)
+                continue
+            other = blocks[(op.shift, op.column)]
+            if op.kind in ("lag", "lead"):
+                result = other
+            else:
+                current = base[:, col_idx[op.column]]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    result = current - other if op.kind == "diff" else current / other - 1
+            out[op.output] = result.astype(self._dtype(op.column, values), copy=False)
+        return pd.DataFrame(out, index=self.frame.index)
+
+    def _rolling(
+        self, block: np.ndarray, ops: Sequence[PanelOp], columns: Sequence[str]
+    ) -> Dict[PanelOp, np.ndarray]:
+        """Ventanas móviles de `ops` a partir de prefijos por columna (una pasada cada uno)."""
+        n, m = block.shape
+        out: Dict[PanelOp, np.ndarray] = {}
+        if n == 0:
+            return {op: np.empty(0) for op in ops}
+        valid = ~np.isnan(block)
+        # Values are centered on the first valid value of their country, so the
+        # prefix sums stay small (less cancellation in S2 - S1**2 / w) and row t
+        # still depends only on rows <= t.
+        rows = np.where(valid, np.arange(n)[:, None], n)
+        first = np.minimum.reduceat(rows, self._start_idx, axis=0)
+        first_val = np.where(
+            first < n, block[np.minimum(first, n - 1), np.arange(m)[None, :]], 0.0
+        )
+        center = first_val[self._gid]
+        x = np.where(valid, block - center, 0.0)
+        pos = self.position.astype(np.float64)[:, None]
+
+        # One cumsum per country block: each prefix restarts at zero, so a
+        # country's windows depend only on its own rows, bit for bit, whatever
+        # countries are sorted before it (incremental recomputes stay exact).
+        bounds = np.append(self._start_idx, n).tolist()
+        position = self.position
+        rows_n = np.arange(n)
+
+        def prefix(a: np.ndarray) -> np.ndarray:
+            c = np.empty_like(a)
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                np.cumsum(a[lo:hi], axis=0, out=c[lo:hi])
+            return c
+
+        col = {c: j for j, c in enumerate(columns)}
+        kinds = {op.kind for op in ops}
+        p_n = prefix(valid.astype(np.float64))
+        p_1 = prefix(x)
+        p_2 = prefix(x * x) if "std" in kinds else None
+        p_xy = prefix(pos * x) if "slope" in kinds else None
+
+        for w in sorted({op.periods for op in ops}):
+            has_before = (position >= w)[:, None]
+            before = np.maximum(rows_n - w, 0)
+
+            def window(c: np.ndarray) -> np.ndarray:
+                # sum of the w rows ending at each row (inside its country)
+                return c - np.where(has_before, c[before], 0.0)
+
+            full = (position >= w - 1)[:, None] & (window(p_n) == w)
+            s1 = window(p_1)
+            s2 = window(p_2) if p_2 is not None else None
+            sxy = window(p_xy) if p_xy is not None else None
+            for op in ops:
+                if op.periods != w:
+                    continue
+                j = col[op.column]
+                if op.kind == "mean":
+                    res = s1[:, j] / w + center[:, j]
+                elif op.kind == "std":
+                    var = np.maximum(s2[:, j] - s1[:, j] ** 2 / w, 0.0) / (w - 1)
+                    res = np.sqrt(var)
+                else:
+                    # positions in the window are consecutive: mean t - (w-1)/2,
+                    # sum of squared deviations w(w^2-1)/12
+                    t_mean = position - (w - 1) / 2
+                    res = (sxy[:, j] - t_mean * s1[:, j]) / (w * (w * w - 1) / 12)
+                out[op] = np.where(full[:, j], res, np.nan)
+        return out
+
+    def _dtype(self, column: str, values: Mapping[str, object]) -> np.dtype:
+        src = values[column] if column in values else self.frame[column]
+        dtype = getattr(src, "dtype", None)
+        return dtype if isinstance(dtype, np.dtype) and dtype.kind == "f" else np.dtype("float64")
+
+    def _block(
+        self, columns: Sequence[str], values: Optional[Mapping[str, object]] = None
+    ) -> np.ndarray:
+        values = values or {}
+        if not any(c in values for c in columns):
+            return self.frame[list(columns)].to_numpy(dtype="float64", na_value=np.nan)
+        block = np.empty((len(self.frame), len(columns)), dtype=np.float64)
+        for j, c in enumerate(columns):
+            src = values[c] if c in values else self.frame[c]
+            block[:, j] = pd.Series(src, copy=False).to_numpy(dtype="float64", na_value=np.nan)
+        return block
@@ -0,0 +1,188 @@
+"""
+Chequeos de calidad del panel país-año en una sola pasada vectorizada.
+
+El panel se ordena una vez por (iso3, year); todos los chequeos salen de esa
+misma vista con bincount / diff sobre arrays numpy (sin groupby por país), así
+que el costo es ~lineal en filas y sirve en cada refresh aunque haya decenas
+de miles de entidades.
+
+`quality_report` devuelve un frame tidy (check, iso3, indicator, value):
+
+- coverage_country    (iso3, ind)  share de años del panel con dato finito
+- complete_years      (iso3, —)    años con todos los indicadores finitos
+- coverage_indicator  (—, ind)     share de filas con dato finito
+- n_countries         (—, ind)     países con al menos un dato
+- gap_runs / max_gap  (iso3, ind)  huecos internos entre el primer y último dato
+- non_finite          (iso3, ind)  valores ±inf
+- negative            (iso3, ind)  valores < 0
+- yoy_jump            (iso3, ind)  saltos año a año mayores a `jump_ratio`x
+- unit_<regla>        (iso3, —)    filas cuya razón entre columnas relacionadas
+                                    se sale de [1/unit_tolerance, unit_tolerance]
+
+Los chequeos por país sólo emiten filas con conteo > 0 (salvo coverage_country
+y complete_years, que son la tabla de cobertura completa).
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+REPORT_COLUMNS = ["check", "iso3", "indicator", "value"]
+
+# name -> (required columns, expected ratio ≈ 1). A unit slip (kt vs Mt, t vs Mt)
+# moves the ratio by orders of magnitude; source disagreements do not.
+UNIT_RULES: Dict[str, Tuple[Tuple[str, ...], Callable[[pd.DataFrame], np.ndarray]]] = {
+    "co2_kt_vs_co2_mt": (
+        ("co2_kt", "co2_mt"),
+        lambda d: d["co2_kt"].to_numpy() / (d["co2_mt"].to_numpy() * 1e3),
+    ),
+    "co2_per_capita_vs_co2_mt": (
+        ("co2_per_capita", "co2_mt", "population"),
+        lambda d: d["co2_per_capita"].to_numpy()
+        / (d["co2_mt"].to_numpy() * 1e6 / d["population"].to_numpy()),
+    ),
+}
+
+DEFAULT_VALUE_COLS = ("gdp_current_usd", "population", "co2_kt", "co2_mt", "co2_per_capita")
+
+
+def _rows(check: str, iso: Optional[np.ndarray], indicator: Optional[str], value) -> pd.DataFrame:
+    n = len(value)
+    return pd.DataFrame(
+        {
+            "check": np.full(n, check, dtype=object),
+            "iso3": iso if iso is not None else np.full(n, None, dtype=object),
+            "indicator": np.full(n, indicator, dtype=object),
+            "value": np.asarray(value, dtype="float64"),
+        }
+    )
+
+
+def quality_report(
+    panel: pd.DataFrame,
+    value_cols: Optional[Sequence[str]] = None,
+    jump_ratio: float = 3.0,
+    unit_tolerance: float = 2.0,
+) -> pd.DataFrame:
+    """
+    Reporte tidy de calidad del panel (ver docstring del módulo).
+
+    - value_cols: indicadores a revisar (default: los de DEFAULT_VALUE_COLS presentes)
+    - jump_ratio: un cambio año a año mayor a jump_ratio x (o menor a 1/jump_ratio)
+      entre valores positivos cuenta como outlier
+    - unit_tolerance: cota multiplicativa para las reglas de UNIT_RULES
+    """
+    if not {"iso3", "year"}.issubset(panel.columns):
+        raise ValueError(f"quality_report needs iso3/year. Columns: {panel.columns.tolist()}")
+    if value_cols is None:
+        value_cols = [c for c in DEFAULT_VALUE_COLS if c in panel.columns]
+    value_cols = list(value_cols)
+    missing = [c for c in value_cols if c not in panel.columns]
+    if missing:
+        raise KeyError(f"Columns not in panel: {missing}")
+
+    panel = panel[panel["iso3"].notna() & panel["year"].notna()]
+    if panel.empty:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+
+    # One sort by (iso3, year); every check below reuses this order.
+    iso_codes, iso_uniques = pd.factorize(panel["iso3"], sort=True)
+    year = pd.to_numeric(panel["year"], errors="coerce").to_numpy(dtype="float64")
+    order = np.lexsort((year, iso_codes))
+    codes = iso_codes[order]
+    year = year[order]
+    iso_names = np.asarray(iso_uniques, dtype=object)
+    n_iso = len(iso_names)
+    n_years = int(np.nanmax(year) - np.nanmin(year)) + 1
+
+    same_country = codes[1:] == codes[:-1]
+    consecutive = same_country & (np.diff(year) == 1)
+
+    frames: List[pd.DataFrame] = []
+    all_finite = np.ones(len(codes), dtype=bool)
+
+    for col in value_cols:
+        v = pd.to_numeric(panel[col], errors="coerce").to_numpy(dtype="float64")[order]
+        finite = np.isfinite(v)
+        all_finite &= finite
+
+        n_obs = np.bincount(codes, weights=finite, minlength=n_iso)
+        frames.append(_rows("coverage_country", iso_names, col, n_obs / n_years))
+        frames.append(_rows("coverage_indicator", None, col, [finite.mean()]))
+        frames.append(_rows("n_countries", None, col, [(n_obs > 0).sum()]))
+
+        # Gaps: year distance between consecutive finite observations of a country.
+        obs_codes = codes[finite]
+        obs_year = year[finite]
+        gap = np.diff(obs_year) - 1
+        is_gap = (obs_codes[1:] == obs_codes[:-1]) & (gap > 0)
+        gap_codes = obs_codes[1:][is_gap]
+        gap_runs = np.bincount(gap_codes, minlength=n_iso)
+        max_gap = np.zeros(n_iso)
+        np.maximum.at(max_gap, gap_codes, gap[is_gap])
+        has = gap_runs > 0
+        frames.append(_rows("gap_runs", iso_names[has], col, gap_runs[has]))
+        frames.append(_rows("max_gap", iso_names[has], col, max_gap[has]))
+
+        for check, flag in (
+            ("non_finite", np.isinf(v)),
+            ("negative", finite & (v < 0)),
+        ):
+            counts = np.bincount(codes[flag], minlength=n_iso)
+            has = counts > 0
+            frames.append(_rows(check, iso_names[has], col, counts[has]))
+
+        # Year-over-year jumps between positive values in consecutive years.
+        prev, curr = v[:-1], v[1:]
+        ok = consecutive & (prev > 0) & (curr > 0) & np.isfinite(prev) & np.isfinite(curr)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dlog = np.abs(np.log(curr) - np.log(prev))
+        jump = ok & (dlog > np.log(jump_ratio))
+        counts = np.bincount(codes[1:][jump], minlength=n_iso)
+        has = counts > 0
+        frames.append(_rows("yoy_jump", iso_names[has], col, counts[has]))
+
+    complete = np.bincount(codes, weights=all_finite, minlength=n_iso)
+    frames.append(_rows("complete_years", iso_names, None, complete))
+
+    sorted_panel = panel.iloc[order]
+    for name, (cols, ratio_fn) in UNIT_RULES.items():
+        if not set(cols).issubset(panel.columns):
+            continue
+        num = sorted_panel[list(cols)].apply(pd.to_numeric, errors="coerce")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = ratio_fn(num)
+        bad = np.isfinite(ratio) & (
+            (ratio > unit_tolerance) | (ratio < 1.0 / unit_tolerance)
+        )
+        counts = np.bincount(codes[bad], minlength=n_iso)
+        has = counts > 0
+        frames.append(_rows(f"unit_{name}", iso_names[has], None, counts[has]))
+
+    return pd.concat(frames, ignore_index=True)[REPORT_COLUMNS]
+
+
+def countries_with_complete_years(report: pd.DataFrame, min_years: int) -> List[str]:
+    """iso3 con al menos `min_years` años completos (check complete_years)."""
+    rows = report[report["check"] == "complete_years"]
+    return rows.loc[rows["value"] >= min_years, "iso3"].tolist()
+
+
+def summarize_report(report: pd.DataFrame) -> List[str]:
+    """Líneas legibles por indicador (cobertura y conteos de flags) para imprimir."""
+    lines: List[str] = []
+    per_ind = report[report["indicator"].notna()]
+    for ind, g in per_ind.groupby("indicator", sort=False):
+        by_check = g.groupby("check", sort=False)
+        cov = g.loc[g["check"] == "coverage_indicator", "value"]
+        parts = [f"coverage {cov.iloc[0] * 100:.1f}%" if len(cov) else "coverage n/a"]
+        for check in ("gap_runs", "non_finite", "negative", "yoy_jump"):
+            n = int(by_check.size().get(check, 0))
+            parts.append(f"{check}: {n} countries")
+        lines.append(f"  - {ind}: " + " | ".join(parts))
+    for check, g in report[report["check"].str.startswith("unit_")].groupby("check"):
+        lines.append(f"  - {check}: {int(g['value'].sum())} rows in {len(g)} countries")
+    return lines
@@ -0,0 +1,131 @@
+"""
+Control de tasa adaptativo (token bucket + AIMD) para la World Bank API.
+
+Todas las llamadas a la WB del proceso pasan por el mismo limitador
+(`get_rate_limiter()`), así que varios pulls de indicadores en paralelo
+comparten un único presupuesto de requests:
+
+- cada request consume un token; los tokens se reponen a `rate` por segundo
+- un 200 sube la tasa de forma aditiva (hasta `max_rate`)
+- un 429/5xx la baja de forma multiplicativa (hasta `min_rate`) y pausa a
+  todos los hilos durante `Retry-After` (o 1/rate si el server no lo manda);
+  a lo sumo una baja por pausa, aunque lleguen varios 429 concurrentes
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Segundos a esperar según un header Retry-After (segundos o fecha HTTP)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveRateLimiter:
+    def __init__(
+        self,
+        rate: float = 5.0,
+        min_rate: float = 0.5,
+        max_rate: float = 20.0,
+        burst: float = 4.0,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+    ):
+        """
+        - rate: requests/segundo iniciales
+        - burst: capacidad del bucket (requests que pueden salir juntos)
+        - increase: suma a la tasa por cada respuesta OK
+        - decrease: factor que multiplica la tasa ante un throttle
+        """
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self) -> float:
+        """Bloquea hasta que haya un token disponible; devuelve los segundos esperados."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                else:
+                    wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Registra un 429/5xx (o payload de throttling) y frena a todos los hilos.
+
+        Los throttles que llegan mientras sigue la pausa del anterior son la
+        misma ráfaga (requests que ya estaban en vuelo): sólo alargan la pausa,
+        no vuelven a bajar la tasa.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now >= self._blocked_until:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._tokens = 0.0
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self._blocked_until = max(self._blocked_until, now + pause)
+
+
+_LIMITER: Optional[AdaptiveRateLimiter] = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """Limitador compartido por todo el proceso."""
+    global _LIMITER
+    with _LIMITER_LOCK:
+        if _LIMITER is None:
+            _LIMITER = AdaptiveRateLimiter()
+        return _LIMITER
+
+
+def configure_rate_limiter(**kwargs) -> AdaptiveRateLimiter:
+    """Reemplaza el limitador compartido (p.ej. rate/max_rate distintos para un job)."""
+    global _LIMITER
+    with _LIMITER_LOCK:
+        _LIMITER = AdaptiveRateLimiter(**kwargs)
+        return _LIMITER
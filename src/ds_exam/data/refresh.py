@@ -0,0 +1,89 @@
+"""
+Refresh incremental del panel país-año.
+
+En vez de re-descargar 1990-2023 completo, se leen los años ya guardados,
+se piden sólo los años faltantes o recientes (parámetro `date` de la API) y
+las filas nuevas se integran al panel por (iso3, year).
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Sequence, Tuple, Union
+
+import pandas as pd
+
+PANEL_KEYS = ["iso3", "year"]
+
+
+def refresh_start_year(
+    stored: pd.DataFrame,
+    years_min: int,
+    years_max: int,
+    recent_years: int = 2,
+) -> int:
+    """
+    Primer año a re-descargar para dejar el panel al día.
+
+    Se re-piden siempre los últimos `recent_years` años guardados (la WB revisa
+    los datos recientes) y cualquier año de [years_min, years_max] que no esté.
+    """
+    if stored is None or stored.empty or "year" not in stored.columns:
+        return years_min
+
+    present = set(pd.to_numeric(stored["year"], errors="coerce").dropna().astype(int))
+    if not present:
+        return years_min
+
+    missing = [y for y in range(years_min, years_max + 1) if y not in present]
+    start = max(present) - max(recent_years, 1) + 1
+    if missing:
+        start = min(start, missing[0])
+    return int(min(max(start, years_min), years_max))
+
+
+def merge_panel_delta(
+    stored: pd.DataFrame,
+    delta: pd.DataFrame,
+    keys: Sequence[str] = PANEL_KEYS,
+) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Upsert de `delta` sobre `stored` por `keys`.
+
+    Los valores no nulos del delta reemplazan a los guardados; si el delta trae
+    NaN en una celda, se conserva el valor previo. Devuelve (panel, stats).
+    """
+    keys = list(keys)
+    stored_i = stored.set_index(keys)
+    delta_i = delta.drop_duplicates(subset=keys, keep="last").set_index(keys)
+
+    in_stored = delta_i.index.isin(stored_i.index)
+    merged = delta_i.combine_first(stored_i)
+
+    # Orden de columnas: el del panel guardado, luego cualquier columna nueva.
+    cols = [c for c in stored_i.columns if c in merged.columns]
+    cols += [c for c in merged.columns if c not in cols]
+    merged = merged[cols].reset_index().sort_values(keys).reset_index(drop=True)
+
+    stats = {
+        "rows_before": int(len(stored_i)),
+        "rows_after": int(len(merged)),
+        "rows_fetched": int(len(delta_i)),
+        "rows_added": int((~in_stored).sum()),
+        "rows_updated": int(in_stored.sum()),
+    }
+    return merged, stats
+
+
+def record_refresh(log_path: Union[str, Path], **info: Any) -> Dict[str, Any]:
+    """Agrega una línea JSON al log de refresh (qué se pidió y qué cambió)."""
+    entry: Dict[str, Any] = {"refreshed_at": datetime.now(timezone.utc).isoformat()}
+    entry.update(info)
+    path = Path(log_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps(entry, default=str) + "\n")
+    return entry
+
@@ -0,0 +1,84 @@
+"""
+Esquema canónico del panel país-año.
+
+- iso3: category (dictionary en arrow/parquet)
+- year: int16
+- indicadores (columnas float): float64 por default o float32 opcional,
+  con ±inf convertido a NaN una sola vez
+- columnas de texto (p. ej. country): category
+
+`enforce_panel_schema` se aplica al escribir (panel_store.write_panel) y la
+descripción queda en la metadata del parquet bajo SCHEMA_METADATA_KEY; al
+leer, un dataset con esa metadata ya viene tipado y no se vuelve a coercionar.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+SCHEMA_VERSION = 1
+SCHEMA_METADATA_KEY = b"ds_exam.panel_schema"
+
+YEAR_DTYPE = "int16"
+VALUE_DTYPES = ("float64", "float32")
+
+
+def enforce_panel_schema(df: pd.DataFrame, value_dtype: Optional[str] = None) -> pd.DataFrame:
+    """
+    Devuelve una copia de `df` con el esquema canónico.
+
+    - filas sin iso3 o year se descartan
+    - value_dtype: "float64" / "float32" para todas las columnas float;
+      None conserva el ancho que ya tengan
+    - columnas enteras/bool (p. ej. target) no se tocan
+    """
+    if not {"iso3", "year"}.issubset(df.columns):
+        raise ValueError(f"Panel needs iso3/year columns. Columns: {df.columns.tolist()}")
+    if value_dtype is not None and value_dtype not in VALUE_DTYPES:
+        raise ValueError(f"value_dtype must be one of {VALUE_DTYPES}, got {value_dtype!r}")
+
+    year = pd.to_numeric(df["year"], errors="coerce")
+    keep = (year.notna() & df["iso3"].notna()).to_numpy()
+    out = df.loc[keep].copy() if not keep.all() else df.copy()
+    out["year"] = year[keep].to_numpy().astype(YEAR_DTYPE)
+
+    for col in out.columns:
+        if col == "year":
+            continue
+        s = out[col]
+        if pd.api.types.is_float_dtype(s.dtype):
+            # Nullable Float32/Float64 become plain numpy floats (NA -> NaN).
+            dtype = value_dtype or (s.dtype if isinstance(s.dtype, np.dtype) else "float64")
+            vals = s.to_numpy(dtype=dtype, na_value=np.nan, copy=True)
+            vals[np.isinf(vals)] = np.nan
+            out[col] = vals
+        elif isinstance(s.dtype, pd.CategoricalDtype):
+            out[col] = s.cat.remove_unused_categories()
+        elif pd.api.types.is_object_dtype(s.dtype) or pd.api.types.is_string_dtype(s.dtype):
+            out[col] = s.astype("category")
+
+    out.attrs["panel_schema"] = schema_info(out)
+    return out
+
+
+def schema_info(df: pd.DataFrame) -> Dict[str, Any]:
+    """Descripción serializable del esquema (lo que se guarda en la metadata)."""
+    return {
+        "version": SCHEMA_VERSION,
+        "columns": {c: str(t) for c, t in df.dtypes.items()},
+    }
+
+
+def schema_metadata(df: pd.DataFrame) -> Dict[bytes, bytes]:
+    return {SCHEMA_METADATA_KEY: json.dumps(schema_info(df)).encode("utf-8")}
+
+
+def read_schema_metadata(metadata: Optional[Dict[bytes, bytes]]) -> Optional[Dict[str, Any]]:
+    """Esquema guardado en la metadata arrow/parquet (None si no hay)."""
+    if not metadata or SCHEMA_METADATA_KEY not in metadata:
+        return None
+    return json.loads(metadata[SCHEMA_METADATA_KEY].decode("utf-8"))
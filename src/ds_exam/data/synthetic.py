@@ -0,0 +1,78 @@
+"""
+Panel sintético con el esquema de q4a_panel_country_year.parquet, para benchmarks.
+
+Cada entidad sigue caminatas aleatorias en log-PIB per cápita, población e
+intensidad de CO2, así que las features y el target de Q4A salen con la misma
+forma que en los datos reales (ambas clases presentes). Con n_indicators > 0 se
+agregan columnas extra ind_000, ind_001, ... para simular más indicadores.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from ds_exam.data.schema import enforce_panel_schema
+
+
+def entity_codes(n: int) -> np.ndarray:
+    """Códigos tipo ISO3 (AAA, AAB, ...) y, pasadas las 17576 combinaciones, E000000..."""
+    if n <= 26**3:
+        i = np.arange(n)
+        letters = np.stack([i // 676 % 26, i // 26 % 26, i % 26], axis=1) + ord("A")
+        return letters.astype(np.uint8).view("S3").ravel().astype(str)
+    return np.char.add("E", np.char.zfill(np.arange(n).astype(str), 6))
+
+
+def synthetic_panel(
+    n_entities: int = 200,
+    years: Tuple[int, int] = (1990, 2023),
+    n_indicators: int = 0,
+    missing_share: float = 0.02,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Panel (iso3, year, gdp_current_usd, population, co2_mt, co2_per_capita[, ind_*]).
+
+    - n_entities x (years[1] - years[0] + 1) filas, ordenadas por (iso3, year)
+    - missing_share: fracción de valores NaN por columna (huecos al azar)
+    """
+    rng = np.random.default_rng(seed)
+    year_vals = np.arange(years[0], years[1] + 1, dtype=np.int16)
+    n_years = len(year_vals)
+    shape = (n_entities, n_years)
+
+    def walk(start, drift, vol):
+        steps = rng.normal(drift, vol, size=shape)
+        steps[:, 0] = 0.0
+        return start[:, None] + np.cumsum(steps, axis=1)
+
+    ln_gdp_pc = walk(rng.normal(9.0, 1.2, n_entities), 0.02, 0.04)
+    ln_pop = walk(rng.normal(16.0, 1.5, n_entities), 0.012, 0.004)
+    ln_co2_pc = walk(rng.normal(1.0, 1.0, n_entities), rng.normal(-0.005, 0.01, shape), 0.06)
+
+    population = np.exp(ln_pop)
+    co2_pc = np.exp(ln_co2_pc)
+    cols = {
+        "gdp_current_usd": np.exp(ln_gdp_pc + ln_pop),
+        "population": population,
+        "co2_mt": co2_pc * population / 1e6,
+        "co2_per_capita": co2_pc,
+    }
+    for k in range(n_indicators):
+        cols[f"ind_{k:03d}"] = walk(rng.normal(0.0, 1.0, n_entities), 0.0, 0.1)
+
+    df = pd.DataFrame(
+        {
+            "iso3": np.repeat(entity_codes(n_entities), n_years),
+            "year": np.tile(year_vals, n_entities),
+        }
+    )
+    for name, values in cols.items():
+        values = values.ravel()
+        if missing_share > 0:
+            values[rng.random(values.size) < missing_share] = np.nan
+        df[name] = values
+    return enforce_panel_schema(df)
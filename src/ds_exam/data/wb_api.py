@@ -3,17 +3,29 @@ World Bank API v2 client (requests directo, robusto).
 
 Devuelve DataFrame en formato long:
 country_id, iso3, country, year, indicator, indicator_name, value
+
+`fetch_indicator_columnar` devuelve el mismo formato pero compacto: las columnas
+de texto como category (dictionary-encoded), year como int16 y value como float64.
 """
 
 from __future__ import annotations
 
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+import threading
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
-import time
 import requests
+from requests.adapters import HTTPAdapter
+import numpy as np
 import pandas as pd
 
+from ds_exam.config import settings
+from ds_exam.config.indicators import Indicator, group_by_source
+from ds_exam.data.rate_limit import AdaptiveRateLimiter, get_rate_limiter, parse_retry_after
+from ds_exam.data.wb_cache import ResponseCache
+
 
 @dataclass(frozen=True)
 class WBClientConfig:
@@ -21,32 +33,202 @@ class WBClientConfig:
     per_page: int = 200
     timeout_seconds: int = 60
     max_retries: int = 4
+    # Ignorados: se aceptan por compatibilidad con configs existentes. El pacing
+    # y el backoff los hace el AdaptiveRateLimiter compartido, no sleeps fijos.
     backoff_seconds: float = 0.8
+    page_delay_seconds: float = 0.15
     user_agent: str = "ds-exam-wb-client/1.0"
+    # max_workers > 1 fetches pages 2..N concurrently once the first page's
+    # meta tells us how many there are; 1 keeps the original serial walk.
+    max_workers: int = 4
+    # Indicators per semicolon-joined request (keeps URLs short)
+    max_indicators_per_request: int = 20
+    # Cache en disco (None = sin cache). offline=True sólo sirve desde el cache.
+    cache_dir: Optional[str] = None
+    cache_ttl_seconds: Optional[float] = 7 * 24 * 3600
+    cache_max_bytes: Optional[int] = 1024 * 1024 * 1024
+    offline: bool = False
+    # refresh=True no lee el cache (siempre va a la API) pero sí guarda las
+    # respuestas nuevas: es lo que usan los refresh incrementales, que piden
+    # la misma URL cada vez y necesitan los datos revisados, no los de ayer.
+    refresh: bool = False
+
+
+class _DictColumn:
+    """Columna de texto dictionary-encoded: códigos int32 + lista de valores únicos."""
+
+    def __init__(self) -> None:
+        self.index: Dict[str, int] = {}
+        self.values: List[str] = []
+        self.codes = array("i")
+
+    def append(self, value: Optional[str]) -> None:
+        if value is None:
+            self.codes.append(-1)
+            return
+        code = self.index.get(value)
+        if code is None:
+            code = len(self.values)
+            self.index[value] = code
+            self.values.append(value)
+        self.codes.append(code)
+
+    def to_categorical(self) -> pd.Categorical:
+        codes = np.frombuffer(self.codes, dtype=np.int32) if len(self.codes) else np.empty(0, dtype=np.int32)
+        return pd.Categorical.from_codes(codes, categories=pd.Index(self.values, dtype=object))
+
+
+class _LongColumns:
+    """Acumula páginas de observaciones directamente en arrays tipados."""
+
+    _DICT_COLS = ("country_id", "iso3", "country", "indicator", "indicator_name")
+
+    def __init__(self) -> None:
+        self.dict_cols = {c: _DictColumn() for c in self._DICT_COLS}
+        self.year = array("h")
+        self.value = array("d")
+
+    def add_page(self, rows: List[Dict[str, Any]]) -> None:
+        nan = float("nan")
+        country_id = self.dict_cols["country_id"]
+        iso3 = self.dict_cols["iso3"]
+        country = self.dict_cols["country"]
+        indicator = self.dict_cols["indicator"]
+        indicator_name = self.dict_cols["indicator_name"]
+
+        for it in rows:
+            country_obj = it.get("country") or {}
+            cid = country_obj.get("id")
+            y = it.get("date")
+            # Misma regla que el path por dicts: sin country_id o sin año no entra.
+            if cid is None or y is None:
+                continue
+            try:
+                year = int(y)
+            except ValueError:
+                continue
+
+            ind_obj = it.get("indicator") or {}
+            v = it.get("value")
+
+            country_id.append(cid)
+            iso3.append(it.get("countryiso3code"))
+            country.append(country_obj.get("value"))
+            indicator.append(ind_obj.get("id"))
+            indicator_name.append(ind_obj.get("value"))
+            self.year.append(year)
+            self.value.append(nan if v is None else float(v))
+
+    def to_frame(self) -> pd.DataFrame:
+        n = len(self.year)
+        return pd.DataFrame(
+            {
+                "country_id": self.dict_cols["country_id"].to_categorical(),
+                "iso3": self.dict_cols["iso3"].to_categorical(),
+                "country": self.dict_cols["country"].to_categorical(),
+                "year": np.frombuffer(self.year, dtype=np.int16) if n else np.empty(0, dtype=np.int16),
+                "indicator": self.dict_cols["indicator"].to_categorical(),
+                "indicator_name": self.dict_cols["indicator_name"].to_categorical(),
+                "value": np.frombuffer(self.value, dtype=np.float64) if n else np.empty(0, dtype=np.float64),
+            }
+        )
+
+
+def default_config(cache: bool = True, refresh: bool = False) -> WBClientConfig:
+    """
+    Config de los scripts: base_url, cache y modo offline desde ds_exam.config.settings.
+
+    - cache=False: sin cache en disco (--no-cache)
+    - refresh=True: ignora las respuestas cacheadas y las reemplaza (--refresh, --incremental)
+    """
+    return WBClientConfig(
+        base_url=settings.WB_BASE_URL,
+        cache_dir=str(settings.WB_CACHE_DIR) if cache else None,
+        offline=settings.WB_OFFLINE,
+        refresh=refresh,
+    )
 
 
 class WorldBankClient:
-    def __init__(self, config: WBClientConfig = WBClientConfig()):
+    def __init__(
+        self,
+        config: WBClientConfig = WBClientConfig(),
+        limiter: Optional[AdaptiveRateLimiter] = None,
+    ):
         self.config = config
+        # Por defecto, el limitador de todo el proceso (compartido entre clientes).
+        self.limiter = limiter if limiter is not None else get_rate_limiter()
         self.session = requests.Session()
         self.session.headers.update(
             {
                 "User-Agent": self.config.user_agent,
                 "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate",
+                "Connection": "keep-alive",
             }
         )
-
-    def _get_json(self, url: str, params: Dict[str, Any]) -> Any:
-        for attempt in range(self.config.max_retries):
-            r = self.session.get(
-                url,
-                params=params,
-                timeout=self.config.timeout_seconds,
-                allow_redirects=True,
+        # Keep-alive pool sized to the page concurrency so parallel workers
+        # reuse connections instead of reconnecting (TCP+TLS) per request.
+        pool_size = max(1, self.config.max_workers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        if self.config.offline and not self.config.cache_dir:
+            raise ValueError("offline=True requires cache_dir (nothing to replay from)")
+        if self.config.offline and self.config.refresh:
+            raise ValueError("offline=True cannot refresh (cached responses are all it can use)")
+        self.cache: Optional[ResponseCache] = None
+        if self.config.cache_dir:
+            self.cache = ResponseCache(
+                self.config.cache_dir,
+                ttl_seconds=self.config.cache_ttl_seconds,
+                max_bytes=self.config.cache_max_bytes,
             )
 
+    def get_json(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        raise_on_message: bool = True,
+    ) -> Any:
+        """
+        GET crudo a través del transporte compartido (pool, rate limiter, cache).
+
+        - url: URL completa o endpoint relativo a config.base_url
+        - raise_on_message=False devuelve los payloads {"message": ...} tal cual,
+          para los callers que los manejan por su cuenta.
+        """
+        if not url.startswith(("http://", "https://")):
+            url = f"{self.config.base_url}/{url.lstrip('/')}"
+        return self._get_json(url, dict(params or {}), raise_on_message=raise_on_message)
+
+    def _get_json(self, url: str, params: Dict[str, Any], raise_on_message: bool = True) -> Any:
+        if self.cache is not None and not self.config.refresh:
+            cached = self.cache.get(url, params, allow_stale=self.config.offline)
+            if cached is not None:
+                return cached
+        if self.config.offline:
+            raise RuntimeError(f"Offline mode: no cached response for {url} params={params}")
+
+        last_err: Optional[Exception] = None
+        for _ in range(self.config.max_retries):
+            self.limiter.acquire()
+            try:
+                r = self.session.get(
+                    url,
+                    params=params,
+                    timeout=self.config.timeout_seconds,
+                    allow_redirects=True,
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_err = e
+                self.limiter.on_throttle()
+                continue
+
             if r.status_code in {429, 500, 502, 503, 504}:
-                time.sleep(self.config.backoff_seconds * (2 ** attempt))
+                last_err = RuntimeError(f"HTTP {r.status_code} for {r.url}")
+                self.limiter.on_throttle(parse_retry_after(r.headers.get("Retry-After")))
                 continue
 
             if r.status_code != 200:
@@ -60,6 +242,13 @@ class WorldBankClient:
 
             data = r.json()
 
+            # A 200 carrying only [meta] (no data slot) is how the API throttles.
+            if isinstance(data, list) and len(data) == 1 and isinstance(data[0], dict) and "message" not in data[0]:
+                last_err = RuntimeError(f"Throttled ([meta]-only payload) for {r.url}")
+                self.limiter.on_throttle()
+                continue
+            self.limiter.on_success()
+
             # World Bank error payloads have a few common shapes. Try to
             # extract a human-readable message if present and raise a
             # RuntimeError with that message to aid debugging.
@@ -88,11 +277,34 @@ class WorldBankClient:
 
             wb_msg = _extract_wb_message(data)
             if wb_msg:
-                raise RuntimeError(f"World Bank API error: {wb_msg}")
+                if raise_on_message:
+                    raise RuntimeError(f"World Bank API error: {wb_msg}")
+                return data
 
+            if self.cache is not None and isinstance(data, list) and len(data) >= 2:
+                self.cache.put(url, params, data)
             return data
 
-        raise RuntimeError("Max retries exceeded")
+        raise RuntimeError(f"Max retries exceeded for {url}. Last error: {last_err}")
+
+    def _get_page(
+        self, url: str, params: Dict[str, Any], page: int
+    ) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Descarga una página; devuelve (meta, rows) o None si viene vacía."""
+        page_params = dict(params)
+        page_params["page"] = page
+        data = self._get_json(url, page_params)
+
+        if not isinstance(data, list) or len(data) < 2:
+            raise RuntimeError(f"Unexpected API format at {url} params={page_params}")
+
+        meta, rows = data[0], data[1]
+        # If rows is None or an empty list, there is no data on this page.
+        if rows is None:
+            return None
+        if isinstance(rows, list) and len(rows) == 0:
+            return None
+        return meta, rows
 
     def _iter_pages(self, endpoint: str, params: Dict[str, Any]) -> Iterable[List[Dict[str, Any]]]:
         url = f"{self.config.base_url}/{endpoint.lstrip('/')}"
@@ -100,29 +312,52 @@ class WorldBankClient:
         params.setdefault("format", "json")
         params.setdefault("per_page", self.config.per_page)
 
-        page = 1
-        while True:
-            params["page"] = page
-            data = self._get_json(url, params)
-
-            if not isinstance(data, list) or len(data) < 2:
-                raise RuntimeError(f"Unexpected API format at {url} params={params}")
-
-            meta, rows = data[0], data[1]
-            # If rows is None or an empty list, stop iteration (no data).
-            if rows is None:
-                return
-            if isinstance(rows, list) and len(rows) == 0:
-                return
-
-            yield rows
-
-            pages = int(meta.get("pages", 1))
-            if page >= pages:
-                break
-
-            page += 1
-            time.sleep(0.15)
+        first = self._get_page(url, params, 1)
+        if first is None:
+            return
+        meta, rows = first
+        yield rows
+
+        pages = int(meta.get("pages", 1))
+        if pages <= 1:
+            return
+
+        if self.config.max_workers <= 1:
+            for page in range(2, pages + 1):
+                result = self._get_page(url, params, page)
+                if result is None:
+                    return
+                yield result[1]
+            return
+
+        # Concurrent mode: remaining pages go to a bounded pool over the
+        # shared session; results are yielded strictly in page order.
+        workers = min(self.config.max_workers, pages - 1)
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wb-page")
+        try:
+            futures = [
+                pool.submit(self._get_page, url, params, page)
+                for page in range(2, pages + 1)
+            ]
+            for fut in futures:
+                result = fut.result()
+                if result is None:
+                    return
+                yield result[1]
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _indicator_endpoint(indicator_code: str, countries: Union[str, List[str]]) -> str:
+        if isinstance(countries, list):
+            # Preserve provided country codes (don't force lower/upper).
+            # The World Bank API is case-insensitive, but keeping the
+            # original formatting helps debugging and avoids surprising
+            # transformations for callers.
+            countries_param = ";".join([c.strip() for c in countries])
+        else:
+            countries_param = countries.strip()
+        return f"country/{countries_param}/indicator/{indicator_code}"
 
     def fetch_indicator_country_year(
         self,
@@ -136,16 +371,7 @@ class WorldBankClient:
         - countries: "all" o ["MEX","USA"] (ISO3 preferible)
         - date: "2010:2020" o "2010" o None
         """
-        if isinstance(countries, list):
-            # Preserve provided country codes (don't force lower/upper).
-            # The World Bank API is case-insensitive, but keeping the
-            # original formatting helps debugging and avoids surprising
-            # transformations for callers.
-            countries_param = ";".join([c.strip() for c in countries])
-        else:
-            countries_param = countries.strip()
-
-        endpoint = f"country/{countries_param}/indicator/{indicator_code}"
+        endpoint = self._indicator_endpoint(indicator_code, countries)
         params: Dict[str, Any] = {}
         if date:
             params["date"] = date
@@ -178,3 +404,140 @@ class WorldBankClient:
         if not df.empty:
             df = df.dropna(subset=["country_id", "year"])
         return df
+
+    def fetch_indicator_columnar(
+        self,
+        indicator_code: str,
+        countries: Union[str, List[str]] = "all",
+        date: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Igual que fetch_indicator_country_year, pero cada página se vuelca
+        directamente en arrays tipados (sin un dict por observación).
+
+        Columnas de texto -> category, year -> int16, value -> float64 (NaN si falta).
+        """
+        endpoint = self._indicator_endpoint(indicator_code, countries)
+        params: Dict[str, Any] = {}
+        if date:
+            params["date"] = date
+
+        cols = _LongColumns()
+        for rows in self._iter_pages(endpoint, params=params):
+            cols.add_page(rows)
+        return cols.to_frame()
+
+    def fetch_countries(self) -> pd.DataFrame:
+        """
+        Lista /country: iso3, iso2, name, region, income_group, is_aggregate.
+
+        Los agregados (World, regiones, grupos de ingreso) tienen region == "Aggregates".
+        """
+        records: List[Dict[str, Any]] = []
+        for rows in self._iter_pages("country", params={"per_page": 400}):
+            for c in rows:
+                region = c.get("region") or {}
+                income = c.get("incomeLevel") or {}
+                iso3 = (c.get("id") or "").strip()
+                if not iso3:
+                    continue
+                records.append(
+                    {
+                        "iso3": iso3,
+                        "iso2": c.get("iso2Code"),
+                        "name": c.get("name"),
+                        "region": (region.get("value") or "").strip() or None,
+                        "income_group": (income.get("value") or "").strip() or None,
+                        "is_aggregate": region.get("value") == "Aggregates",
+                    }
+                )
+        df = pd.DataFrame(
+            records,
+            columns=["iso3", "iso2", "name", "region", "income_group", "is_aggregate"],
+        )
+        return df.drop_duplicates(subset=["iso3"]).sort_values("iso3").reset_index(drop=True)
+
+    def fetch_indicators_columnar(
+        self,
+        indicator_codes: List[str],
+        source_id: int,
+        countries: Union[str, List[str]] = "all",
+        date: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Varios indicadores del mismo source en un solo request:
+        /country/{countries}/indicator/A;B;C?source={source_id}
+
+        Devuelve el formato long compacto de fetch_indicator_columnar
+        (la columna `indicator` distingue cada serie).
+        """
+        endpoint = self._indicator_endpoint(";".join(indicator_codes), countries)
+        params: Dict[str, Any] = {"source": source_id}
+        if date:
+            params["date"] = date
+
+        cols = _LongColumns()
+        for rows in self._iter_pages(endpoint, params=params):
+            cols.add_page(rows)
+        return cols.to_frame()
+
+    def fetch_indicator_panel(
+        self,
+        indicators: List[Indicator],
+        countries: Union[str, List[str]] = "all",
+        date: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Panel wide (iso3, country, year, <indicator.column>...) pidiendo los
+        indicadores agrupados por source en requests de hasta
+        `max_indicators_per_request` códigos.
+        """
+        step = max(1, self.config.max_indicators_per_request)
+        longs: List[pd.DataFrame] = []
+        for source_id, group in group_by_source(indicators).items():
+            codes = [ind.code for ind in group]
+            for i in range(0, len(codes), step):
+                longs.append(
+                    self.fetch_indicators_columnar(codes[i : i + step], source_id, countries, date)
+                )
+
+        columns = {ind.code: ind.column for ind in indicators}
+        long = pd.concat(longs, ignore_index=True) if longs else pd.DataFrame()
+        if long.empty:
+            return pd.DataFrame(columns=["iso3", "country", "year"] + list(columns.values()))
+
+        # Aggregates without ISO3 come back with iso3 == "" and would collide.
+        long = long.dropna(subset=["iso3", "indicator"])
+        long = long.astype({"iso3": str, "country": str, "indicator": str})
+        long = long[long["iso3"] != ""]
+        wide = (
+            long.groupby(["iso3", "country", "year", "indicator"], sort=True)["value"]
+            .first()
+            .unstack("indicator")
+        )
+        wide = wide.rename(columns=columns).reset_index()
+        wide.columns.name = None
+        for col in columns.values():
+            if col not in wide.columns:
+                wide[col] = np.nan
+        return wide[["iso3", "country", "year"] + list(columns.values())]
+
+
+_SHARED_CLIENTS: Dict[WBClientConfig, WorldBankClient] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_client(config: Optional[WBClientConfig] = None) -> WorldBankClient:
+    """
+    Un WorldBankClient (una Session, un pool) por config en todo el proceso.
+
+    Los scripts de fetch lo usan como transporte común en vez de crear su
+    propia Session o llamar a requests.get directamente.
+    """
+    config = config if config is not None else default_config()
+    with _SHARED_LOCK:
+        client = _SHARED_CLIENTS.get(config)
+        if client is None:
+            client = WorldBankClient(config)
+            _SHARED_CLIENTS[config] = client
+        return client
@@ -0,0 +1,152 @@
+"""
+Cache en disco para respuestas JSON de la World Bank API.
+
+Cada respuesta se guarda como un archivo JSON cuyo nombre es el hash de
+(url, params). El mtime del archivo se actualiza en cada hit, así que el
+desalojo por tamaño es LRU: se borran primero los archivos menos usados.
+La antigüedad para el TTL se mide con `fetched_at`, guardado dentro del archivo.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+
+def cache_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Key estable para (url, params): el orden de los params no importa."""
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+    raw = json.dumps([url, items], separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        """
+        - ttl_seconds: None = las entradas nunca expiran
+        - max_bytes: None = sin límite de tamaño
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Tamaño aproximado del cache; se recalcula completo sólo al desalojar.
+        self._approx_bytes: Optional[int] = None
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        allow_stale: bool = False,
+    ) -> Any:
+        """
+        Devuelve el payload cacheado o None si no hay entrada válida
+        (la API nunca devuelve `null` como payload completo).
+
+        allow_stale=True ignora el TTL (modo offline: mejor un dato viejo que nada).
+        """
+        path = self._path(cache_key(url, params))
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                entry = json.load(fh)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # Entrada corrupta (p.ej. escritura interrumpida): se trata como miss.
+            return None
+
+        if not allow_stale and self.ttl_seconds is not None:
+            age = time.time() - float(entry.get("fetched_at", 0))
+            if age > self.ttl_seconds:
+                return None
+
+        try:
+            os.utime(path)  # marca de uso para el LRU
+        except OSError:
+            pass
+        return entry.get("payload")
+
+    def put(self, url: str, params: Optional[Dict[str, Any]], payload: Any) -> None:
+        entry = {
+            "url": url,
+            "params": {str(k): v for k, v in (params or {}).items()},
+            "fetched_at": time.time(),
+            "payload": payload,
+        }
+        path = self._path(cache_key(url, params))
+        # Escritura atómica: los workers concurrentes nunca ven un archivo a medias.
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(entry, fh, separators=(",", ":"))
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+        if self.max_bytes is not None:
+            with self._lock:
+                if self._approx_bytes is None:
+                    self._approx_bytes = sum(
+                        q.stat().st_size for q in self.cache_dir.glob("*.json")
+                    )
+                else:
+                    self._approx_bytes += path.stat().st_size
+                over = self._approx_bytes > self.max_bytes
+            if over:
+                self.evict()
+
+    def evict(self) -> int:
+        """Borra las entradas menos usadas hasta quedar bajo max_bytes."""
+        if self.max_bytes is None:
+            return 0
+        with self._lock:
+            entries: list[Tuple[float, int, Path]] = []
+            total = 0
+            for p in self.cache_dir.glob("*.json"):
+                try:
+                    st = p.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+                total += st.st_size
+
+            removed = 0
+            if total > self.max_bytes:
+                for _, size, p in sorted(entries, key=lambda e: e[0]):
+                    try:
+                        p.unlink()
+                    except FileNotFoundError:
+                        continue
+                    total -= size
+                    removed += 1
+                    if total <= self.max_bytes:
+                        break
+            self._approx_bytes = total
+            return removed
+
+    def clear(self) -> None:
+        self._approx_bytes = None
+        for p in self.cache_dir.glob("*.json"):
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,384 @@
+"""
+Servidor local que imita la World Bank API v2, para tests y benchmarks sin red.
+
+Rutas (bajo /v2, con paginación page/per_page como la API real):
+- /country
+- /country/{all|A;B}/indicator/{CODE[;CODE2...]}?date=Y0:Y1[&source=ID]
+
+Los datos salen de fixtures grabadas con `record_fixtures` (respuestas reales,
+una por página) o, si no hay fixture para el request, de un generador
+determinístico (países sintéticos + algunos agregados). `FaultConfig` inyecta
+latencia y las rarezas de la API real: 429 con Retry-After, 5xx, payloads
+[meta] sin datos (throttling) y errores {"message": ...}.
+
+Uso:
+    with FakeWorldBankServer(faults=FaultConfig(latency_s=0.05, p_429=0.1)) as srv:
+        client = WorldBankClient(WBClientConfig(base_url=srv.base_url))
+
+o, para los scripts de fetch, WB_BASE_URL=<srv.base_url> (ver scripts/wb_fake_server.py).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from ds_exam.config.indicators import INDICATORS
+from ds_exam.data.synthetic import entity_codes
+from ds_exam.data.wb_api import WorldBankClient, shared_client
+
+API_PREFIX = "/v2"
+# Params that do not change the payload (the API always answers JSON here).
+_IGNORED_PARAMS = ("format",)
+
+AGGREGATES = {
+    "WLD": ("1W", "World"),
+    "EUU": ("EU", "European Union"),
+    "HIC": ("XD", "High income"),
+    "LMY": ("XO", "Low & middle income"),
+}
+
+
+@dataclass(frozen=True)
+class FaultConfig:
+    """
+    Latencia y errores inyectados (probabilidades por request, con semilla).
+
+    - latency_s + uniforme(0, jitter_s) de espera antes de cada respuesta
+    - p_429 (con Retry-After = retry_after_s), p_503, p_meta_only
+      ([meta] sin slot de datos, HTTP 200) y p_message ({"message": ...}, HTTP 200)
+    - fail_first: los primeros N requests responden 429 (arranque en frío)
+    """
+
+    latency_s: float = 0.0
+    jitter_s: float = 0.0
+    p_429: float = 0.0
+    p_503: float = 0.0
+    p_meta_only: float = 0.0
+    p_message: float = 0.0
+    retry_after_s: Optional[float] = 0.0
+    fail_first: int = 0
+    seed: int = 0
+
+
+def fixture_key(path: str, params: Dict[str, Any]) -> str:
+    """Key de una página: ruta relativa a /v2 (minúsculas) + params ordenados."""
+    path = "/" + unquote(path).strip("/").lower()
+    if path.startswith(API_PREFIX + "/") or path == API_PREFIX:
+        path = path[len(API_PREFIX) :] or "/"
+    params = {"page": 1, **params}  # no page param = first page
+    items = sorted(
+        (str(k).lower(), str(v)) for k, v in params.items() if k not in _IGNORED_PARAMS
+    )
+    raw = json.dumps([path, items], separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def load_fixtures(fixtures_dir: Union[str, Path]) -> Dict[str, Any]:
+    """{fixture_key: payload} de todos los *.json de fixtures_dir."""
+    out: Dict[str, Any] = {}
+    for p in sorted(Path(fixtures_dir).glob("*.json")):
+        rec = json.loads(p.read_text(encoding="utf-8"))
+        out[fixture_key(rec["path"], rec["params"])] = rec["payload"]
+    return out
+
+
+def _message(key: str, value: str, msg_id: str = "120") -> List[Dict[str, Any]]:
+    return [{"message": [{"id": msg_id, "key": key, "value": value}]}]
+
+
+class SyntheticWorldBank:
+    """
+    Datos determinísticos: n_countries países (AAA, AAB, ...) + AGGREGATES,
+    valores por (indicador, país, año) derivados de un hash, ~missing_share NaN.
+    """
+
+    def __init__(
+        self,
+        n_countries: int = 200,
+        years: Tuple[int, int] = (1960, 2023),
+        missing_share: float = 0.03,
+    ):
+        self.years = years
+        self.missing_share = missing_share
+        self.countries: List[Dict[str, Any]] = []
+        for iso3 in entity_codes(n_countries):
+            self.countries.append(
+                {
+                    "id": iso3,
+                    "iso2Code": iso3[:2],
+                    "name": f"Country {iso3}",
+                    "region": {"id": "SYN", "iso2code": "SY", "value": "Synthetic"},
+                    "incomeLevel": {"id": "UMC", "iso2code": "XT", "value": "Upper middle income"},
+                }
+            )
+        for iso3, (iso2, name) in AGGREGATES.items():
+            self.countries.append(
+                {
+                    "id": iso3,
+                    "iso2Code": iso2,
+                    "name": name,
+                    "region": {"id": "NA", "iso2code": "NA", "value": "Aggregates"},
+                    "incomeLevel": {"id": "NA", "iso2code": "NA", "value": "Aggregates"},
+                }
+            )
+        self._by_iso3 = {c["id"]: c for c in self.countries}
+        self._names = {ind.code: ind.name for ind in INDICATORS.values()}
+
+    def value(self, code: str, iso3: str, year: int) -> Optional[float]:
+        h = zlib.crc32(f"{code}|{iso3}|{year}".encode("utf-8"))
+        u = (h & 0xFFFF) / 0xFFFF
+        if u < self.missing_share:
+            return None
+        # Smooth per-country level and trend, plus a little noise.
+        base = 1.0 + (zlib.crc32(f"{code}|{iso3}".encode("utf-8")) % 1000) / 100.0
+        trend = 1.0 + 0.02 * (year - self.years[0])
+        return round(math.exp(base) * trend * (0.95 + 0.1 * u), 4)
+
+    def observations(
+        self, codes: List[str], countries: List[str], years: Tuple[int, int]
+    ) -> List[Dict[str, Any]]:
+        rows = []
+        for code in codes:
+            for iso3 in countries:
+                c = self._by_iso3[iso3]
+                for year in range(years[1], years[0] - 1, -1):  # the API lists newest first
+                    rows.append(
+                        {
+                            "indicator": {"id": code, "value": self._names.get(code, code)},
+                            "country": {"id": c["iso2Code"], "value": c["name"]},
+                            "countryiso3code": iso3,
+                            "date": str(year),
+                            "value": self.value(code, iso3, year),
+                            "unit": "",
+                            "obs_status": "",
+                            "decimal": 0,
+                        }
+                    )
+        return rows
+
+    def respond(self, path: str, params: Dict[str, str]) -> Tuple[int, Any]:
+        parts = [p for p in unquote(path).strip("/").split("/") if p]
+        if parts[:1] == [API_PREFIX.strip("/")]:
+            parts = parts[1:]
+        try:
+            page = max(1, int(params.get("page", 1)))
+            per_page = max(1, int(params.get("per_page", 50)))
+        except ValueError:
+            return 200, _message("Invalid value", "The provided parameter value is not valid")
+
+        if parts == ["country"]:
+            return 200, self._paginate(self.countries, page, per_page)
+
+        if len(parts) == 4 and parts[0] == "country" and parts[2] == "indicator":
+            codes = [c for c in parts[3].split(";") if c]
+            if len(codes) > 1 and "source" not in params:
+                return 200, _message(
+                    "Invalid format", "Multiple indicators require the source parameter", "160"
+                )
+            if parts[1].lower() == "all":
+                countries = [c["id"] for c in self.countries]
+            else:
+                countries = [c.strip().upper() for c in parts[1].split(";")]
+                unknown = [c for c in countries if c not in self._by_iso3]
+                if unknown:
+                    return 200, _message("Invalid value", f"Unknown country: {unknown[0]}")
+            years = self._date_range(params.get("date"))
+            if years is None:
+                return 200, _message("Invalid value", "The provided date is not valid")
+            rows = self.observations(codes, countries, years)
+            return 200, self._paginate(rows, page, per_page)
+
+        return 404, _message("Invalid URL", f"Unknown endpoint: /{'/'.join(parts)}", "110")
+
+    def _date_range(self, date: Optional[str]) -> Optional[Tuple[int, int]]:
+        if not date:
+            return self.years
+        try:
+            lo, _, hi = date.partition(":")
+            y0, y1 = int(lo), int(hi or lo)
+        except ValueError:
+            return None
+        return max(y0, self.years[0]), min(y1, self.years[1])
+
+    @staticmethod
+    def _paginate(rows: List[Any], page: int, per_page: int) -> List[Any]:
+        total = len(rows)
+        pages = max(1, math.ceil(total / per_page))
+        chunk = rows[(page - 1) * per_page : page * per_page]
+        meta = {
+            "page": page,
+            "pages": pages,
+            "per_page": per_page,
+            "total": total,
+            "sourceid": "2",
+            "lastupdated": "2024-01-01",
+        }
+        return [meta, chunk or None]
+
+
+@dataclass
+class FakeWorldBankServer:
+    """
+    Servidor HTTP (un thread por request) en 127.0.0.1; base_url apunta a /v2.
+
+    - fixtures_dir: páginas grabadas con record_fixtures (tienen prioridad)
+    - synthetic: None = SyntheticWorldBank() por default; False = sólo fixtures
+    - stats: conteo de respuestas por tipo ("ok", "429", "503", "meta_only", ...)
+    """
+
+    port: int = 0
+    fixtures_dir: Optional[Union[str, Path]] = None
+    synthetic: Any = None
+    faults: FaultConfig = FaultConfig()
+    stats: Counter = field(default_factory=Counter)
+
+    def __post_init__(self) -> None:
+        self.fixtures = load_fixtures(self.fixtures_dir) if self.fixtures_dir else {}
+        if self.synthetic is None:
+            self.synthetic = SyntheticWorldBank()
+        self._rng = random.Random(self.faults.seed)
+        self._lock = threading.Lock()
+        self._n_requests = 0
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        if self._httpd is None:
+            raise RuntimeError("Server not started")
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self) -> "FakeWorldBankServer":
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802 (http.server API)
+                server._handle(self)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="wb-fake", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "FakeWorldBankServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _fault(self) -> Optional[str]:
+        f = self.faults
+        with self._lock:
+            self._n_requests += 1
+            if self._n_requests <= f.fail_first:
+                return "429"
+            u = self._rng.random()
+            jitter = self._rng.uniform(0.0, f.jitter_s) if f.jitter_s else 0.0
+        delay = f.latency_s + jitter
+        if delay > 0:
+            time.sleep(delay)
+        for kind, p in (
+            ("429", f.p_429),
+            ("503", f.p_503),
+            ("meta_only", f.p_meta_only),
+            ("message", f.p_message),
+        ):
+            if u < p:
+                return kind
+            u -= p
+        return None
+
+    def _handle(self, req: BaseHTTPRequestHandler) -> None:
+        split = urlsplit(req.path)
+        params = dict(parse_qsl(split.query, keep_blank_values=True))
+        fault = self._fault()
+
+        status, payload, headers = 200, None, {}
+        if fault == "429":
+            status, payload = 429, _message("Too many requests", "Rate limit exceeded", "429")
+            if self.faults.retry_after_s is not None:
+                headers["Retry-After"] = f"{self.faults.retry_after_s:g}"
+        elif fault == "503":
+            status, payload = 503, _message("Service unavailable", "Try again later", "503")
+        elif fault == "meta_only":
+            payload = [{"page": int(params.get("page", 1)), "pages": 0, "per_page": 0, "total": 0}]
+        elif fault == "message":
+            payload = _message("Service error", "Temporary error, please retry", "199")
+        else:
+            key = fixture_key(split.path, params)
+            if key in self.fixtures:
+                payload = self.fixtures[key]
+            elif self.synthetic:
+                status, payload = self.synthetic.respond(split.path, params)
+            else:
+                status, payload = 404, _message("Not recorded", f"No fixture for {req.path}", "110")
+        self.stats[fault or ("ok" if status == 200 else str(status))] += 1
+
+        body = json.dumps(payload).encode("utf-8")
+        req.send_response(status)
+        req.send_header("Content-Type", "application/json;charset=utf-8")
+        req.send_header("Content-Length", str(len(body)))
+        for k, v in headers.items():
+            req.send_header(k, v)
+        req.end_headers()
+        req.wfile.write(body)
+
+
+def record_fixtures(
+    calls: Iterable[Tuple[str, Dict[str, Any]]],
+    out_dir: Union[str, Path],
+    client: Optional[WorldBankClient] = None,
+) -> List[Path]:
+    """
+    Graba las respuestas reales de cada (endpoint, params), todas las páginas.
+
+    endpoint relativo a /v2 (p. ej. "country/all/indicator/SP.POP.TOTL"). Cada
+    página queda en out_dir/<fixture_key>.json con {"path", "params", "payload"};
+    el servidor las sirve tal cual para la misma ruta, params y página.
+    """
+    client = client if client is not None else shared_client()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written: List[Path] = []
+    for endpoint, params in calls:
+        params = {"format": "json", **params}
+        page, pages = 1, 1
+        while page <= pages:
+            page_params = {**params, "page": page}
+            payload = client.get_json(endpoint, params=page_params, raise_on_message=False)
+            path = f"{API_PREFIX}/{endpoint.strip('/')}"
+            dest = out_dir / f"{fixture_key(path, page_params)}.json"
+            rec = {"path": path, "params": {k: str(v) for k, v in page_params.items()}, "payload": payload}
+            dest.write_text(json.dumps(rec), encoding="utf-8")
+            written.append(dest)
+            meta = payload[0] if isinstance(payload, list) and payload else {}
+            pages = int(meta.get("pages", 1) or 1) if isinstance(meta, dict) else 1
+            page += 1
+    return written
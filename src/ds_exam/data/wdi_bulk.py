@@ -0,0 +1,221 @@
+"""
+Lectura del archivo bulk de WDI (WDI_CSV.zip) desde disco, sin API.
+
+El zip trae WDICSV.csv (WDIData.csv en versiones viejas): una fila por
+(país, indicador) y una columna por año, ~400k filas. Se lee en streaming
+(bloques de pyarrow, descomprimiendo del zip sobre la marcha), sólo con las
+columnas de los años pedidos, y en cada bloque se filtran los códigos de
+indicador (y países) pedidos antes de acumular nada.
+
+Salida: el formato long de WorldBankClient.fetch_indicator_country_year
+(country_id, iso3, country, year, indicator, indicator_name, value), con los
+tipos compactos de fetch_indicator_columnar.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+
+from ds_exam.config import settings
+
+WDI_ZIP_PATH = settings.DATA_RAW / "worldbank" / "WDI_CSV.zip"
+
+DATA_MEMBERS = ("WDICSV.csv", "WDIData.csv")
+COUNTRY_MEMBERS = ("WDICountry.csv",)
+ID_COLUMNS = ("Country Name", "Country Code", "Indicator Name", "Indicator Code")
+
+# pyarrow block size: bounds memory per chunk while keeping the parser busy
+BLOCK_SIZE = 4 << 20
+
+
+def _member(zf: zipfile.ZipFile, candidates: Sequence[str]) -> Optional[str]:
+    names = {Path(n).name.lower(): n for n in zf.namelist()}
+    for c in candidates:
+        if c.lower() in names:
+            return names[c.lower()]
+    return None
+
+
+@contextmanager
+def _open_data(path: Path, member: Optional[str] = None) -> Iterator[IO[bytes]]:
+    """Stream binario del CSV de datos (dentro del zip o un .csv suelto)."""
+    if path.suffix.lower() != ".zip":
+        with open(path, "rb") as fh:
+            yield fh
+        return
+    with zipfile.ZipFile(path) as zf:
+        name = member or _member(zf, DATA_MEMBERS)
+        if name is None:
+            raise ValueError(f"No WDI data CSV ({' / '.join(DATA_MEMBERS)}) in {path}")
+        with zf.open(name) as fh:
+            yield fh
+
+
+def _header(fh: IO[bytes]) -> List[str]:
+    text = io.TextIOWrapper(fh, encoding="utf-8-sig", newline="")
+    try:
+        return [c.strip() for c in next(csv.reader(text))]
+    finally:
+        text.detach()
+
+
+def iso2_codes(path: Union[str, Path] = WDI_ZIP_PATH) -> Dict[str, str]:
+    """{iso3: iso2} de WDICountry.csv (el country.id de la API); {} si no viene en el zip."""
+    path = Path(path)
+    if path.suffix.lower() != ".zip":
+        return {}
+    with zipfile.ZipFile(path) as zf:
+        name = _member(zf, COUNTRY_MEMBERS)
+        if name is None:
+            return {}
+        with zf.open(name) as fh:
+            df = pd.read_csv(fh, usecols=lambda c: c in ("Country Code", "2-alpha code"), dtype=str)
+    if "2-alpha code" not in df.columns:
+        return {}
+    df = df.dropna()
+    return dict(zip(df["Country Code"], df["2-alpha code"]))
+
+
+def _categorical(values: np.ndarray, n_years: int) -> pd.Categorical:
+    codes, uniques = pd.factorize(values, sort=True)
+    return pd.Categorical.from_codes(
+        np.repeat(codes, n_years), categories=pd.Index(uniques, dtype=object)
+    )
+
+
+def read_wdi_archive(
+    indicator_codes: Iterable[str],
+    path: Union[str, Path] = WDI_ZIP_PATH,
+    years: Optional[Tuple[int, int]] = None,
+    countries: Optional[Iterable[str]] = None,
+    keep_missing: bool = True,
+    block_size: int = BLOCK_SIZE,
+) -> pd.DataFrame:
+    """
+    Observaciones long de los indicadores pedidos.
+
+    - path: WDI_CSV.zip (o el CSV de datos ya descomprimido)
+    - years: (min, max) inclusive; None = todos los años del archivo
+    - countries: ISO3 a conservar (None = todos, agregados incluidos, como country/all)
+    - keep_missing=False descarta años sin valor (la API los devuelve con value null)
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"No existe el archivo: {path}")
+    codes = pa.array(sorted(set(indicator_codes)), type=pa.string())
+    iso_set = None
+    if countries is not None:
+        iso_set = pa.array(sorted({c.strip().upper() for c in countries}), type=pa.string())
+
+    with _open_data(path) as fh:
+        header = _header(fh)
+    missing = [c for c in ID_COLUMNS if c not in header]
+    if missing:
+        raise ValueError(f"Not a WDI data CSV ({path}); missing columns {missing}")
+    year_cols = [
+        c for c in header if c.isdigit() and (years is None or years[0] <= int(c) <= years[1])
+    ]
+
+    read = pv.ReadOptions(column_names=header, skip_rows=1, block_size=block_size)
+    convert = pv.ConvertOptions(
+        include_columns=list(ID_COLUMNS) + year_cols,
+        column_types={
+            **{c: pa.string() for c in ID_COLUMNS},
+            **{c: pa.float64() for c in year_cols},
+        },
+    )
+    batches = []
+    with _open_data(path) as fh:
+        # Batches are filtered as they are decoded; only matching rows are kept.
+        for batch in pv.open_csv(fh, read_options=read, convert_options=convert):
+            mask = pc.is_in(batch.column("Indicator Code"), value_set=codes)
+            if iso_set is not None:
+                mask = pc.and_(mask, pc.is_in(batch.column("Country Code"), value_set=iso_set))
+            kept = batch.filter(mask)
+            if kept.num_rows:
+                batches.append(kept)
+
+    if not batches:
+        return _empty_long()
+    table = pa.Table.from_batches(batches)
+
+    # Wide -> long without melt: one (n_rows x n_years) matrix, raveled row-major.
+    n_years = len(year_cols)
+    year_vals = np.array([int(c) for c in year_cols], dtype=np.int16)
+    values = np.empty((table.num_rows, n_years), dtype=np.float64)
+    for j, c in enumerate(year_cols):
+        values[:, j] = table.column(c).to_numpy(zero_copy_only=False)
+
+    def ids(name: str) -> np.ndarray:
+        return table.column(name).to_numpy(zero_copy_only=False)
+
+    iso3 = ids("Country Code")
+    iso2 = iso2_codes(path)
+    country_id = np.array([iso2.get(i, i) for i in iso3], dtype=object)
+
+    long = pd.DataFrame(
+        {
+            "country_id": _categorical(country_id, n_years),
+            "iso3": _categorical(iso3, n_years),
+            "country": _categorical(ids("Country Name"), n_years),
+            "year": np.tile(year_vals, table.num_rows),
+            "indicator": _categorical(ids("Indicator Code"), n_years),
+            "indicator_name": _categorical(ids("Indicator Name"), n_years),
+            "value": values.ravel(),
+        }
+    )
+    if not keep_missing:
+        long = long[long["value"].notna()]
+    return long.sort_values(["indicator", "iso3", "year"], kind="stable").reset_index(drop=True)
+
+
+def _empty_long() -> pd.DataFrame:
+    empty_cat = pd.Categorical([], categories=pd.Index([], dtype=object))
+    return pd.DataFrame(
+        {
+            "country_id": empty_cat,
+            "iso3": empty_cat,
+            "country": empty_cat,
+            "year": np.empty(0, dtype=np.int16),
+            "indicator": empty_cat,
+            "indicator_name": empty_cat,
+            "value": np.empty(0, dtype=np.float64),
+        }
+    )
+
+
+def wdi_frames(
+    columns: Dict[str, str],
+    path: Union[str, Path] = WDI_ZIP_PATH,
+    years: Optional[Tuple[int, int]] = None,
+    countries: Optional[Iterable[str]] = None,
+) -> List[pd.DataFrame]:
+    """
+    Un frame (iso3, year, <columna>) por entrada de {columna: código WB},
+    listo para assemble_panel; todo sale de una sola lectura del archivo.
+    """
+    long = read_wdi_archive(columns.values(), path, years, countries, keep_missing=False)
+    frames = []
+    for col, code in columns.items():
+        sub = long[long["indicator"] == code]
+        frames.append(
+            pd.DataFrame(
+                {
+                    "iso3": sub["iso3"].astype(object).to_numpy(),
+                    "year": sub["year"].to_numpy(),
+                    col: sub["value"].to_numpy(),
+                }
+            )
+        )
+    return frames
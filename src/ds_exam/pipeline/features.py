@@ -0,0 +1,391 @@
+"""
+Registro declarativo de features (Q4 y Q4A comparten las definiciones).
+
+Cada feature declara sus inputs (columnas del panel u otras features) y una
+función vectorizada, o una transformación de panel (lag/lead/diff/growth por
+país, ver ds_exam.data.panel_transform). Pedir un conjunto de features calcula
+sólo el subgrafo de dependencias necesario, en orden topológico, y cada
+intermedio se calcula una vez: `FeatureFrame` guarda lo ya calculado, así que
+probar otro subconjunto sobre el mismo panel sólo calcula lo que falta.
+
+    ff = FEATURES.frame(panel)
+    X = ff.compute(["ln_gdp_pc", "d_ln_gdp_pc_lag1"])
+    X2 = ff.compute(["ln_gdp_pc", "ln_co2_intensity"])   # ln_gdp_pc ya está en caché
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ds_exam.data.panel_transform import (
+    PanelOp,
+    PanelTransform,
+    diff,
+    rolling_mean,
+    rolling_slope,
+    rolling_std,
+)
+
+EPS = 1e-12
+# year_norm = (year - YEAR_ORIGIN) / YEAR_SCALE. Fixed, so stored rows stay valid when
+# years are appended; 1990-2018 (the target years of 1990-2023 with a 5-year lead) -> [0, 1].
+YEAR_ORIGIN = 1990
+YEAR_SCALE = 28.0
+# rolling mean / volatility / OLS slope per country over the last w years (t included)
+ROLLING_SOURCES = ("ln_gdp_pc", "co2_per_capita", "ln_co2_intensity")
+ROLLING_WINDOWS = (3, 5, 10)
+
+
+@dataclass(frozen=True)
+class Feature:
+    """
+    Una feature: `fn(*inputs)` (Series alineadas) o una `op` de panel sobre su único input.
+    """
+
+    name: str
+    inputs: Tuple[str, ...]
+    fn: Optional[Callable[..., pd.Series]] = None
+    op: Optional[PanelOp] = None
+    doc: str = ""
+
+    def __post_init__(self) -> None:
+        if (self.fn is None) == (self.op is None):
+            raise ValueError(f"Feature {self.name!r} needs exactly one of fn / op")
+
+
+def panel_feature(name: str, op: PanelOp, doc: str = "") -> Feature:
+    """Feature de panel (lag/lead/diff/growth por país) de la columna `op.column`."""
+    return Feature(name, (op.column,), op=PanelOp(op.kind, op.column, op.periods, name), doc=doc)
+
+
+class FeatureRegistry:
+    """Definiciones por nombre; `frame(df)` las evalúa sobre un panel."""
+
+    def __init__(self, features: Iterable[Feature] = ()) -> None:
+        self._features: Dict[str, Feature] = {}
+        for f in features:
+            self.add(f)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._features
+
+    def __getitem__(self, name: str) -> Feature:
+        return self._features[name]
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._features)
+
+    def add(self, feature: Feature) -> Feature:
+        if feature.name in self._features:
+            raise ValueError(f"Feature {feature.name!r} is already registered")
+        self._features[feature.name] = feature
+        return feature
+
+    def register(self, name: str, *inputs: str, doc: str = ""):
+        """Decorador: registra `fn(*inputs)` como la feature `name`."""
+
+        def deco(fn: Callable[..., pd.Series]) -> Callable[..., pd.Series]:
+            self.add(Feature(name, tuple(inputs), fn=fn, doc=doc))
+            return fn
+
+        return deco
+
+    def extend(self, features: Iterable[Feature]) -> "FeatureRegistry":
+        """Copia del registro con `features` agregadas (el original no cambia)."""
+        out = FeatureRegistry(self._features.values())
+        for f in features:
+            out.add(f)
+        return out
+
+    def resolve(
+        self,
+        names: Sequence[str],
+        available: Iterable[str] = (),
+        columns_unknown: bool = False,
+    ) -> List[str]:
+        """
+        Features registradas que hacen falta para `names`, en orden topológico.
+
+        Lo que está en `available` (columnas o features ya calculadas) corta la
+        búsqueda; un nombre que no está en ningún lado es un error, salvo con
+        columns_unknown=True (todo lo no registrado se toma como columna).
+        """
+        available = set(available)
+        order: List[str] = []
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(name: str, path: Tuple[str, ...]) -> None:
+            if name in available or state.get(name) == 2:
+                return
+            if name not in self._features:
+                if columns_unknown:
+                    return
+                via = f" (needed by {' -> '.join(path)})" if path else ""
+                raise ValueError(f"Unknown feature or missing column {name!r}{via}")
+            if state.get(name) == 1:
+                raise ValueError(f"Feature cycle: {' -> '.join(path + (name,))}")
+            state[name] = 1
+            for dep in self._features[name].inputs:
+                visit(dep, path + (name,))
+            state[name] = 2
+            order.append(name)
+
+        for n in names:
+            visit(n, ())
+        return order
+
+    def lookaround(self, names: Sequence[str]) -> Tuple[int, int]:
+        """
+        (filas hacia atrás, filas hacia adelante) por país que leen `names`.
+
+        Suma los periodos de las ops de panel a lo largo de cada cadena de
+        dependencias (un diff de un lag mira 2 filas atrás).
+        """
+        back: Dict[str, int] = {}
+        ahead: Dict[str, int] = {}
+        for n in self.resolve(names, columns_unknown=True):
+            f = self._features[n]
+            b = max((back.get(d, 0) for d in f.inputs), default=0)
+            a = max((ahead.get(d, 0) for d in f.inputs), default=0)
+            if f.op is not None:
+                b += f.op.back
+                a += f.op.ahead
+            back[n], ahead[n] = b, a
+        return (
+            max((back.get(n, 0) for n in names), default=0),
+            max((ahead.get(n, 0) for n in names), default=0),
+        )
+
+    def frame(self, df: pd.DataFrame, group: str = "iso3", time: str = "year") -> "FeatureFrame":
+        return FeatureFrame(self, df, group=group, time=time)
+
+
+class FeatureFrame:
+    """
+    Un panel (ordenado por group, time) + las features ya calculadas sobre él.
+    """
+
+    def __init__(
+        self,
+        registry: FeatureRegistry,
+        df: pd.DataFrame,
+        group: str = "iso3",
+        time: str = "year",
+        assume_sorted: bool = False,
+        cache: Optional[Dict[str, pd.Series]] = None,
+    ) -> None:
+        self.registry = registry
+        self.panel = PanelTransform(df, group=group, time=time, assume_sorted=assume_sorted)
+        self.cache: Dict[str, pd.Series] = dict(cache or {})
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        return self.panel.frame
+
+    def __len__(self) -> int:
+        return len(self.panel)
+
+    def __getitem__(self, name: str) -> pd.Series:
+        self._ensure([name])
+        return self._get(name)
+
+    def compute(self, names: Sequence[str]) -> pd.DataFrame:
+        """DataFrame con `names` (features o columnas del panel), en ese orden."""
+        self._ensure(names)
+        return pd.DataFrame({n: self._get(n) for n in names}, index=self.frame.index)
+
+    def filter(self, mask) -> "FeatureFrame":
+        """
+        Sub-panel con las filas de `mask`; lo ya calculado se conserva (filtrado).
+
+        Las features de panel calculadas después del filtro usan los vecinos
+        del sub-panel, no los del original.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        frame = self.frame[mask].reset_index(drop=True)
+        cache = {n: s[mask].reset_index(drop=True) for n, s in self.cache.items()}
+        return FeatureFrame(
+            self.registry,
+            frame,
+            group=self.panel.group,
+            time=self.panel.time,
+            assume_sorted=True,
+            cache=cache,
+        )
+
+    def _get(self, name: str) -> pd.Series:
+        if name in self.cache:
+            return self.cache[name]
+        return self.frame[name]
+
+    def _ensure(self, names: Sequence[str]) -> None:
+        done = set(self.frame.columns) | set(self.cache)
+        pending = self.registry.resolve(names, done)
+        while pending:
+            ready = [
+                self.registry[n] for n in pending if set(self.registry[n].inputs) <= done
+            ]
+            plain = [f for f in ready if f.op is None]
+            if plain:
+                for f in plain:
+                    out = f.fn(*(self._get(dep) for dep in f.inputs))
+                    self.cache[f.name] = pd.Series(out, index=self.frame.index, name=f.name)
+                batch = plain
+            else:
+                # panel ops wait until every ready one can share a single pass
+                batch = ready
+                inputs = {f.inputs[0]: self._get(f.inputs[0]) for f in batch}
+                out = self.panel.compute([f.op for f in batch], values=inputs)
+                for f in batch:
+                    self.cache[f.name] = out[f.name].rename(f.name)
+            done.update(f.name for f in batch)
+            pending = [n for n in pending if n not in done]
+
+
+def safe_log(x: pd.Series) -> pd.Series:
+    """log con 0 / inf -> NaN (los negativos también dan NaN)."""
+    x = pd.to_numeric(x, errors="coerce")
+    return np.log(x.replace([0, np.inf, -np.inf], np.nan))
+
+
+# -----------------------
+# Shared definitions
+# -----------------------
+# Inputs: the panel columns gdp_current_usd, population, co2_per_capita, co2_mt, year.
+FEATURES = FeatureRegistry()
+
+
+@FEATURES.register("gdp_pos", "gdp_current_usd", doc="GDP guarded against zero/negative")
+def _gdp_pos(gdp):
+    return gdp.clip(lower=EPS)
+
+
+@FEATURES.register("population_pos", "population", doc="population guarded against zero")
+def _population_pos(pop):
+    return pop.clip(lower=EPS)
+
+
+@FEATURES.register("gdp_pc", "gdp_pos", "population_pos")
+def _gdp_pc(gdp, pop):
+    return (gdp / pop).clip(lower=EPS)
+
+
+@FEATURES.register(
+    "co2_intensity",
+    "co2_per_capita",
+    "gdp_pc",
+    doc="CO2 per capita over GDP per capita (tCO2 per USD, proxy)",
+)
+def _co2_intensity(co2pc, gdp_pc):
+    return (co2pc / (gdp_pc + EPS)).clip(lower=EPS)
+
+
+@FEATURES.register("ln_gdp", "gdp_pos")
+def _ln_gdp(gdp):
+    return np.log(gdp)
+
+
+@FEATURES.register("ln_population", "population_pos")
+def _ln_population(pop):
+    return np.log(pop)
+
+
+@FEATURES.register("ln_gdp_pc", "gdp_pc")
+def _ln_gdp_pc(gdp_pc):
+    return np.log(gdp_pc)
+
+
+@FEATURES.register("ln_co2_intensity", "co2_intensity")
+def _ln_co2_intensity(intensity):
+    return np.log(intensity)
+
+
+@FEATURES.register(
+    "ln_co2_mt_per_usd",
+    "co2_mt",
+    "gdp_current_usd",
+    doc="log of CO2 (Mt) over GDP (USD); NaN where undefined (Q4 intensity)",
+)
+def _ln_co2_mt_per_usd(co2_mt, gdp):
+    return safe_log(co2_mt / gdp)
+
+
+# Q4 logs: plain safe_log, so a zero/negative GDP or population gives NaN and
+# the Q4 script drops the row (the EPS-guarded logs above would keep it).
+@FEATURES.register("ln_gdp_safe", "gdp_current_usd", doc="safe_log of GDP (Q4)")
+def _ln_gdp_safe(gdp):
+    return safe_log(gdp)
+
+
+@FEATURES.register("ln_population_safe", "population", doc="safe_log of population (Q4)")
+def _ln_population_safe(pop):
+    return safe_log(pop)
+
+
+@FEATURES.register(
+    "ln_gdp_pc_safe", "gdp_current_usd", "population", doc="safe_log of GDP per capita (Q4)"
+)
+def _ln_gdp_pc_safe(gdp, pop):
+    return safe_log(gdp / pop)
+
+
+# lag-1 differences (information up to t only)
+for _col in (
+    "ln_gdp_pc",
+    "co2_per_capita",
+    "ln_co2_intensity",
+    "ln_co2_mt_per_usd",
+    "ln_gdp_pc_safe",
+):
+    FEATURES.add(panel_feature(f"d_{_col}_lag1", diff(_col, 1)))
+del _col
+
+
+def rolling_features(
+    sources: Sequence[str] = ROLLING_SOURCES, windows: Sequence[int] = ROLLING_WINDOWS
+) -> List[str]:
+    """Nombres <col>_mean<w>, <col>_std<w>, <col>_slope<w> (en FEATURES para los defaults)."""
+    return [f"{c}_{k}{w}" for c in sources for w in windows for k in ("mean", "std", "slope")]
+
+
+for _col in ROLLING_SOURCES:
+    for _w in ROLLING_WINDOWS:
+        for _make in (rolling_mean, rolling_std, rolling_slope):
+            _op = _make(_col, _w)
+            FEATURES.add(panel_feature(_op.output, _op))
+del _col, _w, _make, _op
+
+
+@FEATURES.register(
+    "decoupled",
+    "d_ln_gdp_pc_lag1",
+    "d_co2_per_capita_lag1",
+    doc="1 if GDPpc grew while CO2pc fell this year (Q4 target)",
+)
+def _decoupled(d_gdp_pc, d_co2pc):
+    return ((d_gdp_pc > 0) & (d_co2pc < 0)).astype(int)
+
+
+FEATURES.add(
+    Feature(
+        "decoupled_safe",
+        ("d_ln_gdp_pc_safe_lag1", "d_co2_per_capita_lag1"),
+        fn=_decoupled,
+        doc="decoupled from the safe_log GDP per capita (Q4 target)",
+    )
+)
+
+
+@FEATURES.register("year_z", "year", doc="year standardized over the rows of the frame")
+def _year_z(year):
+    return (year - year.mean()) / year.std()
+
+
+@FEATURES.register("year_norm", "year", doc="years since YEAR_ORIGIN over YEAR_SCALE")
+def _year_norm(year):
+    return (year - YEAR_ORIGIN) / YEAR_SCALE
@@ -0,0 +1,125 @@
+"""
+Modo en memoria del pipeline Q4A/Q5: panel -> build -> features -> train + ranking
+en un solo proceso, pasando DataFrames entre stages (sin parquet intermedio).
+
+El panel se lee (o se descarga) una sola vez; para experimentos repetidos se
+puede pasar ya cargado en `panel=` y variar build_params / feature_params.
+Las escrituras son opcionales (write=True deja los mismos archivos que los
+scripts).
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import pandas as pd
+
+from ds_exam.config import settings
+from ds_exam.data.panel_store import read_panel, write_panel
+from ds_exam.data.schema import enforce_panel_schema
+from ds_exam.pipeline import q4a, q5
+
+PANEL_PATH = settings.DATA_PROCESSED / "q4a_panel_country_year.parquet"
+REPORTS_DIR = settings.ROOT / "reports"
+
+
+@dataclass
+class Q4ARun:
+    panel: pd.DataFrame
+    multicountry: pd.DataFrame
+    features: pd.DataFrame
+    targets: Optional[pd.DataFrame] = None
+    metrics_by_split: Optional[pd.DataFrame] = None
+    predictions: Optional[pd.DataFrame] = None
+    metrics: Optional[pd.DataFrame] = None
+    scored: Optional[pd.DataFrame] = None
+    ranking: Optional[pd.DataFrame] = None
+    seconds: Dict[str, float] = field(default_factory=dict)
+
+
+def run_q4a_in_memory(
+    panel: Optional[pd.DataFrame] = None,
+    panel_path: Union[str, Path] = PANEL_PATH,
+    fetch: bool = False,
+    train: bool = True,
+    rank: bool = True,
+    write: bool = False,
+    out_dir: Union[str, Path] = settings.DATA_PROCESSED,
+    reports_dir: Union[str, Path] = REPORTS_DIR,
+    build_params: Optional[Dict[str, Any]] = None,
+    feature_params: Optional[Dict[str, Any]] = None,
+) -> Q4ARun:
+    """
+    Corre la cadena Q4A/Q5 en memoria.
+
+    - panel: panel ya cargado (si es None se lee de panel_path, o se descarga con fetch=True)
+    - train / rank: correr la validación rolling / el ranking Q5
+    - write: escribir panel (si se descargó), intermedios y salidas en out_dir / reports_dir
+    """
+    out_dir, reports_dir = Path(out_dir), Path(reports_dir)
+    build_params = dict(build_params or {})
+    seconds: Dict[str, float] = {}
+
+    def timed(name, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        seconds[name] = time.perf_counter() - t0
+        return result
+
+    if panel is None:
+        if fetch:
+            panel, _ = timed("fetch", q4a.fetch_panel)
+            if write:
+                write_panel(panel, out_dir / "q4a_panel_country_year.parquet")
+        else:
+            years = (
+                build_params.get("year_min", q4a.YEAR_MIN),
+                build_params.get("year_max", q4a.YEAR_MAX),
+            )
+            panel = timed("read", read_panel, panel_path, years=years)
+
+    # The same typing a parquet round trip would apply, without the round trip.
+    multicountry = enforce_panel_schema(
+        timed("build", q4a.build_multicountry_panel, panel, **build_params)
+    )
+    features = enforce_panel_schema(
+        timed("features", q4a.make_features, multicountry, **(feature_params or {}))
+    )
+    targets = timed("targets", q4a.make_target_matrix, multicountry)
+    run = Q4ARun(
+        panel=panel,
+        multicountry=multicountry,
+        features=features,
+        targets=targets,
+        seconds=seconds,
+    )
+
+    if write:
+        write_panel(multicountry, out_dir / "q4a_multicountry_panel.parquet")
+        write_panel(features, out_dir / "q4a_features.parquet")
+        write_panel(targets, out_dir / "q4a_targets.parquet")
+
+    if train:
+        run.metrics_by_split, run.predictions, run.metrics = timed(
+            "train", q4a.train_models, features
+        )
+        if write:
+            run.metrics_by_split.to_csv(out_dir / "q4a_model_metrics_by_split.csv", index=False)
+            run.predictions.to_csv(out_dir / "q4a_predictions.csv", index=False)
+            run.metrics.to_csv(out_dir / "q4a_model_metrics.csv", index=False)
+
+    if rank:
+        run.scored, run.ranking = timed(
+            "rank", q5.make_ranking, q5.prepare_features(features), recent_years=5
+        )
+        if write:
+            run.ranking.to_csv(out_dir / "q5_country_ranking.csv", index=False)
+            reports_dir.mkdir(parents=True, exist_ok=True)
+            (reports_dir / "Q5_ranking.md").write_text(
+                q5.ranking_markdown(run.ranking, top_k=30), encoding="utf-8"
+            )
+
+    return run
@@ -0,0 +1,606 @@
+"""
+Lógica de los stages Q4A como funciones importables (DataFrame -> DataFrame).
+
+Los scripts q4a_* son wrappers finos (leer -> función -> escribir); el modo
+en memoria (ds_exam.pipeline.inprocess) encadena estas mismas funciones sin
+pasar por parquet entre stages.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from ds_exam.config.indicators import codes_by_column, get_indicators
+from ds_exam.data.countries import load_country_registry
+from ds_exam.data.owid import OWID_CO2_URL, OWID_TTL_SECONDS, load_owid_co2
+from ds_exam.data.panel import assemble_panel
+from ds_exam.data.panel_transform import lead
+from ds_exam.data.quality import countries_with_complete_years, quality_report
+from ds_exam.data.refresh import merge_panel_delta, refresh_start_year
+from ds_exam.data.wb_api import WorldBankClient, default_config, shared_client
+from ds_exam.data.wdi_bulk import wdi_frames
+from ds_exam.pipeline.features import FEATURES, Feature, panel_feature, rolling_features
+
+# ---- fetch ----
+YEARS_MIN, YEARS_MAX = 1990, 2023
+# incremental refresh always re-fetches the last N stored years (WB revises recent data)
+RECENT_YEARS = 2
+# column -> WB code; CO2 comes from OWID (the WB CO2 series was failing)
+WB_IND = codes_by_column(["gdp_current_usd", "population"])
+OWID_IND = ["OWID:co2", "OWID:co2_per_capita"]
+
+# ---- build ----
+YEAR_MIN = 1990
+YEAR_MAX = 2023
+MIN_YEARS_PER_COUNTRY = 20  # mínimo de años con datos completos por país
+REQUIRED_COLS = {"iso3", "year", "gdp_current_usd", "population"}
+
+# ---- features ----
+HORIZON = 5
+DROP_THRESHOLD = 0.9  # target=1 if CO2pc falls by >=10% over the horizon
+FEATURE_COLS = [
+    "ln_gdp",
+    "ln_population",
+    "ln_gdp_pc",
+    "co2_per_capita",
+    "ln_co2_intensity",
+    "d_ln_gdp_pc_lag1",
+    "d_co2_per_capita_lag1",
+    "d_ln_co2_intensity_lag1",
+    "year_norm",
+]
+# optional rolling means / volatilities / OLS slopes (windows 3, 5, 10; no look-ahead)
+ROLLING_COLS = rolling_features()
+# target grid of the side table: drop<pct>_h<H> = CO2pc H years ahead is >= pct% lower
+TARGET_HORIZONS = (1, 3, 5, 10)
+TARGET_DROPS = (0.05, 0.10, 0.20)
+
+
+# -----------------------
+# Fetch (WB + OWID)
+# -----------------------
+def fetch_wb_panel(
+    columns: Sequence[str],
+    years_min: int = YEARS_MIN,
+    years_max: int = YEARS_MAX,
+    client: Optional[WorldBankClient] = None,
+) -> pd.DataFrame:
+    """
+    Indicadores WB (iso3, year, <columns>...) en un request por source
+    (`fetch_indicator_panel`, códigos separados por ';').
+
+    Si el request agrupado falla (p.ej. una serie dada de baja), se reintenta
+    indicador por indicador y los que fallan quedan como columnas vacías.
+    """
+    client = client if client is not None else shared_client()
+    indicators = get_indicators(columns)
+    date = f"{years_min}:{years_max}"
+    try:
+        wide = client.fetch_indicator_panel(indicators, date=date)
+    except RuntimeError as e:
+        print(f"[Q4A] WB grouped request failed ({e}); fetching indicators one by one")
+        parts = []
+        for ind in indicators:
+            try:
+                part = client.fetch_indicator_panel([ind], date=date)
+            except RuntimeError as err:
+                print(f"[Q4A] WB failed for {ind.code} -> returning empty {ind.column}: {err}")
+                part = pd.DataFrame(columns=["iso3", "year", ind.column])
+            parts.append(part[["iso3", "year", ind.column]])
+        return assemble_panel(parts)[0]
+    return wide.drop(columns="country")
+
+
+def fetch_owid_co2(
+    years_min: int = YEARS_MIN,
+    years_max: int = YEARS_MAX,
+    source: str = OWID_CO2_URL,
+    refresh: bool = False,
+    ttl_seconds: Optional[float] = OWID_TTL_SECONDS,
+) -> pd.DataFrame:
+    print("[Q4A] Fetching OWID CO2:", source)
+    # Column-projected read from the local parquet copy (year filter pushed down);
+    # a downloaded copy older than ttl_seconds is revalidated, refresh re-downloads it
+    df = load_owid_co2(
+        source,
+        columns=["iso_code", "year", "co2", "co2_per_capita"],
+        years=(years_min, years_max),
+        refresh=refresh,
+        ttl_seconds=ttl_seconds,
+    )
+
+    # OWID co2 is in million tonnes already (MtCO2). Keep name co2_mt for compatibility.
+    df = df.rename(columns={"iso_code": "iso3", "co2": "co2_mt"})
+
+    # drop aggregates/missing iso3 (OWID_* codes are not in the registry)
+    df = df.dropna(subset=["iso3"])
+    df = df[load_country_registry().country_mask(df["iso3"])].copy()
+    df["iso3"] = df["iso3"].astype(object)
+    df["year"] = df["year"].astype(int)
+    return df.reset_index(drop=True)
+
+
+def fetch_panel(
+    stored: Optional[pd.DataFrame] = None,
+    years_min: int = YEARS_MIN,
+    years_max: int = YEARS_MAX,
+    recent_years: int = RECENT_YEARS,
+    owid_source: str = OWID_CO2_URL,
+    client: Optional[WorldBankClient] = None,
+    wdi_archive: Optional[Union[str, Path]] = None,
+    refresh: bool = False,
+) -> Tuple[pd.DataFrame, Optional[Dict[str, object]]]:
+    """
+    Panel WB + OWID (iso3, year, gdp_current_usd, population, co2_mt, co2_per_capita).
+
+    Con `stored` sólo se piden los años faltantes/recientes y se integran al
+    panel guardado; el segundo valor trae entonces las estadísticas del merge
+    (para record_refresh), si no es None.
+
+    Con `wdi_archive` (WDI_CSV.zip local) los indicadores WB salen del archivo
+    bulk en una sola lectura, en vez de la API.
+
+    refresh=True vuelve a descargar todo (respuestas WB sin cache, CSV de
+    OWID). Un refresh incremental no lee el cache de respuestas WB (las URLs
+    son las mismas de la corrida anterior) y revalida la copia de OWID.
+    """
+    year_from = years_min
+    owid_ttl = OWID_TTL_SECONDS
+    if stored is not None:
+        year_from = refresh_start_year(stored, years_min, years_max, recent_years)
+        print(f"[Q4A] Incremental refresh: fetching years {year_from}-{years_max}")
+        # same URLs as the last refresh: cached copies would hide revisions
+        owid_ttl = 0
+    if client is None:
+        client = shared_client(default_config(refresh=refresh or stored is not None))
+
+    frames = []
+    if wdi_archive is not None:
+        print(f"[Q4A] Reading WB {', '.join(WB_IND.values())} from {wdi_archive}")
+        frames.extend(wdi_frames(WB_IND, wdi_archive, years=(year_from, years_max)))
+    else:
+        print(f"[Q4A] Fetching WB {', '.join(WB_IND.values())} ...")
+        frames.append(fetch_wb_panel(list(WB_IND), year_from, years_max, client))
+    frames.append(fetch_owid_co2(year_from, years_max, owid_source, refresh, owid_ttl))
+
+    # WB country/all also returns aggregates (WLD, EUU, ...); keep real countries only
+    registry = load_country_registry()
+    frames = [f[registry.country_mask(f["iso3"])] for f in frames]
+
+    # WB + OWID in a single pivot on iso3/year (no merge chain)
+    df, coverage = assemble_panel(frames)
+    print("[Q4A] Fetched coverage by indicator:")
+    print(coverage.to_string(index=False))
+
+    merged = None
+    if stored is not None:
+        df, stats = merge_panel_delta(stored, df)
+        merged = {
+            "years": [year_from, years_max],
+            "indicators": list(WB_IND.values()) + OWID_IND,
+            **stats,
+        }
+
+    return df.sort_values(["iso3", "year"]).reset_index(drop=True), merged
+
+
+# -----------------------
+# Build (coverage guardrails)
+# -----------------------
+def build_multicountry_panel(
+    df: pd.DataFrame,
+    year_min: int = YEAR_MIN,
+    year_max: int = YEAR_MAX,
+    min_years_per_country: int = MIN_YEARS_PER_COUNTRY,
+) -> pd.DataFrame:
+    """Panel limpio para Q4A: años acotados, co2_per_capita y países con cobertura suficiente."""
+    missing = REQUIRED_COLS - set(df.columns)
+    if missing:
+        raise ValueError(f"Input panel missing required columns: {sorted(missing)}")
+    if "co2_per_capita" not in df.columns and "co2_mt" not in df.columns:
+        raise ValueError(
+            "Input must contain at least one of: co2_per_capita, co2_mt.\n"
+            f"Columns: {df.columns.tolist()}"
+        )
+
+    df = df[(df["year"] >= year_min) & (df["year"] <= year_max)]
+
+    # co2_per_capita: prefer if available, else compute from co2_mt + population
+    # co2_mt should be "million tonnes". If you have "co2_kt", convert to mt first.
+    if "co2_per_capita" not in df.columns or df["co2_per_capita"].isna().mean() > 0.95:
+        if "co2_mt" not in df.columns:
+            raise ValueError("Cannot compute co2_per_capita (missing co2_mt).")
+        df = df.copy()
+        # tons per person: (Mt * 1e6) / pop
+        df["co2_per_capita"] = (df["co2_mt"] * 1e6) / df["population"]
+
+    num_cols = ["gdp_current_usd", "population", "co2_per_capita"]
+
+    # Coverage filter: keep countries with enough complete years
+    report = quality_report(df, value_cols=num_cols)
+    keep_iso = countries_with_complete_years(report, min_years_per_country)
+
+    # Drop rows missing core signals
+    df = df.dropna(subset=["iso3", "year"] + num_cols)
+    df = df[df["iso3"].isin(keep_iso)]
+
+    df = df.sort_values(["iso3", "year"]).reset_index(drop=True)
+
+    # Keep only the columns downstream expects (but keep country name if exists)
+    keep_cols = ["country", "iso3", "year"] + num_cols
+    if "country" not in df.columns:
+        keep_cols.remove("country")
+    return df[keep_cols].copy()
+
+
+# -----------------------
+# Features
+# -----------------------
+def _pick(df: pd.DataFrame, options: Sequence[str]) -> Optional[str]:
+    for c in options:
+        if c in df.columns:
+            return c
+    return None
+
+
+def feature_inputs(df: pd.DataFrame) -> pd.DataFrame:
+    """Panel con las columnas canónicas del registro de features y sin filas incompletas."""
+    if not {"iso3", "year"}.issubset(df.columns):
+        raise ValueError(f"Missing iso3/year in panel. Columns={df.columns.tolist()}")
+
+    # Column mapping (robust)
+    col_gdp = _pick(df, ["gdp_current_usd", "gdp", "ny_gdp_mktp_kd", "ny_gdp_mktp_cd"])
+    col_pop = _pick(df, ["population", "sp_pop_totl"])
+    col_co2pc = _pick(df, ["co2_per_capita", "en_atm_co2e_pc"])
+    if col_gdp is None or col_pop is None or col_co2pc is None:
+        raise ValueError(
+            "Could not find gdp/pop/co2_per_capita columns.\n"
+            f"Found: gdp={col_gdp}, pop={col_pop}, co2pc={col_co2pc}\n"
+            f"Columns: {df.columns.tolist()}"
+        )
+
+    df = df.copy()
+    # Canonical input columns of the feature registry (already typed by the panel schema)
+    df["gdp_current_usd"] = df[col_gdp]
+    df["population"] = df[col_pop]
+    df["co2_per_capita"] = df[col_co2pc]
+
+    # Basic sanity drops before ratios/logs
+    return df.dropna(subset=["iso3", "year", "gdp_current_usd", "population", "co2_per_capita"])
+
+
+def feature_cols(rolling: bool = False) -> List[str]:
+    return FEATURE_COLS + ROLLING_COLS if rolling else list(FEATURE_COLS)
+
+
+def make_features(
+    df: pd.DataFrame, horizon: int = HORIZON, rolling: bool = False
+) -> pd.DataFrame:
+    """
+    Matriz (iso3, year, target, FEATURE_COLS) sin leakage: target a `horizon` años,
+    diffs con lag 1.
+
+    rolling=True agrega ROLLING_COLS; se descartan las filas sin la ventana más
+    larga completa (las primeras 9 de cada país).
+    """
+    return _feature_matrix(feature_inputs(df), horizon, feature_cols(rolling))
+
+
+def _feature_matrix(df: pd.DataFrame, horizon: int, cols: List[str]) -> pd.DataFrame:
+    # TARGET (forward-looking, no leak): CO2pc `horizon` years ahead.
+    # Sorting and group boundaries are computed once, in the feature frame.
+    ff = FEATURES.extend(target_features(horizon)).frame(df)
+    # drop rows without future outcome
+    ff = ff.filter(ff[f"co2_pc_lead{horizon}"].notna())
+
+    # FEATURES (use only info up to t): contemporaneous diffs become LEAKY if the
+    # target uses same-year movement; the registry uses lag-1 differences, and
+    # year_norm has a fixed origin (independent of the rows kept)
+    keep_cols = ["iso3", "year", "target"] + cols
+    out = ff.compute(keep_cols)
+    return out.replace([np.inf, -np.inf], np.nan).dropna().reset_index(drop=True)
+
+
+def make_features_incremental(
+    df: pd.DataFrame,
+    stored: pd.DataFrame,
+    since_year: Optional[int] = None,
+    horizon: int = HORIZON,
+    recent_years: int = RECENT_YEARS,
+) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Actualiza la matriz guardada `stored` con los años >= `since_year` del panel `df`.
+
+    Por país sólo se recalculan las filas cuya ventana (lags hacia atrás, lead
+    del target hacia adelante) toca un año >= since_year; se leen esas filas
+    más las que necesitan sus lags (con columnas rolling, la historia entera
+    del país), y el resultado reemplaza a las guardadas desde el primer año
+    recalculado (upsert). Los países nuevos salen enteros.
+
+    since_year=None: los últimos `recent_years` años que tenía el panel con el
+    que se armó `stored` (los que el refresh incremental vuelve a pedir) y
+    todo lo posterior.
+
+    Devuelve (features, stats); el resultado es el mismo que make_features(df)
+    si el panel no cambió antes de since_year (también las columnas rolling,
+    que se recalculan si `stored` las tiene).
+    """
+    rolling = set(ROLLING_COLS) <= set(stored.columns)
+    cols = feature_cols(rolling)
+    if list(stored.columns) != ["iso3", "year", "target"] + cols:
+        raise ValueError(
+            "Stored features do not match FEATURE_COLS; rebuild them without --incremental.\n"
+            f"Stored: {stored.columns.tolist()}"
+        )
+    expected_norm = FEATURES["year_norm"].fn(stored["year"].astype("float64"))
+    if not np.allclose(stored["year_norm"], expected_norm):
+        raise ValueError(
+            "Stored year_norm is not the fixed-origin one; rebuild without --incremental."
+        )
+
+    registry = FEATURES.extend(target_features(horizon))
+    back, ahead = registry.lookaround(["target"] + cols)
+    if since_year is None:
+        # stored rows end `ahead` years before the panel they were built from
+        since_year = int(stored["year"].max()) + ahead - max(recent_years, 1) + 1
+
+    inputs = feature_inputs(df).sort_values(["iso3", "year"]).reset_index(drop=True)
+    iso = inputs["iso3"].astype(str)
+    # Shifts are positional, so the windows are counted in rows of each country.
+    pos = inputs.groupby(iso).cumcount().to_numpy()
+    # countries without stored rows are computed whole
+    is_new = (inputs["year"].to_numpy() >= since_year) | ~iso.isin(
+        stored["iso3"].astype(str).unique()
+    ).to_numpy()
+    first_new = (
+        pd.Series(np.where(is_new, pos, len(inputs)), index=inputs.index)
+        .groupby(iso)
+        .transform("min")
+        .to_numpy()
+    )
+    redo = pos >= first_new - ahead
+    context = pos >= first_new - ahead - back
+    if rolling:
+        # Rolling windows come from per-country prefix sums: reading each touched
+        # country from its first row reproduces them bit for bit.
+        context = first_new < len(inputs)
+
+    redo_start = inputs[redo].groupby(iso[redo])["year"].min()
+    fresh = _feature_matrix(inputs[context], horizon, cols)
+    fresh = fresh[fresh["year"] >= fresh["iso3"].astype(str).map(redo_start).to_numpy()]
+
+    stale = stored["year"] >= stored["iso3"].astype(str).map(redo_start).to_numpy()
+    kept = stored[~stale]
+    out = pd.concat(
+        [kept.astype({"iso3": object}), fresh.astype({"iso3": object})], ignore_index=True
+    )
+    out = out.sort_values(["iso3", "year"]).reset_index(drop=True)
+    out["iso3"] = out["iso3"].astype("category")
+
+    stats = {
+        "since_year": int(since_year),
+        "rows_stored": int(len(stored)),
+        "rows_replaced": int(stale.sum()),
+        "rows_recomputed": int(len(fresh)),
+        "rows_after": int(len(out)),
+        "panel_rows_read": int(context.sum()),
+        "countries_touched": int(len(redo_start)),
+    }
+    return out, stats
+
+
+def target_features(horizon: int = HORIZON, threshold: float = DROP_THRESHOLD) -> List[Feature]:
+    """co2_pc_lead<horizon> (CO2pc `horizon` años adelante) y target = lead <= threshold * CO2pc."""
+
+    def _target(lead_co2pc, co2pc):
+        return (lead_co2pc <= threshold * co2pc).astype(int)
+
+    lead_name = f"co2_pc_lead{horizon}"
+    return [
+        panel_feature(lead_name, lead("co2_per_capita", horizon)),
+        Feature("target", (lead_name, "co2_per_capita"), fn=_target),
+    ]
+
+
+def target_name(horizon: int, drop: float) -> str:
+    """drop10_h5 = CO2pc `horizon` años adelante <= (1 - 0.10) * CO2pc (el `target` default)."""
+    return f"drop{int(round(drop * 100)):02d}_h{horizon}"
+
+
+def target_grid_features(
+    horizons: Sequence[int] = TARGET_HORIZONS, drops: Sequence[float] = TARGET_DROPS
+) -> List[Feature]:
+    """Un lead de CO2pc por horizonte y, por (horizonte, caída), el target y su ok_ (int8)."""
+    feats: List[Feature] = []
+    for h in horizons:
+        lead_name = f"co2_pc_lead{h}"
+        feats.append(panel_feature(lead_name, lead("co2_per_capita", h)))
+        feats.append(
+            Feature(f"ok_h{h}", (lead_name,), fn=lambda x: x.notna().astype("int8"))
+        )
+        for d in drops:
+
+            def _target(lead_co2pc, co2pc, factor=1.0 - d):
+                return (lead_co2pc <= factor * co2pc).astype("int8")
+
+            feats.append(Feature(target_name(h, d), (lead_name, "co2_per_capita"), fn=_target))
+    return feats
+
+
+def make_target_matrix(
+    df: pd.DataFrame,
+    rows: Optional[pd.DataFrame] = None,
+    horizons: Sequence[int] = TARGET_HORIZONS,
+    drops: Sequence[float] = TARGET_DROPS,
+) -> pd.DataFrame:
+    """
+    Tabla lateral de targets: (iso3, year, <target> int8..., ok_<target> int8...).
+
+    Cada lead se calcula una vez por horizonte (todos en una pasada del panel)
+    y sirve a todas las caídas. ok_<target> = 1 si el lead existe; donde es 0
+    el target vale 0 y no debe usarse. Con `rows` (p. ej. la matriz de
+    features) la tabla queda restringida a esas (iso3, year), en su orden.
+    """
+    names = [target_name(h, d) for h in horizons for d in drops]
+    ff = FEATURES.extend(target_grid_features(horizons, drops)).frame(feature_inputs(df))
+    grid = ff.compute(["iso3", "year"] + names + [f"ok_h{h}" for h in horizons])
+    for h in horizons:
+        for d in drops:
+            grid[f"ok_{target_name(h, d)}"] = grid[f"ok_h{h}"]
+    grid = grid.drop(columns=[f"ok_h{h}" for h in horizons])
+
+    if rows is not None:
+        keys = pd.DataFrame(
+            {"_iso": rows["iso3"].astype(str).to_numpy(), "year": rows["year"].to_numpy()}
+        )
+        grid = keys.merge(
+            grid.assign(_iso=grid["iso3"].astype(str)).drop(columns="iso3"),
+            on=["_iso", "year"],
+            how="left",
+        )
+        grid.insert(0, "iso3", grid.pop("_iso"))
+        value_cols = [c for c in grid.columns if c not in ("iso3", "year")]
+        grid[value_cols] = grid[value_cols].fillna(0).astype("int8")
+    return grid.reset_index(drop=True)
+
+
+def select_target(features: pd.DataFrame, targets: pd.DataFrame, name: str) -> pd.DataFrame:
+    """
+    Matriz de features con `target` = la columna `name` de la tabla lateral,
+    sólo en las filas donde ok_<name> = 1 (sin reconstruir las features).
+
+    Las filas son las de `features`, que ya excluyen los años sin el lead del
+    target por defecto (HORIZON): con horizontes más cortos no se recuperan
+    los últimos años (drop*_h1 pierde 4, drop*_h3 pierde 2) aunque la tabla
+    los tenga.
+    """
+    ok = f"ok_{name}"
+    if name not in targets.columns or ok not in targets.columns:
+        available = [c for c in targets.columns if f"ok_{c}" in targets.columns]
+        raise ValueError(f"Unknown target {name!r}. Available: {available}")
+    t = targets[targets[ok] == 1]
+    right = pd.DataFrame(
+        {
+            "_iso": t["iso3"].astype(str).to_numpy(),
+            "year": t["year"].to_numpy(),
+            "target": t[name].to_numpy().astype(int),
+        }
+    )
+    left = features.drop(columns="target", errors="ignore")
+    left = left.assign(_iso=left["iso3"].astype(str).to_numpy())
+    out = left.merge(right, on=["_iso", "year"], how="inner").drop(columns="_iso")
+    feat_cols = [c for c in features.columns if c not in ("iso3", "year", "target")]
+    return out[["iso3", "year", "target"] + feat_cols]
+
+
+# -----------------------
+# Train (rolling temporal validation)
+# -----------------------
+def rolling_cutoffs(df: pd.DataFrame, min_train_years: int = 10, test_window: int = 5) -> List[int]:
+    years = sorted(df["year"].unique())
+    first, last = years[0], years[-1]
+    cutoffs = []
+    for cutoff in years:
+        if cutoff - first + 1 < min_train_years:
+            continue
+        if cutoff + test_window > last:
+            continue
+        cutoffs.append(cutoff)
+    return cutoffs
+
+
+def eval_row(model_name, split_id, cutoff, y_true, y_pred) -> Dict[str, object]:
+    return {
+        "split": split_id,
+        "cutoff_year": cutoff,
+        "model": model_name,
+        "accuracy": accuracy_score(y_true, y_pred),
+        "precision": precision_score(y_true, y_pred, zero_division=0),
+        "recall": recall_score(y_true, y_pred, zero_division=0),
+        "f1": f1_score(y_true, y_pred, zero_division=0),
+        "test_n": int(len(y_true)),
+        "test_0": int((y_true == 0).sum()),
+        "test_1": int((y_true == 1).sum()),
+    }
+
+
+def default_models() -> Dict[str, object]:
+    return {
+        "LogisticRegression": Pipeline(
+            [("scaler", StandardScaler()), ("clf", LogisticRegression(max_iter=2000))]
+        ),
+        "RandomForest": RandomForestClassifier(
+            n_estimators=400,
+            max_depth=6,
+            random_state=42,
+            class_weight="balanced",
+            n_jobs=-1,
+        ),
+    }
+
+
+def train_models(
+    df: pd.DataFrame,
+    min_train_years: int = 10,
+    test_window: int = 5,
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Validación temporal rolling sobre la matriz de features.
+
+    Devuelve (metrics_by_split, predictions, average_by_model).
+    """
+    df = df.sort_values(["year", "iso3"]).reset_index(drop=True)
+    feat_cols = [c for c in df.columns if c not in ("iso3", "year", "target")]
+
+    cutoffs = rolling_cutoffs(df, min_train_years=min_train_years, test_window=test_window)
+    print(f"[Q4A] Rolling splits found: {len(cutoffs)}")
+    if not cutoffs:
+        raise ValueError("Not enough years to do rolling validation.")
+
+    models = default_models()
+    metrics_rows = []
+    preds_rows = []
+
+    for i, cutoff in enumerate(cutoffs, start=1):
+        train = df[df["year"] <= cutoff]
+        test = df[(df["year"] > cutoff) & (df["year"] <= cutoff + test_window)]
+
+        X_train, y_train = train[feat_cols], train["target"].astype(int).values
+        X_test, y_test = test[feat_cols], test["target"].astype(int).values
+
+        bal = pd.Series(y_test).value_counts().to_dict()
+        print(
+            f"[Q4A] Split {i}: cutoff={cutoff} train_n={len(train)} test_n={len(test)} test_balance={bal}"
+        )
+
+        for name, mdl in models.items():
+            mdl.fit(X_train, y_train)
+            y_pred = mdl.predict(X_test)
+
+            metrics_rows.append(eval_row(name, i, cutoff, y_test, y_pred))
+
+            out = test[["iso3", "year"]].copy()
+            out["split"] = i
+            out["cutoff_year"] = cutoff
+            out["model"] = name
+            out["y_true"] = y_test
+            out["y_pred"] = y_pred
+            preds_rows.append(out)
+
+    metrics = pd.DataFrame(metrics_rows)
+    preds = pd.concat(preds_rows, axis=0, ignore_index=True)
+    avg = (
+        metrics.groupby("model")[["accuracy", "precision", "recall", "f1"]]
+        .mean()
+        .reset_index()
+    )
+    return metrics, preds, avg
@@ -0,0 +1,158 @@
+"""
+Lógica del ranking Q5 como funciones importables.
+
+Entrada: la matriz de features de Q4A (iso3, year, target, features...).
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+RANKING_COLUMNS = [
+    "rank",
+    "iso3",
+    "priority_score",
+    "avg_p_transition_recentN",
+    "latest_year",
+    "latest_p_transition",
+    "avg_d_co2_per_capita_recentN",
+]
+
+
+def prepare_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Valida columnas y deja sólo filas completas, ordenadas por (iso3, year)."""
+    needed = {"iso3", "year", "target"}
+    if not needed.issubset(df.columns):
+        raise ValueError(f"features missing required columns: {needed - set(df.columns)}")
+    # Typed on write (inf already NaN); only incomplete rows are dropped here.
+    df = df.sort_values(["iso3", "year"], kind="stable")
+    return df.dropna().reset_index(drop=True)
+
+
+def train_rf(X, y) -> RandomForestClassifier:
+    rf = RandomForestClassifier(
+        n_estimators=400,
+        max_depth=6,
+        random_state=42,
+        class_weight="balanced",
+        n_jobs=-1,
+    )
+    rf.fit(X, y)
+    return rf
+
+
+def make_ranking(df: pd.DataFrame, recent_years: int = 5) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Devuelve (df_scored, rank): probabilidades por país-año y ranking por país."""
+    feat_cols = [c for c in df.columns if c not in ("iso3", "year", "target")]
+    X = df[feat_cols].copy()
+    y = df["target"].astype(int)
+
+    print("Feature matrix:", X.shape, "| y balance:", y.value_counts().to_dict())
+    model = train_rf(X, y)
+
+    # predicted probabilities for class=1 (transition)
+    prob = model.predict_proba(X)[:, 1]
+    pred = (prob >= 0.5).astype(int)
+
+    df_scored = df[["iso3", "year", "target"]].copy()
+    df_scored["p_transition"] = prob
+    df_scored["pred_transition"] = pred
+
+    # recent window per country (last N years available per iso3)
+    def last_n(g, n):
+        return g.sort_values("year").tail(n)
+
+    rows = []
+    for iso, g in df_scored.groupby("iso3", sort=True, observed=True):
+        g = g.sort_values("year")
+        g_recent = last_n(g, recent_years)
+
+        # dynamic signal (if available in df)
+        dyn = df.loc[g_recent.index]
+        dco2 = (
+            dyn["d_co2_per_capita"].mean()
+            if "d_co2_per_capita" in dyn.columns
+            else np.nan
+        )
+        dint = (
+            dyn["d_ln_co2_intensity"].mean()
+            if "d_ln_co2_intensity" in dyn.columns
+            else np.nan
+        )
+        dgdp = dyn["d_ln_gdp_pc"].mean() if "d_ln_gdp_pc" in dyn.columns else np.nan
+
+        latest = g.iloc[-1]
+
+        row = {
+            "iso3": iso,
+            "latest_year": int(latest["year"]),
+            "latest_p_transition": float(latest["p_transition"]),
+            "latest_pred_transition": int(latest["pred_transition"]),
+            "avg_p_transition_all": float(g["p_transition"].mean()),
+            "avg_p_transition_recentN": float(g_recent["p_transition"].mean()),
+            "n_years_all": int(len(g)),
+            "n_years_recentN": int(len(g_recent)),
+            "avg_d_co2_per_capita_recentN": float(dco2) if pd.notna(dco2) else np.nan,
+            "avg_d_ln_co2_intensity_recentN": float(dint) if pd.notna(dint) else np.nan,
+            "avg_d_ln_gdp_pc_recentN": float(dgdp) if pd.notna(dgdp) else np.nan,
+        }
+        rows.append(row)
+
+    rank = pd.DataFrame(rows)
+
+    # Composite score (simple + interpretable):
+    # prioritize high transition probability AND already-declining emissions dynamics
+    # (lower d_co2_per_capita is better => subtract it with a minus sign)
+    score = rank["avg_p_transition_recentN"].copy()
+    if "avg_d_co2_per_capita_recentN" in rank.columns:
+        # normalize dynamics to comparable scale (robust)
+        v = rank["avg_d_co2_per_capita_recentN"].astype(float)
+        if v.notna().sum() >= 3:
+            med = np.nanmedian(v)
+            mad = np.nanmedian(np.abs(v - med)) + 1e-9
+            z = (v - med) / mad
+            # lower d_co2 => better, so subtract z
+            score = score - 0.10 * z
+
+    rank["priority_score"] = score
+
+    # rank high to low
+    rank = rank.sort_values(
+        ["priority_score", "avg_p_transition_recentN", "latest_p_transition"],
+        ascending=False,
+    ).reset_index(drop=True)
+    rank["rank"] = np.arange(1, len(rank) + 1)
+
+    return df_scored, rank
+
+
+def ranking_markdown(rank: pd.DataFrame, top_k: int = 25) -> str:
+    view = rank[RANKING_COLUMNS].copy()
+    view["priority_score"] = view["priority_score"].map(lambda x: f"{x:.3f}")
+    view["avg_p_transition_recentN"] = view["avg_p_transition_recentN"].map(
+        lambda x: f"{x:.3f}"
+    )
+    view["latest_p_transition"] = view["latest_p_transition"].map(lambda x: f"{x:.3f}")
+    view["avg_d_co2_per_capita_recentN"] = view["avg_d_co2_per_capita_recentN"].map(
+        lambda x: "" if pd.isna(x) else f"{x:.3f}"
+    )
+
+    md = []
+    md.append("# Q5 Country Prioritization Ranking\n")
+    md.append(
+        "This table ranks countries using a simple, interpretable composite score based on:\n"
+    )
+    md.append(
+        "- Average predicted probability of transition in the most recent window (primary driver)\n"
+    )
+    md.append(
+        "- Recent emissions dynamics (`d_co2_per_capita`) as a secondary adjustment\n"
+    )
+    md.append("\n")
+    md.append(view.head(top_k).to_markdown(index=False))
+    md.append("\n")
+    return "\n".join(md)
@@ -0,0 +1,348 @@
+"""
+Runner de pipeline por fingerprints de contenido.
+
+Cada Stage declara su script, entradas, salidas y argumentos. El fingerprint
+de un stage es el hash de:
+- el contenido de sus entradas (archivos o datasets particionados),
+- sus argumentos / variables de entorno,
+- el código del script y de todos los módulos ds_exam que importa (transitivo),
+  salvo en stages con track_code=False (descargas: se refrescan con force).
+
+Un stage se salta si su fingerprint coincide con el de la última corrida
+exitosa y sus salidas siguen intactas. Como las entradas se comparan por
+contenido, un stage re-ejecutado que produce la misma salida no invalida a los
+de abajo. Los stages sin dependencias entre sí corren en paralelo
+(subprocesos con PYTHONPATH=src).
+
+Estado: data/processed/.pipeline_state.json
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from ds_exam.config import settings
+
+STATE_PATH = settings.DATA_PROCESSED / ".pipeline_state.json"
+SRC_DIR = settings.ROOT / "src"
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    script: str                                   # relative to ROOT
+    inputs: Tuple[str, ...] = ()                  # files or directories, relative to ROOT
+    outputs: Tuple[str, ...] = ()
+    args: Tuple[str, ...] = ()
+    env: Mapping[str, str] = field(default_factory=dict)
+    # False for network sources: a code edit should not trigger a re-download
+    track_code: bool = True
+
+
+# -----------------------
+# Hashing
+# -----------------------
+class _HashCache:
+    """sha256 por archivo, reutilizado mientras (size, mtime) no cambie."""
+
+    def __init__(self, entries: Optional[Dict[str, List[Any]]] = None):
+        self.entries: Dict[str, List[Any]] = dict(entries or {})
+
+    def file_digest(self, path: Path) -> str:
+        st = path.stat()
+        key = str(path)
+        hit = self.entries.get(key)
+        if hit and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+            return hit[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self.entries[key] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def path_digest(self, path: Path) -> Optional[str]:
+        """Digest de un archivo o de un directorio completo; None si no existe."""
+        if path.is_file():
+            return self.file_digest(path)
+        if path.is_dir():
+            h = hashlib.sha256()
+            for f in sorted(p for p in path.rglob("*") if p.is_file()):
+                h.update(str(f.relative_to(path)).encode("utf-8"))
+                h.update(self.file_digest(f).encode("ascii"))
+            return h.hexdigest()
+        return None
+
+
+def _module_file(module: str, src_dir: Path) -> Optional[Path]:
+    parts = module.split(".")
+    if parts[0] != "ds_exam":
+        return None
+    base = src_dir.joinpath(*parts)
+    if base.with_suffix(".py").is_file():
+        return base.with_suffix(".py")
+    if (base / "__init__.py").is_file():
+        return base / "__init__.py"
+    return None
+
+
+def code_files(script: Path, src_dir: Path = SRC_DIR) -> List[Path]:
+    """El script más los módulos ds_exam que importa, transitivamente."""
+    seen: Dict[Path, None] = {}
+    todo = [script]
+    while todo:
+        path = todo.pop()
+        if path in seen:
+            continue
+        seen[path] = None
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+        for node in ast.walk(tree):
+            names: List[str] = []
+            if isinstance(node, ast.Import):
+                names = [a.name for a in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+                # `from ds_exam.data import panel` may name a module, not an attribute.
+                names = [node.module] + [f"{node.module}.{a.name}" for a in node.names]
+            for name in names:
+                f = _module_file(name, src_dir)
+                if f is not None and f not in seen:
+                    todo.append(f)
+    return sorted(seen)
+
+
+# -----------------------
+# Runner
+# -----------------------
+class PipelineRunner:
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        root: Path = settings.ROOT,
+        state_path: Path = STATE_PATH,
+        max_workers: int = 2,
+    ):
+        names = [s.name for s in stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate stage names: {names}")
+        self.stages = {s.name: s for s in stages}
+        self.root = Path(root)
+        self.state_path = Path(state_path)
+        self.max_workers = max(1, int(max_workers))
+        self.deps = self._dependencies()
+
+        state = self._load_state()
+        self.state: Dict[str, Any] = state.get("stages", {})
+        self.hashes = _HashCache(state.get("hash_cache"))
+
+    # ---- graph ----
+    def _dependencies(self) -> Dict[str, Set[str]]:
+        producer: Dict[str, str] = {}
+        for s in self.stages.values():
+            for out in s.outputs:
+                if out in producer:
+                    raise ValueError(f"{out} is produced by both {producer[out]} and {s.name}")
+                producer[out] = s.name
+        return {
+            s.name: {producer[i] for i in s.inputs if i in producer and producer[i] != s.name}
+            for s in self.stages.values()
+        }
+
+    def upstream(self, targets: Iterable[str]) -> List[str]:
+        """targets y todo lo que necesitan, en el orden de declaración."""
+        need: Set[str] = set()
+        todo = list(targets)
+        while todo:
+            name = todo.pop()
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage {name!r}. Stages: {list(self.stages)}")
+            if name not in need:
+                need.add(name)
+                todo.extend(self.deps[name])
+        return [n for n in self.stages if n in need]
+
+    # ---- fingerprints ----
+    def fingerprint(self, stage: Stage) -> str:
+        script = self.root / stage.script
+        payload = {
+            "script": stage.script,
+            "args": list(stage.args),
+            "env": dict(sorted(stage.env.items())),
+            "code": {
+                str(p.relative_to(self.root)): self.hashes.file_digest(p)
+                for p in code_files(script, self.root / "src")
+            }
+            if stage.track_code
+            else {},
+            "inputs": {i: self.hashes.path_digest(self.root / i) for i in stage.inputs},
+        }
+        blob = json.dumps(payload, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(blob).hexdigest()
+
+    def _output_digests(self, stage: Stage) -> Dict[str, Optional[str]]:
+        return {o: self.hashes.path_digest(self.root / o) for o in stage.outputs}
+
+    def is_fresh(self, stage: Stage, fingerprint: str) -> bool:
+        prev = self.state.get(stage.name)
+        outputs = self._output_digests(stage)
+        if any(d is None for d in outputs.values()):
+            return False
+        if prev is None and not stage.inputs:
+            # Source stage (e.g. a network fetch) whose outputs already exist from
+            # a manual run: adopt them instead of re-downloading; --force refreshes.
+            self._record(stage, fingerprint, seconds=None)
+            return True
+        if not prev or prev.get("fingerprint") != fingerprint:
+            return False
+        return outputs == prev.get("outputs")
+
+    def _record(self, stage: Stage, fingerprint: str, seconds: Optional[float]) -> None:
+        self.state[stage.name] = {
+            "fingerprint": fingerprint,
+            "outputs": self._output_digests(stage),
+            "seconds": round(seconds, 3) if seconds is not None else None,
+            "ran_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    # ---- state ----
+    def _load_state(self) -> Dict[str, Any]:
+        if not self.state_path.exists():
+            return {}
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return {}
+
+    def _save_state(self) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".json.part")
+        tmp.write_text(
+            json.dumps({"stages": self.state, "hash_cache": self.hashes.entries}, indent=2),
+            encoding="utf-8",
+        )
+        tmp.replace(self.state_path)
+
+    # ---- execution ----
+    def _execute(self, stage: Stage) -> Tuple[int, str, float]:
+        env = dict(os.environ)
+        env.update(stage.env)
+        env["PYTHONPATH"] = os.pathsep.join(
+            p for p in (str(self.root / "src"), env.get("PYTHONPATH", "")) if p
+        )
+        t0 = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, str(self.root / stage.script), *stage.args],
+            cwd=self.root,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        return proc.returncode, proc.stdout, time.perf_counter() - t0
+
+    def run(
+        self,
+        targets: Optional[Iterable[str]] = None,
+        force: Iterable[str] = (),
+        dry_run: bool = False,
+    ) -> Dict[str, str]:
+        """
+        Corre `targets` (default: todos) y lo que necesiten.
+
+        force: stages a re-ejecutar aunque su fingerprint no haya cambiado.
+        Devuelve {stage: "ran" | "skipped" | "would run" | "failed" | "not run"}.
+        Un stage que falla (exit != 0 o excepción al lanzarlo) queda "failed" y
+        los que dependen de él "not run"; el resto sigue y el estado de los
+        completados se guarda igual.
+        """
+        order = self.upstream(targets if targets is not None else list(self.stages))
+        force = set(force)
+        unknown = force - set(self.stages)
+        if unknown:
+            raise KeyError(f"Unknown stage(s) in force: {sorted(unknown)}")
+
+        status: Dict[str, str] = {}
+        pending = list(order)
+        running: Dict[Future, Tuple[Stage, str]] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                # Launch every stage whose upstream stages have finished.
+                n_before = len(pending)
+                for name in list(pending):
+                    deps = self.deps[name] & set(order)
+                    if any(status.get(d) in ("failed", "not run") for d in deps):
+                        status[name] = "not run"
+                        pending.remove(name)
+                        continue
+                    if not all(d in status for d in deps):
+                        continue
+                    pending.remove(name)
+                    stage = self.stages[name]
+
+                    if dry_run and any(status.get(d) == "would run" for d in deps):
+                        status[name] = "would run"
+                        print(f"[pipeline] {name}: would run (upstream changes)")
+                        continue
+                    try:
+                        fp = self.fingerprint(stage)
+                    except Exception as e:
+                        status[name] = "failed"
+                        print(f"[pipeline] {name}: FAILED ({type(e).__name__}: {e})")
+                        continue
+                    if name not in force and self.is_fresh(stage, fp):
+                        status[name] = "skipped"
+                        print(f"[pipeline] {name}: up to date, skipped")
+                        continue
+                    if dry_run:
+                        status[name] = "would run"
+                        print(f"[pipeline] {name}: would run")
+                        continue
+                    print(f"[pipeline] {name}: running {stage.script} {' '.join(stage.args)}".rstrip())
+                    running[pool.submit(self._execute, stage)] = (stage, fp)
+
+                if not running:
+                    if pending and n_before == len(pending):
+                        raise RuntimeError(f"Dependency cycle between stages: {pending}")
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    stage, fp = running.pop(fut)
+                    try:
+                        code, out, seconds = fut.result()
+                    except Exception as e:
+                        # The stage could not be launched (or read back): its
+                        # dependents are marked "not run" on the next pass.
+                        status[stage.name] = "failed"
+                        print(f"[pipeline] {stage.name}: FAILED ({type(e).__name__}: {e})")
+                        continue
+                    prefix = f"  [{stage.name}] "
+                    print("".join(prefix + line + "\n" for line in out.splitlines()), end="")
+                    if code != 0:
+                        status[stage.name] = "failed"
+                        print(f"[pipeline] {stage.name}: FAILED (exit {code}) after {seconds:.1f}s")
+                        continue
+                    try:
+                        self._record(stage, fp, seconds)
+                    except OSError as e:
+                        status[stage.name] = "failed"
+                        print(f"[pipeline] {stage.name}: FAILED reading its outputs ({e})")
+                        continue
+                    status[stage.name] = "ran"
+                    self._save_state()
+                    print(f"[pipeline] {stage.name}: done in {seconds:.1f}s")
+
+        if not dry_run:
+            self._save_state()
+        return {n: status[n] for n in order if n in status}
@@ -0,0 +1,104 @@
+"""
+Stages de los pipelines del repo (scripts, entradas y salidas).
+
+Las dependencias no se declaran: el runner las deduce de qué stage produce
+cada entrada. Rutas relativas a la raíz del repo.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+from ds_exam.pipeline.runner import Stage
+
+P = "data/processed"
+
+Q4A_STAGES: List[Stage] = [
+    Stage(
+        name="q4a_fetch",
+        script="scripts/q4a_fetch_panel_all.py",
+        outputs=(f"{P}/q4a_panel_country_year.parquet",),
+        track_code=False,
+    ),
+    Stage(
+        name="q4a_build",
+        script="scripts/q4a_build_multicountry_panel.py",
+        inputs=(f"{P}/q4a_panel_country_year.parquet",),
+        outputs=(f"{P}/q4a_multicountry_panel.parquet",),
+    ),
+    Stage(
+        name="q4a_features",
+        script="scripts/q4a_features.py",
+        inputs=(f"{P}/q4a_multicountry_panel.parquet",),
+        outputs=(f"{P}/q4a_features.parquet", f"{P}/q4a_targets.parquet"),
+    ),
+    Stage(
+        name="q4a_train",
+        script="scripts/q4a_train.py",
+        inputs=(f"{P}/q4a_features.parquet",),
+        outputs=(
+            f"{P}/q4a_model_metrics.csv",
+            f"{P}/q4a_model_metrics_by_split.csv",
+            f"{P}/q4a_predictions.csv",
+        ),
+    ),
+    Stage(
+        name="q5_prioritization",
+        script="scripts/q5_prioritization.py",
+        inputs=(f"{P}/q4a_features.parquet",),
+        outputs=(f"{P}/q5_country_ranking.csv", "reports/Q5_ranking.md"),
+    ),
+    Stage(
+        name="q5_plot",
+        script="scripts/plot_q5_ranking.py",
+        inputs=(f"{P}/q5_country_ranking.csv",),
+        outputs=("outputs/figures/q5_top30_priority_score.png",),
+    ),
+]
+
+Q4_STAGES: List[Stage] = [
+    Stage(
+        name="q1_panel",
+        script="scripts/q1_build_panel.py",
+        inputs=("data/raw/worldbank",),
+        outputs=(f"{P}/panel_country_year.parquet", f"{P}/panel_country_year.csv"),
+    ),
+    Stage(
+        name="q4_build",
+        script="scripts/build_multicountry_panel.py",
+        inputs=(f"{P}/panel_country_year.parquet",),
+        outputs=(f"{P}/q4_multicountry_panel.parquet",),
+    ),
+    Stage(
+        name="q4_features",
+        script="scripts/q4_features.py",
+        inputs=(f"{P}/q4_multicountry_panel.parquet",),
+        outputs=(f"{P}/q4_features.parquet",),
+    ),
+    Stage(
+        name="q4_train",
+        script="scripts/q4_train.py",
+        inputs=(f"{P}/q4_features.parquet",),
+        outputs=(
+            f"{P}/q4_model_metrics.csv",
+            f"{P}/q4_model_metrics_by_split.csv",
+            f"{P}/q4_predictions.csv",
+        ),
+    ),
+    Stage(
+        name="q4_shap",
+        script="scripts/q4_shap.py",
+        inputs=(f"{P}/q4_features.parquet",),
+        outputs=(
+            f"{P}/q4_shap_summary_dot.png",
+            f"{P}/q4_shap_summary_bar.png",
+            f"{P}/q4_shap_dependence_top1.png",
+        ),
+    ),
+]
+
+PIPELINES: Dict[str, List[Stage]] = {
+    "q4a": Q4A_STAGES,
+    "q4": Q4_STAGES,
+    "all": Q4A_STAGES + Q4_STAGES,
+}
@@ -0,0 +1,54 @@
+"""build_panel(countries=None) offline: aggregates come from local metadata."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from ds_exam.data import countries as countries_mod
+from ds_exam.data.build_dataset import DEFAULT_SOURCES, build_panel
+
+WDI_HEADER = '"Country Name","Country Code","Indicator Name","Indicator Code","2000","2001",\n'
+ROWS = [("Mexico", "MEX", "Latin America & Caribbean"), ("World", "WLD", "")]
+
+
+def _write_raw(raw: Path, with_metadata: bool) -> None:
+    (raw / "worldbank").mkdir(parents=True)
+    (raw / "owid").mkdir()
+    for code, value in (("NY.GDP.MKTP.CD", 1e12), ("SP.POP.TOTL", 1e8)):
+        stem = f"API_{code}_DS2_en_csv_v2_1"
+        lines = [f'"{n}","{c}","x","{code}","{value}","{value}",\n' for n, c, _ in ROWS]
+        (raw / "worldbank" / f"{stem}.csv").write_text(
+            "\n\n\n\n" + WDI_HEADER + "".join(lines), encoding="utf-8"
+        )
+        if with_metadata:
+            meta = "".join(f'"{c}","{r}","",\n' for _, c, r in ROWS)
+            (raw / "worldbank" / f"Metadata_Country_{stem}.csv").write_text(
+                '"Country Code","Region","IncomeGroup",\n' + meta, encoding="utf-8"
+            )
+    (raw / "owid" / "owid-co2-data.csv").write_text(
+        "country,year,iso_code,co2\n"
+        "Mexico,2000,MEX,400\nMexico,2001,MEX,410\n"
+        "World,2000,OWID_WRL,25000\nWorld,2001,OWID_WRL,25500\n",
+        encoding="utf-8",
+    )
+
+
+@pytest.fixture
+def offline(monkeypatch, tmp_path):
+    monkeypatch.setattr(countries_mod, "COUNTRIES_PATH", tmp_path / "no-registry.parquet")
+
+    def _no_network(*args, **kwargs):
+        raise AssertionError("build_panel should not fetch the country registry")
+
+    monkeypatch.setattr(countries_mod, "load_country_registry", _no_network)
+    return tmp_path / "raw"
+
+
+@pytest.mark.parametrize("with_metadata", [True, False])
+def test_offline_build_drops_aggregates_without_registry(offline, with_metadata):
+    _write_raw(offline, with_metadata)
+    panel = build_panel(years=(2000, 2001), sources=DEFAULT_SOURCES, raw_dir=offline)
+    assert sorted(panel["iso3"].astype(str).unique()) == ["MEX"]
+    assert len(panel) == 2
@@ -0,0 +1,72 @@
+"""make_features_incremental vs a full make_features rebuild."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from ds_exam.data.synthetic import synthetic_panel
+from ds_exam.pipeline.q4a import (
+    build_multicountry_panel,
+    make_features,
+    make_features_incremental,
+)
+
+
+@pytest.fixture(scope="module")
+def panel() -> pd.DataFrame:
+    raw = synthetic_panel(n_entities=25, years=(1990, 2023), missing_share=0.02, seed=3)
+    return build_multicountry_panel(raw)
+
+
+def assert_same(inc: pd.DataFrame, full: pd.DataFrame, **kwargs) -> None:
+    pd.testing.assert_frame_equal(
+        inc.astype({"iso3": str}).reset_index(drop=True),
+        full.astype({"iso3": str}).reset_index(drop=True),
+        **kwargs,
+    )
+
+
+def test_appended_years_match_full_rebuild(panel):
+    stored = make_features(panel[panel["year"] <= 2021])
+    inc, stats = make_features_incremental(panel, stored, since_year=2022)
+    assert_same(inc, make_features(panel), check_exact=True)
+    assert stats["since_year"] == 2022
+    assert stats["rows_after"] == len(inc)
+    assert stats["panel_rows_read"] < len(panel)
+
+
+def test_revised_recent_years_use_default_since_year(panel):
+    stored = make_features(panel[panel["year"] <= 2021])
+    revised = panel.copy()
+    revised.loc[revised["year"] == 2021, "co2_per_capita"] *= 0.8
+    inc, stats = make_features_incremental(revised, stored)
+    assert stats["since_year"] <= 2021
+    assert_same(inc, make_features(revised), check_exact=True)
+
+
+def test_new_country_and_gap_match_full_rebuild(panel):
+    stored = make_features(panel[panel["year"] <= 2021])
+    iso = panel["iso3"].astype(str)
+    first, other = sorted(iso.unique())[:2]
+    gapped = panel[~((iso == first) & (panel["year"] == 2019))].astype({"iso3": str})
+    new = panel[iso == other].astype({"iso3": str}).assign(iso3="ZZZ")
+    df = pd.concat([gapped, new], ignore_index=True)
+    inc, stats = make_features_incremental(df, stored, since_year=2019)
+    assert_same(inc, make_features(df), check_exact=True)
+    assert "ZZZ" in set(inc["iso3"].astype(str))
+
+
+def test_rolling_features_match_full_rebuild(panel):
+    stored = make_features(panel[panel["year"] <= 2021], rolling=True)
+    inc, _ = make_features_incremental(panel, stored, since_year=2022)
+    assert_same(inc, make_features(panel, rolling=True), check_exact=True)
+
+
+def test_mismatched_stored_matrix_is_rejected(panel):
+    stored = make_features(panel[panel["year"] <= 2021])
+    bad_norm = stored.assign(year_norm=stored["year_norm"] * 1.1)
+    with pytest.raises(ValueError, match="year_norm"):
+        make_features_incremental(panel, bad_norm)
+    with pytest.raises(ValueError, match="FEATURE_COLS"):
+        make_features_incremental(panel, stored.drop(columns="ln_gdp"))
@@ -0,0 +1,31 @@
+"""Parquet cache of the OWID CSV (ds_exam.data.owid)."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from ds_exam.data.owid import OWID_CO2_URL, _cache_name, load_owid_co2, owid_parquet
+
+HEADER = "country,year,iso_code,co2,co2_per_capita\n"
+
+
+def _write_csv(path: Path, co2: float) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(HEADER + f"A,2000,AAA,{co2},1.0\n", encoding="utf-8")
+    return path
+
+
+def test_same_named_sources_do_not_share_a_cache(tmp_path):
+    cache = tmp_path / "cache"
+    first = _write_csv(tmp_path / "a" / "owid-co2-data.csv", 1.0)
+    second = _write_csv(tmp_path / "b" / "owid-co2-data.csv", 999.0)
+
+    assert owid_parquet(first, cache) != owid_parquet(second, cache)
+    assert load_owid_co2(first, cache_dir=cache)["co2"].tolist() == [1.0]
+    assert load_owid_co2(second, cache_dir=cache)["co2"].tolist() == [999.0]
+
+
+def test_url_and_local_file_do_not_share_a_cache(tmp_path):
+    local = _write_csv(tmp_path / "owid-co2-data.csv", 1.0)
+    assert _cache_name(local) != _cache_name(OWID_CO2_URL)
+    assert _cache_name(OWID_CO2_URL).startswith("owid-co2-data-")
@@ -0,0 +1,138 @@
+"""PanelTransform vs the pandas groupby equivalents (shift, diff, pct_change, rolling)."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ds_exam.data.panel_transform import (
+    PanelOp,
+    PanelTransform,
+    diff,
+    growth,
+    lag,
+    lead,
+    rolling_mean,
+    rolling_slope,
+    rolling_std,
+)
+
+
+@pytest.fixture(params=["object", "category"])
+def panel(request) -> pd.DataFrame:
+    """Unbalanced, unsorted panel with NaNs, a missing year and GDP-sized values."""
+    rng = np.random.default_rng(0)
+    frames = []
+    for i, n_years in enumerate([1, 3, 12, 34, 34, 20]):
+        years = np.arange(1990, 1990 + n_years)
+        growth_path = np.exp(rng.normal(0.02, 0.05, n_years).cumsum())
+        frames.append(
+            pd.DataFrame(
+                {
+                    "iso3": f"C{i:02d}",
+                    "year": years,
+                    "x": rng.normal(0.0, 1.0, n_years).cumsum(),
+                    "gdp": 10 ** rng.uniform(8, 13) * growth_path,
+                }
+            )
+        )
+    df = pd.concat(frames, ignore_index=True)
+    df.loc[rng.random(len(df)) < 0.08, "x"] = np.nan
+    df = df.drop(index=df.index[(df["iso3"] == "C03") & (df["year"] == 2000)])
+    df = df.sample(frac=1.0, random_state=1).reset_index(drop=True)
+    return df.astype({"iso3": request.param})
+
+
+def _expected(pt: PanelTransform, column: str) -> "pd.core.groupby.SeriesGroupBy":
+    return pt.frame.groupby("iso3", observed=True, sort=False)[column]
+
+
+@pytest.mark.parametrize("periods", [1, 2, 5])
+def test_shift_ops_match_groupby(panel, periods):
+    pt = PanelTransform(panel)
+    out = pt.compute(
+        [lag("x", periods), lead("x", periods), diff("x", periods), growth("gdp", periods)]
+    )
+    g, g_gdp = _expected(pt, "x"), _expected(pt, "gdp")
+    pd.testing.assert_series_equal(out[f"x_lag{periods}"], g.shift(periods), check_names=False)
+    pd.testing.assert_series_equal(out[f"x_lead{periods}"], g.shift(-periods), check_names=False)
+    pd.testing.assert_series_equal(out[f"x_diff{periods}"], g.diff(periods), check_names=False)
+    pd.testing.assert_series_equal(
+        out[f"gdp_growth{periods}"],
+        g_gdp.pct_change(periods, fill_method=None),
+        check_names=False,
+    )
+
+
+@pytest.mark.parametrize("window", [2, 3, 5, 10])
+@pytest.mark.parametrize("column", ["x", "gdp"])
+def test_rolling_mean_std_match_groupby(panel, window, column):
+    pt = PanelTransform(panel)
+    out = pt.compute([rolling_mean(column, window), rolling_std(column, window)])
+    roll = _expected(pt, column).rolling(window)
+    mean = roll.mean().reset_index(level=0, drop=True).sort_index()
+    std = roll.std().reset_index(level=0, drop=True).sort_index()
+    pd.testing.assert_series_equal(
+        out[f"{column}_mean{window}"], mean, check_names=False, rtol=1e-12
+    )
+    pd.testing.assert_series_equal(out[f"{column}_std{window}"], std, check_names=False, rtol=1e-7)
+
+
+@pytest.mark.parametrize("window", [2, 5])
+def test_rolling_slope_matches_polyfit(panel, window):
+    pt = PanelTransform(panel)
+    out = pt.compute([rolling_slope("x", window)])
+    expected = (
+        _expected(pt, "x")
+        .rolling(window)
+        .apply(lambda v: np.polyfit(np.arange(len(v)), v, 1)[0], raw=True)
+        .reset_index(level=0, drop=True)
+        .sort_index()
+    )
+    pd.testing.assert_series_equal(out[f"x_slope{window}"], expected, check_names=False, rtol=1e-9)
+
+
+def test_rolling_has_no_look_ahead(panel):
+    ops = [rolling_mean("gdp", 3), rolling_std("gdp", 3), rolling_slope("gdp", 3)]
+    full = PanelTransform(panel)
+    past = panel[panel["year"] <= 2005]
+    out_full = pd.concat([full.frame[["iso3", "year"]], full.compute(ops)], axis=1)
+    cut = PanelTransform(past)
+    out_cut = pd.concat([cut.frame[["iso3", "year"]], cut.compute(ops)], axis=1)
+    merged = out_cut.merge(out_full, on=["iso3", "year"], suffixes=("", "_full"))
+    assert len(merged) == len(past)
+    for op in ops:
+        np.testing.assert_array_equal(merged[op.output], merged[op.output + "_full"])
+
+
+def test_rolling_depends_only_on_own_country(panel):
+    ops = [rolling_mean("gdp", 3), rolling_std("gdp", 3), rolling_slope("gdp", 3)]
+    iso = panel["iso3"].astype(str)
+    alone = PanelTransform(panel[iso == "C03"])
+    out_alone = alone.compute(ops)
+    full = PanelTransform(panel)
+    out_full = full.compute(ops)[(full.frame["iso3"].astype(str) == "C03").to_numpy()]
+    for op in ops:
+        np.testing.assert_array_equal(out_alone[op.output], out_full[op.output])
+
+
+def test_compute_accepts_values_outside_frame(panel):
+    pt = PanelTransform(panel)
+    doubled = pt.frame["x"].to_numpy() * 2
+    out = pt.compute([lag("x2", 1)], values={"x2": doubled})
+    pd.testing.assert_series_equal(
+        out["x2_lag1"], _expected(pt, "x").shift(1) * 2, check_names=False
+    )
+
+
+def test_invalid_ops_raise(panel):
+    pt = PanelTransform(panel)
+    with pytest.raises(ValueError, match="Duplicate"):
+        pt.compute([lag("x", 1), lag("x", 1)])
+    with pytest.raises(ValueError, match="Missing columns"):
+        pt.compute([lag("nope", 1)])
+    with pytest.raises(ValueError):
+        PanelOp("median", "x")
+    with pytest.raises(ValueError):
+        rolling_std("x", 1)
@@ -0,0 +1,50 @@
+"""PipelineRunner: a failing stage stops its dependents, the rest still run and are recorded."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from ds_exam.pipeline.runner import PipelineRunner, Stage
+
+WRITE = "import sys\nopen(sys.argv[1], 'w').write('ok')\n"
+
+
+def _runner(root: Path, stages) -> PipelineRunner:
+    (root / "src").mkdir(exist_ok=True)
+    (root / "ok.py").write_text(WRITE, encoding="utf-8")
+    (root / "boom.py").write_text("raise SystemExit(3)\n", encoding="utf-8")
+    return PipelineRunner(stages, root=root, state_path=root / "state.json", max_workers=2)
+
+
+def test_failed_exit_skips_dependents_and_keeps_state(tmp_path):
+    stages = [
+        Stage("a", "boom.py", outputs=("a.txt",)),
+        Stage("b", "ok.py", inputs=("a.txt",), outputs=("b.txt",), args=("b.txt",)),
+        Stage("c", "ok.py", outputs=("c.txt",), args=("c.txt",)),
+    ]
+    status = _runner(tmp_path, stages).run()
+    assert status == {"a": "failed", "b": "not run", "c": "ran"}
+    state = json.loads((tmp_path / "state.json").read_text(encoding="utf-8"))
+    assert set(state["stages"]) == {"c"}
+
+
+def test_exception_while_launching_marks_stage_failed(tmp_path, monkeypatch):
+    stages = [
+        Stage("a", "ok.py", outputs=("a.txt",), args=("a.txt",)),
+        Stage("b", "ok.py", inputs=("a.txt",), outputs=("b.txt",), args=("b.txt",)),
+        Stage("c", "ok.py", outputs=("c.txt",), args=("c.txt",)),
+    ]
+    runner = _runner(tmp_path, stages)
+    execute = runner._execute
+
+    def flaky(stage):
+        if stage.name == "a":
+            raise OSError("cannot spawn")
+        return execute(stage)
+
+    monkeypatch.setattr(runner, "_execute", flaky)
+    status = runner.run()
+    assert status == {"a": "failed", "b": "not run", "c": "ran"}
+    state = json.loads((tmp_path / "state.json").read_text(encoding="utf-8"))
+    assert set(state["stages"]) == {"c"}